@@ -12,11 +12,26 @@ This script contains the multiple route computing algorithms, including:
 #================ IMPORTS ================
 from LandscapeComponents import *
 from VehicleAgents import *
+from RoadGraph import *
+from ContractionHierarchy import *
+from ReservationTable import *
+from RouteCache import *
+from RouteSet import *
+from RoutingStats import *
+from OpenList import *
+from SearchWorkspace import *
+from VehiclePriority import *
+from ZoneSharding import *
 
 from random import sample
 from heapq import *
-from math import ceil
+from math import ceil, inf
+from time import perf_counter
+from traceback import format_exc
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
 import random
+import numpy as np
 #=========================================
 
 # ===============================================================================================
@@ -51,34 +66,399 @@ def manhattanDistance(pos1: tuple[float, float], pos2: tuple[float, float]) -> f
     return abs(pos1[0] - pos2[0]) + abs(pos1[1] - pos2[1])
 
 
+# ===============================================================================================
+# Worker Processes
+# ===============================================================================================
+
+# Road graph of the current worker process, set once by initialiseRoutingWorker
+WORKER_GRAPH: RoadGraph = None
+
+def getWorkerContext():
+    """
+    Prefers forking, so workers inherit the road graph from the parent process without pickling it.
+    """
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return multiprocessing.get_context()
+
+def initialiseRoutingWorker(graph: RoadGraph) -> None:
+    global WORKER_GRAPH
+    WORKER_GRAPH = graph
+
+def routeDestinationGroupsInWorker(destination_groups, MAX_ROAD_SPEED_MPS: float, minBatchSize: int, bidirectional: bool, useContractionHierarchy: bool, collectStats: bool, openList: str):
+    """
+    Returns (routes, search records or None), see routeDestinationGroups.
+    """
+    stats = RoutingStats() if collectStats else None
+    routes = routeDestinationGroups(WORKER_GRAPH, destination_groups, MAX_ROAD_SPEED_MPS, minBatchSize, bidirectional, useContractionHierarchy, stats, openList)
+    return routes, None if stats is None else stats.records
+
+# Reservation table of the current batch of AutoFlow vehicles, attached by planAutoflowRoutesInWorker
+WORKER_RESERVATION_TABLE: SharedReservationTable = None
+
+def planAutoflowRoutesInWorker(sharedName: str, roadCount: int, horizon: int, vehicles: list[tuple[int, int, float, int, float]], MAX_ROAD_SPEED_MPS: float, collectStats: bool = False, openList: str = "heap"):
+    """
+    Plans AutoFlow vehicles, given as (index, start roadID, start position, destination roadID, destination position),
+    against the shared reservation table. Returns {index: (plan, reads, search counters or None)}, see planAutoflowRoute.
+    """
+    global WORKER_RESERVATION_TABLE
+    if WORKER_RESERVATION_TABLE is None or WORKER_RESERVATION_TABLE.sharedName != sharedName:
+        if WORKER_RESERVATION_TABLE is not None:
+            WORKER_RESERVATION_TABLE.close()
+        WORKER_RESERVATION_TABLE = SharedReservationTable.attach(sharedName, roadCount, horizon)
+
+    plans = {}
+    for index, start_roadID, start_position, destination_roadID, destination_position in vehicles:
+        reads = []
+        searchStats = {} if collectStats else None
+        startTime = perf_counter() if collectStats else 0
+        plan = planAutoflowRoute(
+            WORKER_GRAPH, WORKER_RESERVATION_TABLE, 
+            start_roadID, start_position, 
+            destination_roadID, destination_position, 
+            MAX_ROAD_SPEED_MPS, reads, searchStats, openList
+        )
+        if collectStats:
+            searchStats["wallTime"] = perf_counter() - startTime
+        plans[index] = (plan, reads, searchStats)
+    return plans
+
+def serveZone(connection, graph: RoadGraph = None) -> None:
+    """
+    Worker loop of a single zone of a ZoneCoordinator, see ZoneSharding for the messages.
+    The worker keeps the reservations of the roads held by its zone, and plans the vehicles it is sent in order
+    against them, reporting boundary reservations back. graph is None if the coordinator sends it instead.
+    """
+    try:
+        kind, zone, heldRoads, privateRoads, sentGraph, MAX_ROAD_SPEED_MPS, congestionCost, collectStats, openList = connection.recv()
+        if sentGraph is not None:
+            graph = sentGraph
+        privateRoads = set(privateRoads)
+        reservation_table = ZoneReservationTable(heldRoads, graph.roadCount)
+
+        while True:
+            message = connection.recv()
+
+            if message[0] == "reserve":
+                for roadID, startTime, endTime, amount in message[1]:
+                    reservation_table.reserve(roadID, startTime, endTime, amount)
+
+            elif message[0] == "plan":
+                builder = RouteSetBuilder()
+                failed: list[int] = []
+                records: list[tuple[int, dict]] = []
+                boundaryReservations: list[tuple[int, int, int, int]] = []
+                for index, start_roadID, start_position, destination_roadID, destination_position in message[1]:
+                    searchStats = {} if collectStats else None
+                    startTime = perf_counter() if collectStats else 0
+                    plan = planAutoflowRoute(
+                        graph, reservation_table, 
+                        start_roadID, start_position, 
+                        destination_roadID, destination_position, 
+                        MAX_ROAD_SPEED_MPS, stats=searchStats, openList=openList
+                    )
+                    if collectStats:
+                        searchStats["wallTime"] = perf_counter() - startTime
+                        records.append((index, searchStats))
+                    if plan is None:
+                        failed.append(index)
+                        continue
+
+                    route, reserved_roads = plan
+                    for roadID, reservedStart, reservedEnd in reserved_roads:
+                        reservation_table.reserve(roadID, reservedStart, reservedEnd, congestionCost)
+                        if roadID not in privateRoads:
+                            boundaryReservations.append((roadID, reservedStart, reservedEnd, congestionCost))
+                    builder.add_route(index, route)
+                connection.send(("planned", builder.build(), failed, records, boundaryReservations))
+
+            else:
+                break
+    except (EOFError, OSError):
+        pass  # the coordinator is gone
+    except Exception:
+        connection.send(("error", format_exc()))
+    finally:
+        connection.close()
+
+
 # ===============================================================================================
 # Main Functions
 # ===============================================================================================
 
-def computeRoutes(selfish_vehicles: list[Vehicle], autoflow_vehicles: list[Vehicle], landscape: Landscape, MAX_ROAD_SPEED_MPS: float, carPositions = {}):
+def computeRoutes(selfish_vehicles: list[Vehicle], autoflow_vehicles: list[Vehicle], landscape: Landscape, MAX_ROAD_SPEED_MPS: float, carPositions = {}, stats: RoutingStats = None, openList: str = "heap", priorityModel: PriorityModel = None, useContractionHierarchy: bool = False, replanningState: "ReplanningState" = None) -> RouteSet:
     """
     Compute the routes for selfish vehicles first, then AutoFlow vehicles.
+    Returns a single RouteSet with the routes of AutoFlow vehicles followed by the routes of selfish vehicles.
+    If stats is given, both routers add the search counters of every vehicle to it, see RoutingStats.
+    openList selects the Open list of both routers, see OpenList.OPEN_LISTS.
+    priorityModel scores the priorities of AutoFlow vehicles, see sortVehicles.
+    useContractionHierarchy routes selfish vehicles with contraction hierarchy queries, see computeSelfishVehicleRoutes.
+    replanningState records the reservations and routes of AutoFlow vehicles, see computeAutoflowVehicleRoutes.
     """
-    routes = {}
-    selfish_vehicle_routes = computeSelfishVehicleRoutes(selfish_vehicles, landscape, MAX_ROAD_SPEED_MPS)
-    autoflow_vehicle_routes = computeAutoflowVehicleRoutes(autoflow_vehicles, landscape, MAX_ROAD_SPEED_MPS, carPositions=carPositions)
+    selfish_vehicle_routes = computeSelfishVehicleRoutes(selfish_vehicles, landscape, MAX_ROAD_SPEED_MPS, useContractionHierarchy=useContractionHierarchy, stats=stats, openList=openList)
+    autoflow_vehicle_routes = computeAutoflowVehicleRoutes(autoflow_vehicles, landscape, MAX_ROAD_SPEED_MPS, carPositions=carPositions, stats=stats, openList=openList, priorityModel=priorityModel, replanningState=replanningState)
 
-    for i in range(len(autoflow_vehicle_routes)):
-        routes[autoflow_vehicles[i].id] = autoflow_vehicle_routes[i]
-    
-    for i in range(len(selfish_vehicle_routes)):
-        routes[selfish_vehicles[i].id] = selfish_vehicle_routes[i]
+    # Routes are assigned to vehicles by index, the arrays themselves are shared
+    autoflow_vehicle_routes = autoflow_vehicle_routes.relabel([autoflow_vehicles[i].id for i in range(len(autoflow_vehicle_routes))])
+    selfish_vehicle_routes = selfish_vehicle_routes.relabel([selfish_vehicles[i].id for i in range(len(selfish_vehicle_routes))])
 
-    return routes
+    return RouteSet.concatenate([autoflow_vehicle_routes, selfish_vehicle_routes])
 
-def computeSelfishVehicleRoutes(selfish_vehicles: list[Vehicle], landscape: Landscape, MAX_ROAD_SPEED_MPS: float) -> list[list[tuple[float, float]]]:
+def computeSelfishVehicleRoutes(selfish_vehicles: list[Vehicle], landscape: Landscape, MAX_ROAD_SPEED_MPS: float, minBatchSize: int = None, workers: int = 1, bidirectional: bool = False, useContractionHierarchy: bool = False, useCache: bool = True, stats: RoutingStats = None, openList: str = "heap") -> RouteSet:
     """
     Selfish routing algorithm of Google Maps.
     Vehicles are not knowledgeable of future traffic and therefore only aware of congestion AFTER they occur.
 
-    Each node is a tuple that stores (fcost, hcost, gcost, tiebreaker, road, position).
+    Vehicles are grouped by destination road, see routeDestinationGroups.
+    Groups are only batched into a shared search if minBatchSize is given, see routeDestinationGroups.
+    Routes are searched with A* by default, with bidirectional A* if bidirectional is True, or with contraction hierarchy
+    queries if useContractionHierarchy is True (the hierarchy is built on first use if it was not precomputed).
+    Contraction hierarchy queries are exact whereas A* is not (see routeDestinationGroups), so they can find other routes.
+    Selfish vehicles do not affect each other, so if workers > 1 the groups are split across a process pool.
+    Every worker receives the compiled road graph once when it starts, instead of once per task.
+    Routes are returned as a RouteSet, in the same order as selfish_vehicles.
+    Workers also return RouteSets, so routes are sent back as a few flat arrays instead of many small tuples.
+
+    If useCache is True, routes are looked up in and added to the route cache of the landscape, see RouteCache.
+    Routes are cached under the routing method that produced them and MAX_ROAD_SPEED_MPS (which shapes the A* heuristic),
+    so a cached route is only reused by a call that would have computed the same route.
+    If stats is given, the search counters of every vehicle are added to it, see RoutingStats.
+    openList selects the Open list of A* and bidirectional A* searches, see OpenList.OPEN_LISTS.
+    """
+
+    if bidirectional and useContractionHierarchy:
+        raise ValueError("bidirectional and useContractionHierarchy are mutually exclusive")
+
+    graph = getRoadGraph(landscape)
+    if useContractionHierarchy and graph.contractionHierarchy is None:
+        precomputeContractionHierarchy(landscape)
+    route_cache = getRouteCache(landscape) if useCache else None
+
+    # Cached routes, labelled by vehicle index like the results of routeDestinationGroups
+    cached_indexes: list[int] = []
+    cached_routes: list[RouteView] = []
+
+    # Group vehicles based on their destination road
+    all_destination_groups: dict[int, list[tuple[int, int, float, float]]] = defaultdict(list)
+    for index, vehicle in enumerate(selfish_vehicles):
+        all_destination_groups[vehicle.destinationRoad.roadID].append(
+            (index, vehicle.road.roadID, vehicle.position, vehicle.destinationPosition)
+        )
+
+    # Routing method of every group, which is part of the cache key of its routes
+    group_methods: dict[int, str] = {
+        destination_roadID: selfishRoutingMethod(len(group), minBatchSize, bidirectional, useContractionHierarchy)
+        for destination_roadID, group in all_destination_groups.items()
+    }
+
+    def cache_key(destination_roadID: int, start_roadID: int, start_position: float, destination_position: float) -> tuple:
+        return (
+            group_methods[destination_roadID], graph.landmarks is not None, MAX_ROAD_SPEED_MPS,
+            start_roadID, start_position, destination_roadID, destination_position
+        )
+
+    # Skip vehicles whose route is cached
+    destination_groups: list[tuple[int, list[tuple[int, int, float, float]]]] = []
+    for destination_roadID, group in all_destination_groups.items():
+        uncached = []
+        hits = []
+        for vehicle_query in group:
+            index, start_roadID, start_position, destination_position = vehicle_query
+            route = route_cache.get(cache_key(destination_roadID, start_roadID, start_position, destination_position)) if route_cache is not None else None
+            if route is None:
+                uncached.append(vehicle_query)
+            else:
+                hits.append((index, route))
+
+        # A group routed with a shared search is only skipped as a whole, so that it is still batched exactly as without the cache
+        if uncached and group_methods[destination_roadID] == "shortest path tree":
+            uncached, hits = group, []
+
+        for index, route in hits:
+            cached_indexes.append(index)
+            cached_routes.append(route)
+            if stats is not None:
+                stats.record("selfish", "cache", selfish_vehicles[index].id, {"routeLength": len(route)})
+        if uncached:
+            destination_groups.append((destination_roadID, uncached))
+
+    # Search records are labelled by vehicle index until all groups are routed
+    group_stats = RoutingStats() if stats is not None else None
+
+    if workers <= 1 or len(destination_groups) <= 1:
+        results = [routeDestinationGroups(graph, destination_groups, MAX_ROAD_SPEED_MPS, minBatchSize, bidirectional, useContractionHierarchy, group_stats, openList)]
+    else:
+        # Split groups into several tasks per worker, largest groups first to balance the workload
+        tasks: list[list[tuple[int, list[tuple[int, int, float, float]]]]] = [[] for i in range(workers * 4)]
+        task_sizes = [0 for i in range(len(tasks))]
+        for group in sorted(destination_groups, key=lambda group: len(group[1]), reverse=True):
+            smallest = task_sizes.index(min(task_sizes))
+            tasks[smallest].append(group)
+            task_sizes[smallest] += len(group[1])
+
+        results = []
+        with ProcessPoolExecutor(
+            max_workers=workers, 
+            mp_context=getWorkerContext(),
+            initializer=initialiseRoutingWorker, 
+            initargs=(graph,)
+        ) as executor:
+            futures = [
+                executor.submit(routeDestinationGroupsInWorker, task, MAX_ROAD_SPEED_MPS, minBatchSize, bidirectional, useContractionHierarchy, stats is not None, openList) 
+                for task in tasks if task
+            ]
+            for future in futures:
+                result, records = future.result()
+                results.append(result)
+                if records is not None:
+                    group_stats.extend(records)
+
+    if stats is not None:
+        for record in group_stats.records:
+            record["vehicle"] = selfish_vehicles[record["vehicle"]].id
+        stats.extend(group_stats.records)
+
+    if route_cache is not None:
+        for result in results:
+            for index, route in result.items():
+                vehicle = selfish_vehicles[index]
+                route_cache.put(
+                    cache_key(vehicle.destinationRoad.roadID, vehicle.road.roadID, vehicle.position, vehicle.destinationPosition), 
+                    route.copy()
+                )
+
+    # Put routes back in the order of selfish_vehicles
+    routes = RouteSet.concatenate([RouteSet.from_views(cached_indexes, cached_routes)] + results)
+    routes = routes.take(np.argsort(routes.vehicleIDs, kind="stable"))
+    return routes.relabel([vehicle.id for vehicle in selfish_vehicles])
+
+def routeDestinationGroups(graph: RoadGraph, destination_groups: list[tuple[int, list[tuple[int, int, float, float]]]], MAX_ROAD_SPEED_MPS: float, minBatchSize: int, bidirectional: bool = False, useContractionHierarchy: bool = False, stats: RoutingStats = None, openList: str = "heap") -> RouteSet:
+    """
+    Computes the routes of groups of selfish vehicles that share the same destination road.
+    Each group is given as (destination roadID, [(vehicle index, start roadID, start position, destination position)]).
+    Returns a RouteSet where every route is labelled by its vehicle index instead of a vehicle id.
+
+    If minBatchSize is given, groups with at least minBatchSize vehicles share a single reverse Dijkstra search
+    from the destination road, see findRouteFromTree. Routes of other groups are searched individually, see findSelfishRoute.
+    NOTE: the reverse search is exact, whereas the manhattan distance heuristic of A* is not admissible (virtual
+    pathways make turns longer than the heuristic assumes), so batched routes can be cheaper than the routes A* finds.
+    Batching is therefore opt-in, without it the route of a vehicle never depends on the other vehicles.
+    If useContractionHierarchy is True, queries of the contraction hierarchy of the graph are used instead of A*
+    (it must have been precomputed, see ContractionHierarchy.precomputeContractionHierarchy).
+    Otherwise, if bidirectional is True, findBidirectionalSelfishRoute is used instead of findSelfishRoute.
+
+    If stats is given, a search record labelled by vehicle index is added for every vehicle, see RoutingStats.
+    The time of a shared reverse Dijkstra search is split evenly between the vehicles of its group.
+    """
+
+    contractionHierarchy = graph.contractionHierarchy
+
+    results = RouteSetBuilder()
+
+    for destination_roadID, group in destination_groups:
+        method = selfishRoutingMethod(len(group), minBatchSize, bidirectional, useContractionHierarchy)
+
+        # Static costs to reach the destination road and next hop of every road
+        if method == "shortest path tree":
+            startTime = perf_counter() if stats is not None else 0
+            costs, next_hops = graph.shortest_path_tree([(destination_roadID, 0)], reverse=True)
+            tree_time = (perf_counter() - startTime) / len(group) if stats is not None else 0
+
+        for index, start_roadID, start_position, destination_position in group:
+
+            searchStats = {} if stats is not None else None
+            startTime = perf_counter() if stats is not None else 0
+
+            if method == "shortest path tree":
+                roads = findRouteFromTree(
+                    graph, costs, next_hops, 
+                    start_roadID, start_position, 
+                    destination_roadID, destination_position
+                )
+            elif method == "contraction hierarchy":
+                roads = contractionHierarchy.find_route(
+                    start_roadID, start_position, 
+                    destination_roadID, destination_position
+                )
+            elif method == "bidirectional A*":
+                roads = findBidirectionalSelfishRoute(
+                    graph, 
+                    start_roadID, start_position, 
+                    destination_roadID, destination_position, 
+                    MAX_ROAD_SPEED_MPS, searchStats, openList
+                )
+            else:
+                roads = findSelfishRoute(
+                    graph, 
+                    start_roadID, start_position, 
+                    destination_roadID, destination_position, 
+                    MAX_ROAD_SPEED_MPS, searchStats, openList
+                )
+
+            # Store computed route in results            
+            route = graph.build_route(roads, destination_position)
+            results.add_route(index, route)
+
+            if stats is not None:
+                searchStats["routeLength"] = len(route)
+                searchStats["wallTime"] = perf_counter() - startTime + (tree_time if method == "shortest path tree" else 0)
+                stats.record("selfish", method, index, searchStats)
+            
+    return results.build()
+
+def selfishRoutingMethod(groupSize: int, minBatchSize: int, bidirectional: bool, useContractionHierarchy: bool) -> str:
+    """
+    Returns the method routeDestinationGroups uses for a group of groupSize vehicles sharing a destination road,
+    i.e. "shortest path tree", "contraction hierarchy", "bidirectional A*" or "A*".
+    Precomputing a contraction hierarchy does not change the method, it is only used if useContractionHierarchy is True.
+    """
+    if minBatchSize is not None and groupSize >= minBatchSize:
+        return "shortest path tree"
+    if useContractionHierarchy:
+        return "contraction hierarchy"
+    if bidirectional:
+        return "bidirectional A*"
+    return "A*"
+
+def findRouteFromTree(graph: RoadGraph, costs: list[float], next_hops: list[int], start_roadID: int, start_position: float, destination_roadID: int, destination_position: float) -> list[int]:
+    """
+    Follows the next hops of a reverse shortest path tree rooted at the destination road, see RoadGraph.shortest_path_tree.
+    Returns the sequence of roadIDs travelled, see RoadGraph.build_route.
+    """
+
+    # Destination is the starting position, or in front of the starting position
+    if start_roadID == destination_roadID and start_position == destination_position:
+        return []
+    if start_roadID == destination_roadID and start_position < destination_position:
+        return [destination_roadID]
+
+    # Otherwise the vehicle moves to the end of its starting road, then picks the successor with the lowest cost
+    best_cost, best_roadID = inf, -1
+    for index in range(graph.successorOffsets[start_roadID], graph.successorOffsets[start_roadID + 1]):
+        cost = graph.successorPathwayTime[index] + costs[graph.successorRoads[index]]
+        if cost < best_cost:
+            best_cost, best_roadID = cost, graph.successorRoads[index]
+
+    if best_cost == inf:
+        raise Exception("Path does not exist")
+
+    roads = [start_roadID, best_roadID]
+    while roads[-1] != destination_roadID:
+        roads.append(next_hops[roads[-1]])
+
+    return roads
+
+def findSelfishRoute(graph: RoadGraph, start_roadID: int, start_position: float, destination_roadID: int, destination_position: float, MAX_ROAD_SPEED_MPS: float, stats: dict = None, openList: str = "heap") -> list[int]:
+    """
+    A* search over static costs for a single selfish vehicle.
+    Returns the sequence of roadIDs travelled, see RoadGraph.build_route.
+    If stats is given, the search counters are stored in it, see RoutingStats.
+    openList is the name of the Open list implementation, see OpenList.OPEN_LISTS.
+
+    Each node is a tuple that stores (fcost, hcost, gcost, tiebreaker, roadID, position).
     - fcost: sum of gcost and hcost, node with lowest fcost will be evaluated first
-    - hcost: optimistic approximate time required to reach destination using MAX_ROAD_SPEED
+    - hcost: optimistic approximate time required to reach destination using MAX_ROAD_SPEED, or the ALT bound if landmarks were precomputed
     - gcost: cost so far i.e. time taken so far, represents the ABSOLUTE time
     - tiebreaker: an unique integer used as a tiebreaker when all costs are equal
 
@@ -86,199 +466,603 @@ def computeSelfishVehicleRoutes(selfish_vehicles: list[Vehicle], landscape: Land
     The Closed list contains all visited nodes (including end points of a road as well as the starting position).
     """
 
-    routes: list[list[tuple[tuple[float, float], int]]] = []
-
-    for vehicle in selfish_vehicles:
+    # Local references to the compiled graph
+    roadStartPos, roadEndPos, roadSpeed = graph.roadStartPos, graph.roadEndPos, graph.roadSpeed
+    roadTraversalTime = graph.roadTraversalTime
+    successorOffsets, successorRoads, successorPathwayTime = graph.successorOffsets, graph.successorRoads, graph.successorPathwayTime
 
-        tiebreaker = 0 # tiebreaker value for when all costs are equal
+    tiebreaker = 0 # tiebreaker value for when all costs are equal
 
-        # Hashmap that maps each node to their fcost
-        node_fcost: dict[tuple[int, int], float] = defaultdict(lambda: float("inf"))
+    # Per-road arrays of the search workspace of this thread, a new generation invalidates the entries of previous searches
+    workspace = getSearchWorkspace(graph)
+    generation = workspace.begin()
 
-        # Hashmap that stores the previous node's roadID and normalised position of each node
-        previous_node: dict[tuple[int, float], tuple[int, int]] = {}        
-        # previous_node[(roadID, normalised position)] => (roadID, normalised position)
-        # NOTE: normalised position is used to handle roads where startPosReal and endPosReal are equal
-        
-        # Calculate real destination position
-        destination_position = getRealPositionOnRoad(vehicle.destinationRoad, vehicle.destinationPosition)
+    # Array that maps the start node of each road to their fcost, entries are valid if fcost_stamp[roadID] == generation
+    node_fcost, fcost_stamp = workspace.fcost, workspace.fcostStamp
 
-        # Nodes are the starting points of each road, can also be the starting point of the vehicle
-        open_nodes: list[float, float, float, Road, float] = [] # Open is a priority queue
-        closed_nodes: set[tuple(Road, float)] = set() # Closed can just be a set
+    # Arrays that store the previous node of the start and end node of each road
+    previous_start = workspace.previousStart # previous_start[roadID] => roadID of the road whose end leads here (see fcost_stamp)
+    previous_end, previous_end_stamp = workspace.previousEnd, workspace.previousEndStamp # previous_end[roadID] => normalised position the road was entered at
+    destination_previous: tuple[int, float] = None # (roadID, position) the destination was reached from
+    # NOTE: normalised position is used to handle roads where startPosReal and endPosReal are equal
+    
+    # Calculate real destination position
+    destination_x, destination_y = graph.real_position(destination_roadID, destination_position)
+
+    # If landmarks were precomputed, the ALT bound replaces the manhattan distance heuristic
+    landmarks = graph.landmarks
+    if landmarks is not None:
+        forwardByRoad, backwardByRoad = landmarks.forwardByRoad, landmarks.backwardByRoad
+        destination_forward, destination_backward = forwardByRoad[destination_roadID], backwardByRoad[destination_roadID]
+        destination_tail = euclideanDistance(
+            roadStartPos[destination_roadID], 
+            (destination_x, destination_y)
+        ) / roadSpeed[destination_roadID] # time from the start of the destination road to the destination
+
+    # Nodes are the starting points of each road, can also be the starting point of the vehicle
+    open_nodes = OPEN_LISTS[openList]() # Open is a priority queue, see OpenList
+    push, pop = open_nodes.push, open_nodes.pop
+    closed_start = workspace.closedStartStamp # closed_start[roadID] == generation => start node of the road is closed
+    closed_end = workspace.closedEndStamp # closed_end[roadID] == generation => end node of the road is closed
+
+    # Calculate the cost variables of the starting position
+    gcost = 0
+    real_position = graph.real_position(start_roadID, start_position)
+    hcost = (abs(real_position[0] - destination_x) + abs(real_position[1] - destination_y)) / MAX_ROAD_SPEED_MPS
+    fcost = gcost + hcost
+
+    # Add starting position of the vehicle to open_nodes
+    start_node = (fcost, hcost, gcost, tiebreaker, start_roadID, start_position)
+    tiebreaker += 1
+    push(start_node) 
+    heap_pushes, stale_pops = 1, 0 # search counters, nodes popped are the nodes pushed but no longer in open_nodes
+
+    while True: # loop until target point has been reached
+
+        # Explore the node with the lowest fcost (hcost is tiebreaker)
+        try:
+            fcost, hcost, gcost, tb, roadID, position = pop()
+        except IndexError:
+            raise Exception("Path does not exist")
+
+        # Add current to closed nodes
+        if position == 0:
+            closed_start[roadID] = generation
+        elif position == 1:
+            closed_end[roadID] = generation
+
+        # If destination is same as current position (by chance) then skip this vehicle
+        if roadID == destination_roadID and position == destination_position:
+            break
+
+        # If destination is on the same road in front of the current position then calculate single instruction
+        if roadID == destination_roadID and position < destination_position:
+            destination_previous = (roadID, position)
+            break
+
+        if closed_end[roadID] == generation: # if current road is the starting road, skip
+            stale_pops += 1
+            continue
 
-        # Calculate the cost variables of the starting position
-        gcost = 0
-        hcost = manhattanDistance(
-            getRealPositionOnRoad(vehicle.road, vehicle.position), 
-            destination_position
-        ) / MAX_ROAD_SPEED_MPS
-        fcost = gcost + hcost
+        # Otherwise, create instruction to move to the end of the road as there is no other choice
+        if position == 0:
+            time_taken = roadTraversalTime[roadID]
+        else:
+            time_taken = euclideanDistance(
+                graph.real_position(roadID, position),
+                roadEndPos[roadID]
+            ) / roadSpeed[roadID]
 
-        # Add starting position of the vehicle to open_nodes
-        start_node = (fcost, hcost, gcost, tiebreaker, vehicle.road, vehicle.position)
-        tiebreaker += 1
-        heappush(open_nodes, start_node) 
+        # Set previous node of road end node to road start node, then add road end to closed nodes
+        previous_end[roadID] = position
+        previous_end_stamp[roadID] = generation
+        closed_end[roadID] = generation
 
-        while True: # loop until target point has been reached
+        # Update variables
+        gcost += time_taken
 
-            if len(open_nodes) == 0:
-                raise Exception("Path does not exist")
+        # Examine neighbours
+        for index in range(successorOffsets[roadID], successorOffsets[roadID + 1]):
 
-            # Explore the node with the lowest fcost (hcost is tiebreaker)
-            fcost, hcost, gcost, tb, road, position = heappop(open_nodes)
-            real_position = getRealPositionOnRoad(road, position)
+            neighbour_roadID = successorRoads[index]
 
-            # Add current to closed_nodes
-            closed_nodes.add((road, position))
+            # If neighbour is in closed, skip
+            if closed_start[neighbour_roadID] == generation:
+                continue
 
-            # If destination is same as current position (by chance) then skip this vehicle
-            if road == vehicle.destinationRoad and position == vehicle.destinationPosition:
-                break
+            # Time cost of reaching neighbour node is the traversal time of virtual pathway
+            neighbour_gcost = gcost + successorPathwayTime[index]
+            if landmarks is None:
+                neighbour_start = roadStartPos[neighbour_roadID]
+                neighbour_hcost = (abs(neighbour_start[0] - destination_x) + abs(neighbour_start[1] - destination_y)) / MAX_ROAD_SPEED_MPS
+            else:
+                neighbour_hcost = max(
+                    0,
+                    max(map(sub, destination_forward, forwardByRoad[neighbour_roadID])),
+                    max(map(sub, backwardByRoad[neighbour_roadID], destination_backward))
+                ) + destination_tail
+            neighbour_fcost = neighbour_gcost + neighbour_hcost
+
+            neighbour_node = (neighbour_fcost, neighbour_hcost, neighbour_gcost, tiebreaker, neighbour_roadID, 0)
+            tiebreaker += 1
+
+            # Push neighbour node into open list if fcost is smaller than the existing cost
+            if fcost_stamp[neighbour_roadID] != generation or neighbour_fcost < node_fcost[neighbour_roadID]:
+                node_fcost[neighbour_roadID] = neighbour_fcost
+                fcost_stamp[neighbour_roadID] = generation
+                previous_start[neighbour_roadID] = roadID
+                push(neighbour_node) # it does not matter whether neighbour is already in open list
+                heap_pushes += 1
+
+    if stats is not None:
+        stats["nodesPopped"] = heap_pushes - len(open_nodes)
+        stats["heapPushes"] = heap_pushes
+        stats["stalePops"] = stale_pops
+        stats["closedSetSize"] = workspace.closed_count()
+
+    # Trace back the sequence of roads travelled, starting from the destination road
+    if destination_previous is not None:
+        if destination_previous[1] != 0 or fcost_stamp[destination_roadID] != generation:
+            return [destination_roadID] # destination is in front of the starting position
+    elif destination_position != 0 or fcost_stamp[destination_roadID] != generation:
+        return [] # destination is the starting position
+
+    roads = [destination_roadID]
+    current_roadID = destination_roadID
+    while fcost_stamp[current_roadID] == generation:
+        previous_roadID = previous_start[current_roadID]
+        roads.append(previous_roadID)
+        if previous_end[previous_roadID] != 0: # road was entered at the starting position of the vehicle
+            break
+        current_roadID = previous_roadID
+
+    # Reverse roads to obtain chronological order
+    roads.reverse()
+
+    return roads
+
+def findBidirectionalSelfishRoute(graph: RoadGraph, start_roadID: int, start_position: float, destination_roadID: int, destination_position: float, MAX_ROAD_SPEED_MPS: float, stats: dict = None, openList: str = "heap") -> list[int]:
+    """
+    Bidirectional A* search over static costs for a single selfish vehicle.
+    Returns the sequence of roadIDs travelled, see RoadGraph.build_route.
+
+    Nodes are the start points of roads, costs are the time taken to reach them.
+    - the forward search starts from every road following the starting road (U turns are excluded by the graph),
+      after moving to the end of the starting road and through the virtual pathway
+    - the backward search starts from the start of the destination road and follows the predecessor lists,
+      so both directions include the traversal time of the road being left and of the virtual pathway
+
+    Both searches are guided by half the difference of the euclidean distance bounds to the destination road 
+    and from the starting position, which keeps both directions consistent with each other.
+    The search stops when the smallest keys of both Open lists add up to the cost of the best path found so far.
+
+    If stats is given, the search counters are stored in it, see RoutingStats.
+    Both directions are counted together, and the closed set size is the number of roads expanded.
+    openList is the name of the Open list implementation of both directions, see OpenList.OPEN_LISTS.
+    """
 
-            # If destination is on the same road in front of the current position then calculate single instruction
-            if road == vehicle.destinationRoad and position < vehicle.destinationPosition:
-                previous_node[(vehicle.destinationRoad.roadID, vehicle.destinationPosition)] = (road.roadID, position)
-                break
+    # Destination is the starting position, or in front of the starting position
+    if start_roadID == destination_roadID and start_position == destination_position:
+        return []
+    if start_roadID == destination_roadID and start_position < destination_position:
+        return [destination_roadID]
+
+    # Local references to the compiled graph
+    roadStartPos, roadSpeed = graph.roadStartPos, graph.roadSpeed
+    roadTraversalTime = graph.roadTraversalTime
+    successorOffsets, successorRoads, successorPathwayTime = graph.successorOffsets, graph.successorRoads, graph.successorPathwayTime
+    predecessorOffsets, predecessorRoads, predecessorPathwayTime = graph.predecessorOffsets, graph.predecessorRoads, graph.predecessorPathwayTime
+
+    start_x, start_y = graph.real_position(start_roadID, start_position)
+    target_x, target_y = roadStartPos[destination_roadID]
+
+    # potentials[roadID] => forward potential of the start of the road, the backward potential is its negation
+    potentials: dict[int, float] = {}
+    def potential(roadID: int) -> float:
+        if roadID not in potentials:
+            x, y = roadStartPos[roadID]
+            potentials[roadID] = (
+                ((x - target_x) ** 2 + (y - target_y) ** 2) ** 0.5
+                - ((x - start_x) ** 2 + (y - start_y) ** 2) ** 0.5
+            ) / (2 * MAX_ROAD_SPEED_MPS)
+        return potentials[roadID]
+
+    # Time taken to reach the end of the starting road
+    if start_position == 0:
+        time_taken = roadTraversalTime[start_roadID]
+    else:
+        time_taken = euclideanDistance(
+            (start_x, start_y),
+            graph.roadEndPos[start_roadID]
+        ) / roadSpeed[start_roadID]
+
+    # Forward search, from the roads following the starting road
+    forward_cost: dict[int, float] = {}
+    forward_previous: dict[int, int] = {} # forward_previous[roadID] => roadID of the road whose end leads here
+    forward_open = OPEN_LISTS[openList]() # Open lists hold (key, roadID), see OpenList
+    forward_push, forward_pop = forward_open.push, forward_open.pop
+    for index in range(successorOffsets[start_roadID], successorOffsets[start_roadID + 1]):
+        roadID = successorRoads[index]
+        cost = time_taken + successorPathwayTime[index]
+        if cost < forward_cost.get(roadID, inf):
+            forward_cost[roadID] = cost
+            forward_previous[roadID] = -1
+            forward_push((cost + potential(roadID), roadID))
+    heap_pushes, stale_pops = len(forward_open) + 1, 0 # search counters, including the backward search below
+
+    # Backward search, from the start of the destination road
+    backward_cost: dict[int, float] = {destination_roadID: 0}
+    backward_next: dict[int, int] = {destination_roadID: -1} # backward_next[roadID] => roadID of the road its end leads to
+    backward_open = OPEN_LISTS[openList]()
+    backward_push, backward_pop = backward_open.push, backward_open.pop
+    backward_push((-potential(destination_roadID), destination_roadID))
+
+    best_cost = inf
+    meeting_roadID = -1
+    if destination_roadID in forward_cost:
+        best_cost, meeting_roadID = forward_cost[destination_roadID], destination_roadID
+
+    while forward_open and backward_open and forward_open.peek()[0] + backward_open.peek()[0] < best_cost:
+
+        # Expand the direction with the smaller Open list
+        if len(forward_open) <= len(backward_open):
+            key, roadID = forward_pop()
+            cost = forward_cost[roadID]
+            if key > cost + potential(roadID):
+                stale_pops += 1
+                continue # stale entry
+
+            for index in range(successorOffsets[roadID], successorOffsets[roadID + 1]):
+                neighbour_roadID = successorRoads[index]
+                neighbour_cost = cost + roadTraversalTime[roadID] + successorPathwayTime[index]
+                if neighbour_cost < forward_cost.get(neighbour_roadID, inf):
+                    forward_cost[neighbour_roadID] = neighbour_cost
+                    forward_previous[neighbour_roadID] = roadID
+                    forward_push((neighbour_cost + potential(neighbour_roadID), neighbour_roadID))
+                    heap_pushes += 1
+
+                    # Update the best path if the backward search has reached the neighbour
+                    if neighbour_roadID in backward_cost and neighbour_cost + backward_cost[neighbour_roadID] < best_cost:
+                        best_cost = neighbour_cost + backward_cost[neighbour_roadID]
+                        meeting_roadID = neighbour_roadID
+        else:
+            key, roadID = backward_pop()
+            cost = backward_cost[roadID]
+            if key > cost - potential(roadID):
+                stale_pops += 1
+                continue # stale entry
+
+            for index in range(predecessorOffsets[roadID], predecessorOffsets[roadID + 1]):
+                neighbour_roadID = predecessorRoads[index]
+                neighbour_cost = cost + roadTraversalTime[neighbour_roadID] + predecessorPathwayTime[index]
+                if neighbour_cost < backward_cost.get(neighbour_roadID, inf):
+                    backward_cost[neighbour_roadID] = neighbour_cost
+                    backward_next[neighbour_roadID] = roadID
+                    backward_push((neighbour_cost - potential(neighbour_roadID), neighbour_roadID))
+                    heap_pushes += 1
+
+                    # Update the best path if the forward search has reached the neighbour
+                    if neighbour_roadID in forward_cost and neighbour_cost + forward_cost[neighbour_roadID] < best_cost:
+                        best_cost = neighbour_cost + forward_cost[neighbour_roadID]
+                        meeting_roadID = neighbour_roadID
+
+    if meeting_roadID == -1:
+        raise Exception("Path does not exist")
+
+    if stats is not None:
+        stats["nodesPopped"] = heap_pushes - len(forward_open) - len(backward_open)
+        stats["heapPushes"] = heap_pushes
+        stats["stalePops"] = stale_pops
+        stats["closedSetSize"] = stats["nodesPopped"] - stale_pops
+
+    # Sequence of roads from the starting road to the meeting road, then on to the destination road
+    roads = []
+    roadID = meeting_roadID
+    while roadID != -1:
+        roads.append(roadID)
+        roadID = forward_previous[roadID]
+    roads.append(start_roadID)
+    roads.reverse()
+    roadID = backward_next[meeting_roadID]
+    while roadID != -1:
+        roads.append(roadID)
+        roadID = backward_next[roadID]
+
+    return roads
+
+
+def sortVehicles(autoflow_vehicles: list[Vehicle], graph: RoadGraph, priorityModel: PriorityModel = None) -> list[Vehicle]:
+    """
+    Sorts vehicles based on a priority function, highest priority first.
+    The whole fleet is scored at once, by passengerCount * manhattan distance to the destination (ties broken by emission rate)
+    or by priorityModel if given, see VehiclePriority.
+    """
+    return [autoflow_vehicles[index] for index in priorityOrder(autoflow_vehicles, graph, priorityModel).tolist()]
 
-            if (road, 1) in closed_nodes: # if current road is the starting road, skip
-                continue
+def planAutoflowRoute(graph: RoadGraph, reservation_table: ReservationTable, start_roadID: int, start_position: float, destination_roadID: int, destination_position: float, MAX_ROAD_SPEED_MPS: float, reads: list[tuple[int, int, int]] = None, stats: dict = None, openList: str = "heap") -> tuple[list[tuple[tuple[float, float], int]], list[tuple[int, int, int]]]:
+    """
+    Cooperative A* search of a single AutoFlow vehicle against the reservation table, see computeAutoflowVehicleRoutes.
+    The reservation table is only read, the time periods used by the route are returned instead of being reserved.
 
-            # Otherwise, create instruction to move to the end of the road as there is no other choice
-            roadEndPosition: tuple[float, float] = road.endPosReal
+    Returns (route, [(roadID, start time, end time)]), or None if the path does not exist.
+    If reads is given, every (roadID, timestamp, number of vehicles) read from the reservation table is appended to it.
+    If stats is given, the search counters are stored in it, see RoutingStats.
+    openList is the name of the Open list implementation, see OpenList.OPEN_LISTS.
+    """
 
-            # Store references to road intersection for easy reference
-            road_start_intersection: Intersection = landscape.intersections[road.start]
-            road_end_intersection: Intersection = landscape.intersections[road.end]
+    # Local references to the compiled graph
+    roadStartPos, roadEndPos, roadSpeed = graph.roadStartPos, graph.roadEndPos, graph.roadSpeed
+    roadTraversalTime = graph.roadTraversalTime
+    roadLightCycle, roadWaitTable = graph.roadLightCycle, graph.roadWaitTable
+    roadLightDuration, roadNeighbourCount, roadPassthroughRate = graph.roadLightDuration, graph.roadNeighbourCount, graph.roadPassthroughRate
+    successorOffsets, successorRoads, successorPathwayTime = graph.successorOffsets, graph.successorRoads, graph.successorPathwayTime
+    landmarks = graph.landmarks
+    if landmarks is not None:
+        forwardByRoad, backwardByRoad = landmarks.forwardByRoad, landmarks.backwardByRoad
+
+    tiebreaker = 0 # tiebreaker value for when all costs are equal
+
+    # Per-road arrays of the search workspace of this thread, a new generation invalidates the entries of previous searches
+    workspace = getSearchWorkspace(graph)
+    generation = workspace.begin()
+
+    # Array that maps the start node of each road to their fcost, entries are valid if fcost_stamp[roadID] == generation
+    node_fcost, fcost_stamp = workspace.fcost, workspace.fcostStamp
+
+    # Arrays that store the previous node and ABSOLUTE time cost of the start and end node of each road
+    previous_start = workspace.previousStart # previous_start[roadID] => roadID of the road whose end leads here (see fcost_stamp)
+    previous_end, previous_end_stamp = workspace.previousEnd, workspace.previousEndStamp # previous_end[roadID] => (position entered at, absolute time)
+    destination_previous: tuple[int, float, float] = None # (roadID, position, absolute time) of the destination
+    # NOTE: normalised position is used to handle roads where startPosReal and endPosReal are equal
+    # NOTE: ABSOLUTE time is needed to prevent time desync within reservation table
+    
+    # Calculate real destination position
+    destination_real_position = graph.real_position(destination_roadID, destination_position)
+    destination_x, destination_y = destination_real_position
+
+    # If landmarks were precomputed, the ALT bound replaces the manhattan distance heuristic
+    if landmarks is not None:
+        destination_forward, destination_backward = forwardByRoad[destination_roadID], backwardByRoad[destination_roadID]
+        destination_tail = euclideanDistance(
+            roadStartPos[destination_roadID], 
+            destination_real_position
+        ) / roadSpeed[destination_roadID] # time from the start of the destination road to the destination
+
+    # Nodes are the starting points of each road, can also be the starting point of the vehicle
+    open_nodes = OPEN_LISTS[openList]() # Open is a priority queue, see OpenList
+    push, pop = open_nodes.push, open_nodes.pop
+    closed_start = workspace.closedStartStamp # closed_start[roadID] == generation => start node of the road is closed
+    closed_end = workspace.closedEndStamp # closed_end[roadID] == generation => end node of the road is closed
+
+    # Calculate the cost variables of the starting position
+    gcost = 0
+    real_position = graph.real_position(start_roadID, start_position)
+    hcost = (abs(real_position[0] - destination_x) + abs(real_position[1] - destination_y)) / MAX_ROAD_SPEED_MPS
+    fcost = gcost + hcost
+
+    # Add starting position of the vehicle to open_nodes
+    start_node = (fcost, hcost, gcost, tiebreaker, start_roadID, start_position)
+    tiebreaker += 1
+    push(start_node) 
+    heap_pushes, stale_pops = 1, 0 # search counters, nodes popped are the nodes pushed but no longer in open_nodes
+    reservation_reads, traffic_light_wait = 0, 0
+
+    while True: # loop until target point has been reached
+
+        # Explore the node with the lowest fcost (hcost is tiebreaker)
+        try:
+            fcost, hcost, gcost, tb, roadID, position = pop()
+        except IndexError:
+            return None # path does not exist
+
+        # Add current to closed nodes
+        if position == 0:
+            closed_start[roadID] = generation
+        elif position == 1:
+            closed_end[roadID] = generation
+
+        # If destination is same as current position (by chance) then skip this vehicle
+        if roadID == destination_roadID and position == destination_position:
+            break
+
+        # If destination is on the same road in front of the current position then calculate single instruction
+        if roadID == destination_roadID and position < destination_position:
+            time_taken = euclideanDistance(
+                graph.real_position(roadID, position),
+                destination_real_position
+            ) / roadSpeed[roadID] # fastest time estimation from start of the road to the destination
+            destination_previous = (roadID, position, gcost + time_taken)
+            break
+
+        if closed_end[roadID] == generation: # if current road is the starting road, skip
+            stale_pops += 1
+            continue
 
-            # Initiate time cost of reaching road end node (ignoring traffic lights)
+        # Otherwise, create instruction to move to the end of the road as there is no other choice
+        # Initiate time cost of reaching road end node (ignoring traffic lights & any congestion)
+        if position == 0:
+            time_taken = roadTraversalTime[roadID]
+        else:
             time_taken = euclideanDistance(
-                real_position,
-                roadEndPosition
-            ) / road.speedLimit_MPS
-
-            # Set previous node of road end node to road start node
-            previous_node[(road.roadID, 1)] = (road.roadID, position)
-
-            # Add road end to closed nodes
-            closed_nodes.add((road, 1))
-
-            # Update variables
-            position = 1
-            real_position = roadEndPosition
-            gcost += time_taken
-            hcost = manhattanDistance(
-                real_position, 
-                destination_position
-            ) / MAX_ROAD_SPEED_MPS
-            fcost = gcost + hcost
-
-            # Examine neighbours
-            for neighbour_intersection in road_end_intersection.neighbours:
-
-                # No U turns allowed
-                if neighbour_intersection == road_start_intersection:
-                    continue
+                graph.real_position(roadID, position),
+                roadEndPos[roadID]
+            ) / roadSpeed[roadID]
+
+        # Compute waiting time until the next green light
+        light_cycle = roadLightCycle[roadID]
+        if light_cycle: # only intersections with three or more roads have traffic lights
+            current_modulus_time = gcost % light_cycle
+            waiting_time = roadWaitTable[roadID][int(current_modulus_time)] - current_modulus_time
+            if waiting_time > 0: # otherwise current time is within the green light duration, allow vehicle through
+                time_taken += waiting_time # update time taken to reflect traffic light waiting time
+                traffic_light_wait += waiting_time
+
+            # Compute cost of reaching road end node (taking congestion into account)
+            reservations = reservation_table.get(roadID, int(gcost))
+            reservation_reads += 1
+            if reads is not None:
+                reads.append((roadID, int(gcost), reservations))
+            time_taken += (
+                reservations
+                // roadPassthroughRate[roadID]
+                * roadLightDuration[roadID] * roadNeighbourCount[roadID]
+            ) # update time taken to reflect the number of traffic light cycles waited
+
+        # Set previous node of road end node to road start node, then add road end to closed nodes
+        previous_end[roadID] = (position, gcost + time_taken)
+        previous_end_stamp[roadID] = generation
+        closed_end[roadID] = generation
+
+        # Update variables
+        gcost += time_taken
+
+        # Examine neighbours
+        for index in range(successorOffsets[roadID], successorOffsets[roadID + 1]):
+
+            neighbour_roadID = successorRoads[index]
+
+            # If neighbour is in closed, skip
+            if closed_start[neighbour_roadID] == generation:
+                continue
 
-                # Store reference to neighbour road for easy reference
-                neighbour_road = landscape.roadmap[road_end_intersection.coordinates()][neighbour_intersection.coordinates()]
-                
-                # If neighbour is in closed, skip
-                if (neighbour_road, 0) in closed_nodes:
-                    continue
-                
-                # Time cost of reaching neighbour node is the traversal time of virtual pathway
-                time_taken = road_end_intersection.intersectionPathways[road_start_intersection][neighbour_intersection].traversalTime     
-                # NOTE: traffic light waiting time is already accounted for by the gcost of reaching road end node
-
-                # Compute all cost values
-                neighbour_gcost = gcost + time_taken
-                neighbour_hcost = manhattanDistance(
-                    neighbour_road.startPosReal, 
-                    destination_position
-                ) / MAX_ROAD_SPEED_MPS
-                neighbour_fcost = neighbour_gcost + neighbour_hcost
-
-                neighbour_node = (neighbour_fcost, neighbour_hcost, neighbour_gcost, tiebreaker, neighbour_road, 0)
-                tiebreaker += 1
-
-                # Push neighbour node into open list if fcost is smaller than the existing cost
-                if neighbour_fcost < node_fcost[(neighbour_road, 0)]:
-                    node_fcost[(neighbour_road, 0)] = neighbour_fcost
-                    previous_node[(neighbour_road.roadID, 0)] = (road.roadID, 1)
-                    heappush(open_nodes, neighbour_node) # it does not matter whether neighbour is already in open list
-
-        # Initiate a list that stores the sequence of (next real position, road ID) for the vehicle
-        route: list[tuple[tuple[float, float], int]] = [] 
-
-        # Initiate traceback variables
-        current_roadID, current_position = vehicle.destinationRoad.roadID, vehicle.destinationPosition
-
-        # Create route using previous_node hashmap
-        while (current_roadID, current_position) in previous_node:
-
-            # Unpack previous node information
-            previous_roadID, previous_position = previous_node[(current_roadID, current_position)]
-            
-            # Append new instruction
-            newRealPos = getRealPositionOnRoad(landscape.roads[current_roadID], current_position)
-            if len(route) > 0 and newRealPos == route[-1][0]:
-                pass # skip dupe coords in double intersections
+            # Time cost of reaching neighbour node is the traversal time of virtual pathway
+            neighbour_gcost = gcost + successorPathwayTime[index]
+            # NOTE: traffic light waiting time is already accounted for by the gcost of reaching road end node
+            if landmarks is None:
+                neighbour_start = roadStartPos[neighbour_roadID]
+                neighbour_hcost = (abs(neighbour_start[0] - destination_x) + abs(neighbour_start[1] - destination_y)) / MAX_ROAD_SPEED_MPS
             else:
-                route.append((newRealPos, current_roadID))
+                neighbour_hcost = max(
+                    0,
+                    max(map(sub, destination_forward, forwardByRoad[neighbour_roadID])),
+                    max(map(sub, backwardByRoad[neighbour_roadID], destination_backward))
+                ) + destination_tail
+            neighbour_fcost = neighbour_gcost + neighbour_hcost
+
+            neighbour_node = (neighbour_fcost, neighbour_hcost, neighbour_gcost, tiebreaker, neighbour_roadID, 0)
+            tiebreaker += 1
+
+            # Push neighbour node into open list if fcost is smaller than the existing cost
+            if fcost_stamp[neighbour_roadID] != generation or neighbour_fcost < node_fcost[neighbour_roadID]:
+                node_fcost[neighbour_roadID] = neighbour_fcost
+                fcost_stamp[neighbour_roadID] = generation
+                previous_start[neighbour_roadID] = roadID
+                push(neighbour_node) # it does not matter whether neighbour is already in open list
+                heap_pushes += 1
+
+    # Initiate a list that stores the sequence of (next real position, road ID) for the vehicle
+    route: list[tuple[tuple[float, float], int]] = [] 
+
+    # Initiate a list that stores the (roadID, start time, end time) time periods during which each road is used
+    reserved_roads: list[tuple[int, int, int]] = []
+
+    # Initiate traceback variables
+    current_roadID, current_position = destination_roadID, destination_position
+    previousTimestamp = -1
+
+    # Create route using the previous node hashmaps
+    while True:
+
+        # Unpack previous node information
+        if (
+            destination_previous is not None 
+            and current_roadID == destination_roadID 
+            and current_position == destination_position
+        ):
+            previous_roadID, previous_position, timestamp = destination_previous
+        elif current_position == 0 and fcost_stamp[current_roadID] == generation:
+            previous_roadID, previous_position, timestamp = previous_start[current_roadID], 1, -1 # skipped to avoid double marking in reservation table
+        elif current_position == 1 and previous_end_stamp[current_roadID] == generation:
+            previous_roadID, (previous_position, timestamp) = current_roadID, previous_end[current_roadID]
+        else:
+            break
+        
+        # Append new instruction
+        newRealPos = graph.real_position(current_roadID, current_position)
+        if len(route) > 0 and newRealPos == route[-1][0]:
+            pass # skip dupe coords in double intersections
+        else:
+            route.append((newRealPos, current_roadID))
 
-            # Update traceback variables
-            current_roadID, current_position = previous_roadID, previous_position
+        # Update congestion status of used road during the usage time period
+        if previousTimestamp == -1:
+            previousTimestamp = timestamp
+        elif timestamp != -1: # skip virtual pathways for reservation table marking
+            reserved_roads.append((previous_roadID, int(timestamp), int(previousTimestamp)))
+            previousTimestamp = timestamp # update previous timestamp
 
-        # Reverse instructions to obtain chronological order
-        route.reverse()
-        # print()
-        # print(route)
+        # Update traceback variables
+        current_roadID, current_position = previous_roadID, previous_position
 
-        # Store computed route in routes list            
-        routes.append(route)
-            
-    return routes
+    # Reverse instructions to obtain chronological order
+    route.reverse()
 
-def sortVehicles(autoflow_vehicles: list[Vehicle]):
-    """
-    Sorts vehicles based on a priority function.
-    """
-    return sorted(
-        autoflow_vehicles,
-        key = lambda vehicle: (
-            vehicle.passengerCount * manhattanDistance(
-                getRealPositionOnRoad(vehicle.road, vehicle.position),
-                getRealPositionOnRoad(vehicle.destinationRoad, vehicle.destinationPosition)
-            ),
-            vehicle.emissionRate
-        ),
-        reverse=True
-    )
+    if stats is not None:
+        stats["nodesPopped"] = heap_pushes - len(open_nodes)
+        stats["heapPushes"] = heap_pushes
+        stats["stalePops"] = stale_pops
+        stats["closedSetSize"] = workspace.closed_count()
+        stats["reservationReads"] = reservation_reads
+        stats["reservationWrites"] = len(reserved_roads)
+        stats["trafficLightWait"] = traffic_light_wait
 
-def computeAutoflowVehicleRoutes(autoflow_vehicles: list[Vehicle], landscape: Landscape, MAX_ROAD_SPEED_MPS: float, carPositions = {}) -> list[list[tuple[float, float]]]:
+    return route, reserved_roads
+
+
+def computeAutoflowVehicleRoutes(autoflow_vehicles: list[Vehicle], landscape: Landscape, MAX_ROAD_SPEED_MPS: float, carPositions = {}, workers: int = 1, batchSize: int = 64, stats: RoutingStats = None, openList: str = "heap", priorityModel: PriorityModel = None, zones: tuple[int, int] = None, zoneTransport: str = "pipe", replanningState: "ReplanningState" = None) -> RouteSet:
     """
     AutoFlow vehicles perform cooperative A* with awareness of other AutoFlow vehicles.
-    Vehicle priorities are determined by pre-trained gradient boosted regression trees.
+    Vehicle priorities are determined by pre-trained gradient boosted regression trees if priorityModel is given,
+    otherwise by the default formula, see sortVehicles.
 
     A space-time reservation table is used to keeps track of the number of vehicles on each road
     at any timestamp (in seconds). This greatly enhances the accuracy of cost functions when
     evaluating which path to take, as more congested roads would take longer to traverse.    
 
-    Each node is a tuple that stores (fcost, hcost, gcost, tiebreaker, road, position).
+    The search runs on the compiled road graph of the landscape, roads are referred to by roadID.
+    Each node is a tuple that stores (fcost, hcost, gcost, tiebreaker, roadID, position).
     - fcost: sum of gcost and hcost, node with lowest fcost will be evaluated first
-    - hcost: optimistic approximate time required to reach destination using MAX_ROAD_SPEED
+    - hcost: optimistic approximate time required to reach destination using MAX_ROAD_SPEED, or the ALT bound if landmarks were precomputed
     - gcost: cost so far i.e. time taken so far, represents the ABSOLUTE time
     - tiebreaker: an unique integer used as a tiebreaker when all costs are equal
 
     Every node pushed into the Open list will be the start of a road (or the starting position of the vehicle).
     The Closed list contains all visited nodes (including end points of a road as well as the starting position).
+
+    If workers > 1, batches of batchSize vehicles are planned speculatively by a process pool, against the reservation
+    table left by the previous batches (shared with the workers, see SharedReservationTable). Routes are then committed
+    in priority order, and a vehicle is replanned if an earlier commit changed any part of the table its search read.
+    The resulting routes are therefore identical to the serial ones.
+
+    If zones = (zonesX, zonesY) is given, the landscape is split into rectangular zones instead, each planned by its own
+    worker process that only keeps its part of the reservation table, see computeZonedAutoflowVehicleRoutes.
+    zoneTransport is "pipe" or "socket", see ZoneSharding.
+
+    If replanningState (a new ReplanningState) is given, the reservations of every vehicle are made in its reservation
+    table on behalf of the vehicle, and the routes are recorded as sent by the bridge, so that the first tick of
+    recalculateRoutes only replans the vehicles affected by changes. Only the serial planner supports it.
+
+    Routes are returned as a RouteSet, in order of vehicle id.
+    If stats is given, the search counters of every vehicle are added to it, see RoutingStats.
+    openList selects the Open list of the searches, see OpenList.OPEN_LISTS.
     """
 
+    if replanningState is not None and (workers > 1 or (zones is not None and zones[0] * zones[1] > 1)):
+        raise ValueError("replanningState is only supported by the serial planner")
+
+    graph = getRoadGraph(landscape)
+
     routes: dict[int, list[tuple[tuple[float, float], int]]] = {}
 
     # Sort the list of vehicles
-    autoflow_vehicles = sortVehicles(autoflow_vehicles)
+    autoflow_vehicles = sortVehicles(autoflow_vehicles, graph, priorityModel)
+
+    if zones is not None and zones[0] * zones[1] > 1:
+        routes = computeZonedAutoflowVehicleRoutes(
+            autoflow_vehicles, landscape, graph, MAX_ROAD_SPEED_MPS, carPositions, zones, zoneTransport, batchSize, stats, openList
+        )
+        routes = dict(sorted(routes.items()))
+        return RouteSet.from_routes(list(routes.keys()), list(routes.values()))
 
 
     #delayFactor = len(landscape.roads) // max(landscape.xSize, landscape.ySize)
@@ -287,8 +1071,17 @@ def computeAutoflowVehicleRoutes(autoflow_vehicles: list[Vehicle], landscape: La
     # print("DF:", delayFactor, "CC:", congestionCost)
 
     # Set up space-time reservation table 
-    reservation_table: dict[int, dict[int, int]] = defaultdict(lambda: defaultdict(int))
-    # reservation_table[roadID][timestamp in seconds] => number of vehicles on road at timestamp
+    if replanningState is not None:
+        reservation_table = replanningState.reservation_table
+    else:
+        reservation_table = SharedReservationTable(graph.roadCount) if workers > 1 else ReservationTable(graph.roadCount)
+    # reservation_table.get(roadID, timestamp in seconds) => number of vehicles on road at timestamp
+
+    def reserve(vehicle: Vehicle, roadID: int, startTime: int, endTime: int) -> None:
+        if replanningState is not None:
+            reservation_table.reserve_vehicle(vehicle.id, roadID, startTime, endTime, congestionCost)
+        else:
+            reservation_table.reserve(roadID, startTime, endTime, congestionCost)
 
     # populate reservation table, since every car needs to get to the end of its spawn road
     for vehicle in autoflow_vehicles:
@@ -297,258 +1090,284 @@ def computeAutoflowVehicleRoutes(autoflow_vehicles: list[Vehicle], landscape: La
         lengthRemaining = vehicle.road.length * positionRemaining
         timeTaken = lengthRemaining / vehicle.road.speedLimit_MPS
 
-        for timestamp in range(ceil(timeTaken)):
-            reservation_table[vehicle.road.roadID][timestamp] += congestionCost
+        reserve(vehicle, vehicle.road.roadID, 0, ceil(timeTaken))
 
-    for vehicle in autoflow_vehicles:
-
-        if vehicle.destinationRealPosition == vehicle.startRealPosition:
-            routes[vehicle.id] = []
-            continue
-
-        tiebreaker = 0 # tiebreaker value for when all costs are equal
+    def commitRoute(vehicle: Vehicle, plan: tuple[list[tuple[tuple[float, float], int]], list[tuple[int, int, int]]], searchStats: dict = None) -> None:
+        """
+        Stores the route of the vehicle and updates the congestion status of its roads in the reservation table.
+        """
+        if stats is not None:
+            searchStats["routeLength"] = 0 if plan is None else len(plan[0])
+            stats.record("autoflow", "cooperative A*", vehicle.id, searchStats)
 
-        # Hashmap that maps each node to their fcost
-        node_fcost: dict[tuple[int, int], float] = defaultdict(lambda: float("inf"))
+        if plan is None:
+            if carPositions == {}:
+                raise Exception("Path does not exist")
+            route = carPositions[vehicle.id]["Routes"]
+            routes[vehicle.id] = [((round(x[0]), round(x[1])), x[2]) for x in route]
+            return
 
-        # Hashmap that stores the previous node, road index in landscape.roads and ABSOLUTE time cost of each node
-        previous_node: dict[tuple[int, float], tuple[int, float, float]] = {}
-        # previous_node[(roadID, normalised position)] => (roadID, normalised position, absolute time)
-        # NOTE: normalised position is used to handle roads where startPosReal and endPosReal are equal
-        # NOTE: ABSOLUTE time is needed to prevent time desync within reservation table
-        
-        # Calculate real destination position
-        destination_position = getRealPositionOnRoad(vehicle.destinationRoad, vehicle.destinationPosition)
-
-        # Nodes are the starting points of each road, can also be the starting point of the vehicle
-        open_nodes: list[float, float, float, Road, float] = [] # Open is a priority queue
-        closed_nodes: set[tuple(Road, float)] = set() # Closed can just be a set
-
-        # Calculate the cost variables of the starting position
-        gcost = 0
-        hcost = manhattanDistance(
-            getRealPositionOnRoad(vehicle.road, vehicle.position), 
-            destination_position
-        ) / MAX_ROAD_SPEED_MPS
-        fcost = gcost + hcost
-
-        # Add starting position of the vehicle to open_nodes
-        start_node = (fcost, hcost, gcost, tiebreaker, vehicle.road, vehicle.position)
-        tiebreaker += 1
-        heappush(open_nodes, start_node) 
-
-        broken = False
-
-        while True: # loop until target point has been reached
-
-            if len(open_nodes) == 0:
-                if carPositions == {}:
-                    raise Exception("Path does not exist")
-                else:
-                    broken = True
-                    route = carPositions[vehicle.id]["Routes"]
-                    route = [((round(x[0]), round(x[1])), x[2]) for x in route]
-                    routes[vehicle.id] = route
-                    break
+        route, reserved_roads = plan
+        for roadID, startTime, endTime in reserved_roads:
+            reserve(vehicle, roadID, startTime, endTime)
+        routes[vehicle.id] = route
 
-            # Explore the node with the lowest fcost (hcost is tiebreaker)
-            fcost, hcost, gcost, tb, road, position = heappop(open_nodes)
-            real_position = getRealPositionOnRoad(road, position)
+    if workers <= 1:
+        for vehicle in autoflow_vehicles:
 
-            # Add current to closed_nodes
-            closed_nodes.add((road, position))
+            if vehicle.destinationRealPosition == vehicle.startRealPosition:
+                routes[vehicle.id] = []
+                continue
 
-            # If destination is same as current position (by chance) then skip this vehicle
-            if road == vehicle.destinationRoad and position == vehicle.destinationPosition:
-                break
+            searchStats = {} if stats is not None else None
+            startTime = perf_counter() if stats is not None else 0
+            plan = planAutoflowRoute(
+                graph, reservation_table, 
+                vehicle.road.roadID, vehicle.position, 
+                vehicle.destinationRoad.roadID, vehicle.destinationPosition, 
+                MAX_ROAD_SPEED_MPS, stats=searchStats, openList=openList
+            )
+            if stats is not None:
+                searchStats["wallTime"] = perf_counter() - startTime
+            commitRoute(vehicle, plan, searchStats)
+
+    else:
+        try:
+            with ProcessPoolExecutor(
+                max_workers=workers, 
+                mp_context=getWorkerContext(),
+                initializer=initialiseRoutingWorker, 
+                initargs=(graph,)
+            ) as executor:
+                for batchStart in range(0, len(autoflow_vehicles), batchSize):
+                    batch = autoflow_vehicles[batchStart:batchStart + batchSize]
+
+                    # Plan the batch speculatively, vehicles are dealt to workers in priority order
+                    tasks: list[list[tuple[int, int, float, int, float]]] = [[] for i in range(workers)]
+                    for index, vehicle in enumerate(batch):
+                        if vehicle.destinationRealPosition == vehicle.startRealPosition:
+                            continue
+                        tasks[index % workers].append((
+                            index, 
+                            vehicle.road.roadID, vehicle.position, 
+                            vehicle.destinationRoad.roadID, vehicle.destinationPosition
+                        ))
+                    futures = [
+                        executor.submit(
+                            planAutoflowRoutesInWorker, 
+                            reservation_table.sharedName, graph.roadCount, reservation_table.horizon, 
+                            task, MAX_ROAD_SPEED_MPS, stats is not None, openList
+                        ) 
+                        for task in tasks if task
+                    ]
+                    plans = {}
+                    for future in futures:
+                        plans.update(future.result())
+
+                    # Commit in priority order, replanning vehicles that conflict with an earlier commit
+                    for index, vehicle in enumerate(batch):
+
+                        if vehicle.destinationRealPosition == vehicle.startRealPosition:
+                            routes[vehicle.id] = []
+                            continue
+
+                        plan, reads, searchStats = plans[index]
+                        if any(reservation_table.get(roadID, timestamp) != reservations for roadID, timestamp, reservations in reads):
+                            # Counters of the replanned search replace the speculative ones, both searches are timed
+                            speculativeTime = searchStats["wallTime"] if stats is not None else 0
+                            searchStats = {} if stats is not None else None
+                            startTime = perf_counter() if stats is not None else 0
+                            plan = planAutoflowRoute(
+                                graph, reservation_table, 
+                                vehicle.road.roadID, vehicle.position, 
+                                vehicle.destinationRoad.roadID, vehicle.destinationPosition, 
+                                MAX_ROAD_SPEED_MPS, stats=searchStats, openList=openList
+                            )
+                            if stats is not None:
+                                searchStats["wallTime"] = speculativeTime + perf_counter() - startTime
+                                searchStats["replanned"] = 1
+                        commitRoute(vehicle, plan, searchStats)
+        finally:
+            reservation_table.close()
 
-            # If destination is on the same road in front of the current position then calculate single instruction
-            if road == vehicle.destinationRoad and position < vehicle.destinationPosition:
-                time_taken = euclideanDistance(
-                    real_position,
-                    destination_position
-                ) / road.speedLimit_MPS # fastest time estimation from start of the road to the destination
-                previous_node[(vehicle.destinationRoad.roadID, vehicle.destinationPosition)] = (
-                    road.roadID, position, gcost + time_taken
-                )
-                break
+    # for route in routes:
+    #     print(route)
 
-            if (road, 1) in closed_nodes: # if current road is the starting road, skip
-                continue
+    # for route in routes:
+    #     for i in range(len(route)-1):
+    #         if (
+    #             route[i][0][0] != route[i+1][0][0] and 
+    #             route[i][0][1] != route[i+1][0][1] and 
+    #             euclideanDistance(route[i][0], route[i+1][0]) > 30
+    #         ):
+    #             raise Exception(f"Goals are too far apart: {route[i][0]} and {route[i+1][0]}")
+    
+    routes = dict(sorted(routes.items()))
+    routes = RouteSet.from_routes(list(routes.keys()), list(routes.values()))
 
-            # Otherwise, create instruction to move to the end of the road as there is no other choice
-            roadEndPosition: tuple[float, float] = road.endPosReal
+    # The routes Unity follows, see RouteSet.to_update_message
+    if replanningState is not None:
+        for id, route in routes.items():
+            replanningState.routes[id] = route.waypoints(decimal=True)
 
-            # Store references to road intersection for easy reference
-            road_start_intersection: Intersection = landscape.intersections[road.start]
-            road_end_intersection: Intersection = landscape.intersections[road.end]
+    return routes
 
-            # Initiate time cost of reaching road end node (ignoring traffic lights & any congestion)
-            time_taken = euclideanDistance(
-                real_position,
-                roadEndPosition
-            ) / road.speedLimit_MPS
-
-            # Compute waiting time until the next green light
-            if len(road_end_intersection.neighbours) >= 3:
-                current_modulus_time = gcost % (len(road_end_intersection.neighbours) * road_end_intersection.trafficLightDuration)
-                if (
-                    (road_end_intersection.trafficLightLookup[road_start_intersection] + 1) * road_end_intersection.trafficLightDuration 
-                    > current_modulus_time
-                ):
-                    waiting_time = (
-                        road_end_intersection.trafficLightLookup[road_start_intersection] * road_end_intersection.trafficLightDuration 
-                        - current_modulus_time
-                    )
-                    if waiting_time > 0: # Case 1: current time is earlier in the cycle
-                        pass
-                    else: # Case 2: current time is within the green light duration, allow vehicle through
-                        waiting_time = 0
-                else: # Case 3: current time is later in the cycle
-                    waiting_time = (
-                        len(road_end_intersection.neighbours) * road_end_intersection.trafficLightDuration
-                        - current_modulus_time 
-                        + road_end_intersection.trafficLightLookup[road_start_intersection] * road_end_intersection.trafficLightDuration
-                    )
-                time_taken += waiting_time # update time taken to reflect traffic light waiting time
+def computeZonedAutoflowVehicleRoutes(autoflow_vehicles: list[Vehicle], landscape: Landscape, graph: RoadGraph, MAX_ROAD_SPEED_MPS: float, carPositions: dict, zones: tuple[int, int], transport: str, batchSize: int, stats: RoutingStats, openList: str) -> dict[int, list[tuple[tuple[float, float], int]]]:
+    """
+    Geographically sharded version of computeAutoflowVehicleRoutes, see ZoneSharding.
+    autoflow_vehicles must already be sorted by priority. Returns {vehicle id: route}.
 
-                # Compute cost of reaching road end node (taking congestion into account)
-                time_taken += (
-                    reservation_table[road.roadID][int(gcost)]
-                    // road_end_intersection.trafficPassthroughRate[road_start_intersection]
-                    * road_end_intersection.trafficLightDuration * len(road_end_intersection.neighbours)
-                ) # update time taken to reflect the number of traffic light cycles waited
-                # print(reservation_table[road.roadID][int(gcost)])
-                # print(road_end_intersection.trafficPassthroughRate[road_start_intersection])
-                # print(road_end_intersection.trafficLightDuration)
-                # print(road.speedLimit_MPS)
-                # print()
-                # print((
-                #     reservation_table[road.roadID][int(gcost)]
-                #     // road_end_intersection.trafficPassthroughRate[road_start_intersection]
-                #     * road_end_intersection.trafficLightDuration
-                # ))
-
-            # Set previous node of road end node to road start node
-            previous_node[(road.roadID, 1)] = (
-                road.roadID, position, gcost + time_taken
-            )
+    Each vehicle is planned by the zone its starting road belongs to. Vehicles are dealt to the zones in windows of
+    batchSize * zone count vehicles in priority order, and boundary reservations are exchanged between windows.
+    Routes are close to, but not identical to, the routes of the single table planner, as a zone sees the reservations
+    of other zones on its roads up to one window late and sees no reservations on roads outside its halo.
+    """
+    congestionCost = 1
+    partition = ZonePartition(landscape, *zones)
+    routes: dict[int, list[tuple[tuple[float, float], int]]] = {}
 
-            # Add road end to closed nodes
-            closed_nodes.add((road, 1))
+    # Every car needs to get to the end of its spawn road
+    spawn_reservations = []
+    for vehicle in autoflow_vehicles:
+        timeTaken = vehicle.road.length * (1 - vehicle.position) / vehicle.road.speedLimit_MPS
+        spawn_reservations.append((vehicle.road.roadID, 0, ceil(timeTaken), congestionCost))
 
-            # Update variables
-            position = 1
-            real_position = roadEndPosition
-            gcost += time_taken
-            hcost = manhattanDistance(
-                real_position, 
-                destination_position
-            ) / MAX_ROAD_SPEED_MPS
-            fcost = gcost + hcost
+    with ZoneCoordinator(partition, serveZone, getWorkerContext(), transport) as coordinator:
+        coordinator.start(graph, MAX_ROAD_SPEED_MPS, congestionCost, stats is not None, openList)
+        coordinator.reserve(spawn_reservations)
 
-            # Examine neighbours
-            for neighbour_intersection in road_end_intersection.neighbours:
+        windowSize = batchSize * partition.zoneCount
+        for windowStart in range(0, len(autoflow_vehicles), windowSize):
+            window = autoflow_vehicles[windowStart:windowStart + windowSize]
 
-                # No U turns allowed
-                if neighbour_intersection == road_start_intersection:
+            tasks: dict[int, list[tuple[int, int, float, int, float]]] = defaultdict(list)
+            for index, vehicle in enumerate(window):
+                if vehicle.destinationRealPosition == vehicle.startRealPosition:
                     continue
-
-                # Store reference to neighbour road for easy reference
-                neighbour_road = landscape.roadmap[road_end_intersection.coordinates()][neighbour_intersection.coordinates()]
-                
-                # If neighbour is in closed, skip
-                if (neighbour_road, 0) in closed_nodes:
+                tasks[partition.zoneOfRoad[vehicle.road.roadID]].append((
+                    index, 
+                    vehicle.road.roadID, vehicle.position, 
+                    vehicle.destinationRoad.roadID, vehicle.destinationPosition
+                ))
+
+            plans: dict[int, RouteView] = {}
+            searchStats: dict[int, dict] = {}
+            for zoneRoutes, failed, records in coordinator.plan(tasks).values():
+                plans.update(zip(zoneRoutes.keys(), zoneRoutes))
+                plans.update((index, None) for index in failed)
+                searchStats.update(records)
+
+            # Store routes in priority order, like commitRoute
+            for index, vehicle in enumerate(window):
+                if vehicle.destinationRealPosition == vehicle.startRealPosition:
+                    routes[vehicle.id] = []
                     continue
-                
-                # Time cost of reaching neighbour node is the traversal time of virtual pathway
-                time_taken = road_end_intersection.intersectionPathways[road_start_intersection][neighbour_intersection].traversalTime     
-                # NOTE: traffic light waiting time is already accounted for by the gcost of reaching road end node
-
-                # Compute all cost values
-                neighbour_gcost = gcost + time_taken
-                neighbour_hcost = manhattanDistance(
-                    neighbour_road.startPosReal, 
-                    destination_position
-                ) / MAX_ROAD_SPEED_MPS
-                neighbour_fcost = neighbour_gcost + neighbour_hcost
-
-                neighbour_node = (neighbour_fcost, neighbour_hcost, neighbour_gcost, tiebreaker, neighbour_road, 0)
-                tiebreaker += 1
-
-                # Push neighbour node into open list if fcost is smaller than the existing cost
-                if neighbour_fcost < node_fcost[(neighbour_road, 0)]:
-                    node_fcost[(neighbour_road, 0)] = neighbour_fcost
-                    previous_node[(neighbour_road.roadID, 0)] = (
-                        road.roadID, 1, -1 # skipped to avoid double marking in reservation table
-                    )
-                    heappush(open_nodes, neighbour_node) # it does not matter whether neighbour is already in open list
 
-        if broken:
-            continue
-        # Initiate a list that stores the sequence of (next real position, road ID) for the vehicle
-        route: list[tuple[tuple[float, float], int]] = [] 
+                route = plans[index]
+                if stats is not None:
+                    searchStats[index]["routeLength"] = 0 if route is None else len(route)
+                    stats.record("autoflow", "zoned cooperative A*", vehicle.id, searchStats[index])
+
+                if route is None:
+                    if carPositions == {}:
+                        raise Exception("Path does not exist")
+                    route = carPositions[vehicle.id]["Routes"]
+                    routes[vehicle.id] = [((round(x[0]), round(x[1])), x[2]) for x in route]
+                    continue
+                routes[vehicle.id] = route.to_list()
 
-        # Initiate traceback variables
-        current_roadID, current_position = vehicle.destinationRoad.roadID, vehicle.destinationPosition
-        previousTimestamp = -1
+    return routes
 
-        # Create route using previous_node hashmap
-        while (current_roadID, current_position) in previous_node:
 
-            # Unpack previous node information
-            previous_roadID, previous_position, timestamp = previous_node[(current_roadID, current_position)]
-            
-            # Append new instruction
-            newRealPos = getRealPositionOnRoad(landscape.roads[current_roadID], current_position)
-            if len(route) > 0 and newRealPos == route[-1][0]:
-                pass # skip dupe coords in double intersections
-            else:
-                route.append((newRealPos, current_roadID))
+class ReplanningState:
 
-            # Update congestion status of used road during the usage time period
-            if previousTimestamp == -1:
-                previousTimestamp = timestamp
-            elif timestamp != -1: # skip virtual pathways for reservation table marking
-                for i in range(int(timestamp), int(previousTimestamp)):
-                    reservation_table[previous_roadID][i] += congestionCost              
-                previousTimestamp = timestamp # update previous timestamp
+    """
+    State of a replanning session, kept by recalculateRoutes between ticks.
+    Every session (e.g. every bridge connection) owns its state and passes it to every tick explicitly,
+    it can be seeded with the initial routes and reservations, see computeAutoflowVehicleRoutes.
+    - reservation_table: reservations of every AutoFlow vehicle, its clock is the time in seconds since the routes were computed
+    - routes: remaining route sent to each AutoFlow vehicle, as a list of (x, y, roadID)
+    - pending: vehicles that needed a new route but were skipped as the time budget ran out, replanned on the next tick
+    - skippedCount: number of vehicles skipped on the last tick
+    """
 
-            # Update traceback variables
-            current_roadID, current_position = previous_roadID, previous_position
+    def __init__(self, roadCount: int) -> None:
+        self.reservation_table = PersistentReservationTable(roadCount)
+        self.routes: dict[int, list[tuple[float, float, int]]] = {}
+        self.pending: set[int] = set()
+        self.skippedCount = 0
 
-        # Reverse instructions to obtain chronological order
-        route.reverse()
-        # print()
-        # print(route)
 
-        # Store computed route in routes list                
-        routes[vehicle.id] = route
+def markChangedRegion(changedRegions: dict[int, list[tuple[int, int]]], footprint: list[tuple[int, int, int, int]]) -> None:
+    """
+    Marks the time periods reserved by a vehicle as changed, see PersistentReservationTable.reservations.
+    """
+    for roadID, startTime, endTime, amount in footprint:
+        changedRegions[roadID].append((startTime, endTime))
 
-    # for route in routes:
-    #     print(route)
+def overlapsChangedRegion(changedRegions: dict[int, list[tuple[int, int]]], footprint: list[tuple[int, int, int, int]], clock: int) -> bool:
+    """
+    Checks whether any remaining time period reserved by a vehicle overlaps a changed time period of the same road.
+    """
+    for roadID, startTime, endTime, amount in footprint:
+        if endTime <= clock or roadID not in changedRegions:
+            continue
+        for changedStartTime, changedEndTime in changedRegions[roadID]:
+            if startTime < changedEndTime and changedStartTime < endTime:
+                return True
+    return False
 
-    # for route in routes:
-    #     for i in range(len(route)-1):
-    #         if (
-    #             route[i][0][0] != route[i+1][0][0] and 
-    #             route[i][0][1] != route[i+1][0][1] and 
-    #             euclideanDistance(route[i][0], route[i+1][0]) > 30
-    #         ):
-    #             raise Exception(f"Goals are too far apart: {route[i][0]} and {route[i+1][0]}")
-    
-    routes = dict(sorted(routes.items()))
-    newRoutes = [routes[k] for k in routes.keys()]
+def isFollowingRoute(remainingRoute: list[tuple[float, float, int]], previousRoute: list[tuple[float, float, int]]) -> bool:
+    """
+    Checks whether the remaining route of a vehicle is what is left of the route it was sent on the previous tick.
+    """
+    if len(remainingRoute) > len(previousRoute):
+        return False
+    offset = len(previousRoute) - len(remainingRoute)
+    return all(tuple(remainingRoute[i]) == tuple(previousRoute[offset + i]) for i in range(len(remainingRoute)))
 
-    return newRoutes
+def isFollowingReservations(footprint: list[tuple[int, int, int, int]], remainingRoute: list[tuple[float, float, int]], currentRoadID: int, clock: int, slack: int) -> bool:
+    """
+    Checks whether a vehicle is within slack seconds of the time periods it reserved, i.e. it has not:
+    - fallen behind, by still having to use a road whose reservation has ended
+    - moved ahead, by being on a road whose reservations have not started yet
+    A vehicle can reserve its current road more than once, e.g. to get to the end of it and then to wait on it.
+    """
+    remainingRoads = {waypoint[2] for waypoint in remainingRoute}
+    currentRoadStartTimes = []
+    for roadID, startTime, endTime, amount in footprint:
+        if endTime < clock - slack and roadID in remainingRoads and roadID != currentRoadID:
+            return False
+        if roadID == currentRoadID:
+            currentRoadStartTimes.append(startTime)
+    return not currentRoadStartTimes or min(currentRoadStartTimes) <= clock + slack
 
 
-def recalculateRoutes(carPositions, landscape : Landscape, vehicles : list[Vehicle], MAX_ROAD_SPEED_MPS, update_interval : int):
+def recalculateRoutes(carPositions, landscape : Landscape, vehicles : list[Vehicle], MAX_ROAD_SPEED_MPS, update_interval : int, timeBudget : float = None, stats : RoutingStats = None, openList : str = "heap", priorityModel : PriorityModel = None, state : ReplanningState = None) -> RouteSet:
     """
     Periodically recalculates routes optimally
 
+    state is the ReplanningState of the session, every tick advances its clock by update_interval seconds.
+    Routes are only recalculated for vehicles affected by a change since the previous tick of the session:
+    - vehicles that entered the simulation (without a state, every vehicle is new)
+    - vehicles that deviated from the route they were sent, or from the time periods they reserved
+    - vehicles whose remaining reservations overlap a road during a time period that changed, i.e. one that was 
+      reserved by a vehicle that arrived at its destination, deviated or was given a new route earlier in this tick
+    All other vehicles keep their remaining route verbatim.
+    Routes are recalculated in priority order (see sortVehicles, and priorityModel) against the reservations of every other vehicle.
+
+    If timeBudget (in seconds) is given, vehicles that are reached after the time budget ran out keep their
+    current route and reservations, and are replanned on the next tick. The number of skipped vehicles is stored in
+    state.skippedCount.
+
+    Returns a RouteSet of (x, y) positions and roadIDs for every vehicle in carPositions.
+    If stats is given, the search counters of every replanned vehicle are added to it, see RoutingStats.
+    openList selects the Open list of the searches, see OpenList.OPEN_LISTS.
+
     Best runtime: 1s
     """
+    deadline = None if timeBudget is None else perf_counter() + timeBudget
+
     assert len(carPositions) == len(vehicles)
 
     specialCases = {}
@@ -595,15 +1414,102 @@ def recalculateRoutes(carPositions, landscape : Landscape, vehicles : list[Vehic
             
             vehicle.setLocation(landscape.lookupRoad[roadID], landscape.lookupRoad[roadID].get_position(x, y))
 
-    vehicles = [vehicles[i] for i in vehicles.keys()]
-    newRoutes = computeRoutes([], vehicles, landscape, MAX_ROAD_SPEED_MPS, carPositions=carPositions)
+    graph = getRoadGraph(landscape)
+    congestionCost = 1
+
+    # Advance the clock of the session, a tick without a session replans every vehicle
+    if state is None:
+        state = ReplanningState(graph.roadCount)
+    else:
+        state.reservation_table.advance(state.reservation_table.clock + update_interval)
+    reservation_table = state.reservation_table
+    clock = reservation_table.clock
+
+    # changedRegions[roadID] => list of (start time, end time) changed time periods, in simulation time
+    changedRegions: dict[int, list[tuple[int, int]]] = defaultdict(list)
+
+    # Vehicles that arrived or left the simulation release their reservations
+    for id in list(reservation_table.vehicleReservations.keys()):
+        if id in specialCases or id not in carPositions:
+            markChangedRegion(changedRegions, reservation_table.withdraw(id))
+            state.routes.pop(id, None)
+
+    # Vehicles that entered the simulation or deviated have to be replanned
+    # Their reservations are only replaced once they are replanned, see below
+    replannedIDs: set[int] = set()
+    for id, data in carPositions.items():
+        if id in specialCases:
+            continue
+        if id not in state.routes:
+            replannedIDs.add(id)
+        elif id in state.pending:
+            replannedIDs.add(id)
+            markChangedRegion(changedRegions, reservation_table.reservations(id))
+        elif (
+            not isFollowingRoute(data["Routes"], state.routes[id]) 
+            or not isFollowingReservations(reservation_table.reservations(id), data["Routes"], data["Metadata"][2], clock, update_interval)
+        ):
+            replannedIDs.add(id)
+            markChangedRegion(changedRegions, reservation_table.reservations(id))
+
+    # Replan vehicles in priority order, vehicles whose new route differs mark the changed time periods for later vehicles
+    newRoutes: dict[int, list[tuple[tuple[float, float], int]]] = {}
+    state.pending = set()
+    for vehicle in sortVehicles([vehicles[id] for id in carPositions.keys() if id not in specialCases], graph, priorityModel):
+        id = vehicle.id
+        if id not in replannedIDs:
+            if not overlapsChangedRegion(changedRegions, reservation_table.reservations(id), clock):
+                continue
+            replannedIDs.add(id)
+
+        # Out of time, the vehicle keeps its current route and reservations until the next tick
+        if deadline is not None and perf_counter() > deadline:
+            state.pending.add(id)
+            continue
+        markChangedRegion(changedRegions, reservation_table.reservations(id))
+
+        # Replace the previous reservations of the vehicle, starting with getting to the end of its current road
+        reservation_table.withdraw(id)
+        timeTaken = vehicle.road.length * (1 - vehicle.position) / vehicle.road.speedLimit_MPS
+        reservation_table.reserve_vehicle(id, vehicle.road.roadID, 0, ceil(timeTaken), congestionCost)
+
+        if vehicle.destinationRealPosition == vehicle.startRealPosition:
+            newRoutes[id] = []
+        else:
+            searchStats = {} if stats is not None else None
+            startTime = perf_counter() if stats is not None else 0
+            plan = planAutoflowRoute(
+                graph, reservation_table, 
+                vehicle.road.roadID, vehicle.position, 
+                vehicle.destinationRoad.roadID, vehicle.destinationPosition, 
+                MAX_ROAD_SPEED_MPS, stats=searchStats, openList=openList
+            )
+            if stats is not None:
+                searchStats["wallTime"] = perf_counter() - startTime
+                searchStats["routeLength"] = 0 if plan is None else len(plan[0])
+                stats.record("autoflow", "cooperative A*", id, searchStats)
+            if plan is None: # path does not exist, keep the current route
+                route = carPositions[id]["Routes"]
+                newRoutes[id] = [((round(x[0]), round(x[1])), x[2]) for x in route]
+            else:
+                newRoutes[id], reserved_roads = plan
+                for roadID, startTime, endTime in reserved_roads:
+                    reservation_table.reserve_vehicle(id, roadID, startTime, endTime, congestionCost)
+
+        markChangedRegion(changedRegions, reservation_table.reservations(id))
+
+    state.skippedCount = len(state.pending)
 
     # replace special case routes, otherwise put routes in the right format
     finalRoutes = {}
-    for id, route in newRoutes.items():
+    routeSet = RouteSetBuilder()
+    for id in carPositions.keys():
         if id in specialCases.keys():
             finalRoutes[id] = specialCases[id]
+        elif id not in newRoutes:
+            finalRoutes[id] = carPositions[id]["Routes"]
         else:
+            route = newRoutes[id]
             temp = buffers[id]
             calculatedRoutes = [(round(x[0][0]), round(x[0][1]), x[1]) for x in route]
 
@@ -620,9 +1526,11 @@ def recalculateRoutes(carPositions, landscape : Landscape, vehicles : list[Vehic
         #     print(carPositions[id]["Routes"])
         #     print()
 
-    
+        if id not in specialCases:
+            state.routes[id] = finalRoutes[id]
+        routeSet.add_waypoints(id, finalRoutes[id])
 
-    return finalRoutes
+    return routeSet.build()
                                      
     
 
@@ -38,6 +38,7 @@ LANDSCAPE_FEATURES = [
 #LANDSCAPE_FILLER = LandPlotDescriptor((2, 2), (1, 1))  # 2x1 randomly oriented land block fillers
 LANDSCAPE_FILLER = LandPlotDescriptor((2, 2), (2, 2), False)  # 2x2 land block fillers
 # VEHICLE_COUNT = 20 # size constraint in place, may not always fit
+USE_CONTRACTION_HIERARCHY = False  # route selfish vehicles with exact contraction hierarchy queries instead of A*
 # =========================================
 
 
@@ -379,14 +380,21 @@ def modify_population(
     return population
 
 landscape.precomputeUnityCache()
+if USE_CONTRACTION_HIERARCHY:
+    precomputeContractionHierarchy(landscape)  # selfish routes only use static costs
 allVehicles = vehicles
 
 def outputToBridge(autoflowPercentage : float) -> tuple[
     dict[int, tuple[float, float, Vehicle]],
     Landscape,
-    dict[int, list[tuple[float, float, float]]],
+    RouteSet,
     list[Vehicle],
+    ReplanningState,
 ]:
+        """
+        Computes the initial routes of a new session, also returns the ReplanningState of the session,
+        which holds the reservations of the initial routes, see recalculateRoutes.
+        """
 
         vehicles = modify_population(allVehicles, autoflowPercentage)
 
@@ -402,23 +410,21 @@ def outputToBridge(autoflowPercentage : float) -> tuple[
         print(len(autoflow_vehicles), "AutoFlow vehicles")
         print(len(selfish_vehicles), "selfish vehicles")
 
+        replanningState = ReplanningState(getRoadGraph(landscape).roadCount)
         routes = computeRoutes(
-            selfish_vehicles, autoflow_vehicles, landscape, MAX_ROAD_SPEED_MPS
+            selfish_vehicles, autoflow_vehicles, landscape, MAX_ROAD_SPEED_MPS,
+            useContractionHierarchy=USE_CONTRACTION_HIERARCHY, replanningState=replanningState
         )
 
-        routes = deepcopy(routes)
-
 
         initPos: dict[int, tuple[float, float, Vehicle]] = {}
         for i, vehicle in enumerate(vehicles):
             pos = getRealPositionOnRoad(vehicle.road, vehicle.position)
             initPos[i] = (pos[0], pos[1], vehicle)
 
-        routes2: dict[int, list[tuple[float, float, float]]] = {}
-        for id, route in routes.items():
-            vehicle = initPos[id][2]
-            routes2[vehicle.id] = [(node[0][0], node[0][1], node[1]) for node in route]
+        # Same routes (the arrays are shared, not copied), keyed by the id of the vehicle they belong to
+        routes2: RouteSet = routes.relabel([initPos[id][2].id for id in routes.keys()])
 
         # print(routes2)
 
-        return (initPos, landscape, routes2, vehicles)
+        return (initPos, landscape, routes2, vehicles, replanningState)
@@ -0,0 +1,430 @@
+"""
+This script contains reproducible benchmarks for the routing algorithms.
+
+Every benchmark seeds the random number generator, generates its own landscape and vehicle agents,
+and does not depend on AutoFlowBridgeCompat (which asks for user input on import).
+
+Usage:
+    python Benchmarks.py landmarks [--size 30] [--vehicles 500] [--landmarks 8] [--seed 1]
+    python Benchmarks.py bidirectional [--size 60] [--vehicles 300] [--seed 1]
+    python Benchmarks.py openlist [--size 60] [--vehicles 1000] [--seed 1]
+    python Benchmarks.py zones [--size 60] [--vehicles 3000] [--zones 2 2] [--transport pipe] [--seed 1]
+    python Benchmarks.py suite [--sizes 15 30 60 100 200] [--densities 5 20 50] [--autoflow 50] [--seed 1] [--output benchmarks.json]
+    python Benchmarks.py compare OLD.json NEW.json
+
+The suite times every stage of a simulation (landscape generation, spawning, routing and recalculation)
+for every landscape size and vehicle density, and writes the results as JSON so they can be compared
+between commits with the compare benchmark. Large landscapes take several minutes per density.
+"""
+
+
+# ================ IMPORTS ================
+from AutoFlow import *
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import time
+import tracemalloc
+
+# =========================================
+
+
+# Same land plot descriptors as AutoFlowBridgeCompat
+COMMERCIAL_BLOCK_LARGE = LandPlotDescriptor((3, 3), (3, 3), False)  # 3x3 land blocks
+LARGE_PARK_AREA = LandPlotDescriptor((4, 6), (4, 6))  # randomly oriented (4-6)x(4-6) park area
+LANDSCAPE_FILLER = LandPlotDescriptor((2, 2), (2, 2), False)  # 2x2 land block fillers
+
+
+# ===============================================================================================
+# Helper Functions
+# ===============================================================================================
+
+def generateLandscape(size: int) -> Landscape:
+    """
+    Generates a square landscape with the same features as AutoFlowBridgeCompat.
+    """
+    landscape = Landscape(size, size)
+    landscape.generate_new_landscape(
+        desiredFeatures=[(COMMERCIAL_BLOCK_LARGE, 1), (LARGE_PARK_AREA, 1)],
+        filler=LANDSCAPE_FILLER,
+    )
+    return landscape
+
+def spawnRandomVehicles(landscape: Landscape, vehicleCount: int, useAutoFlow: bool = False) -> list[Vehicle]:
+    """
+    Spawns vehicles with random starting and destination positions, positions may be shared between vehicles.
+    """
+    roads = [road for road in landscape.roads if road.cellSpan > 0]
+    vehicles: list[Vehicle] = []
+    for id in range(vehicleCount):
+        vehicle = ConventionalVehicle(id, useAutoFlow)
+        road = roads[randint(0, len(roads) - 1)]
+        vehicle.setLocation(road, randint(0, road.cellSpan * 4 - 1) / (road.cellSpan * 4))
+        road = roads[randint(0, len(roads) - 1)]
+        vehicle.setDestination(road, randint(0, road.cellSpan * 4 - 1) / (road.cellSpan * 4))
+        vehicles.append(vehicle)
+    return vehicles
+
+def maxRoadSpeed(landscape: Landscape) -> float:
+    """
+    Returns the highest speed limit of the landscape in m/s.
+    """
+    return max(road.speedLimit_MPS for road in landscape.roads)
+
+def spawnFleet(landscape: Landscape, density: float, autoflowPercentage: float) -> tuple[list[Vehicle], list[Vehicle]]:
+    """
+    Spawns vehicles in the same way as AutoFlowBridgeCompat (without buses), returns (selfish_vehicles, autoflow_vehicles).
+    density is the percentage of positions within the map area used as starting positions,
+    starting and destination positions are never shared between vehicles.
+    """
+    positions: list[tuple[Road, float]] = []
+    for road in landscape.roads:
+        for index in range(road.cellSpan * 4):
+            position = index / (road.cellSpan * 4)
+            realpos = getRealPositionOnRoad(road, position)
+            if (
+                CELL_SIZE_METRES <= realpos[0] <= CELL_SIZE_METRES * (landscape.xSize + 1) 
+                and CELL_SIZE_METRES <= realpos[1] <= CELL_SIZE_METRES * (landscape.ySize + 1)
+            ):
+                positions.append((road, position))
+
+    vehicleCount = int(len(positions) * density / 100)
+    evCount = randint(10, 20) * vehicleCount // 100  # based on real world data
+    autoflowIndexes = set(sample(range(vehicleCount), int(autoflowPercentage * vehicleCount // 100)))
+
+    selfish_vehicles: list[Vehicle] = []
+    autoflow_vehicles: list[Vehicle] = []
+    for id, start, destination in zip(range(vehicleCount), sample(positions, vehicleCount), sample(positions, vehicleCount)):
+        vehicle = ElectricVehicle(id) if id < evCount else ConventionalVehicle(id)
+        vehicle.setLocation(*start)
+        vehicle.setDestination(*destination)
+        if id in autoflowIndexes:
+            vehicle.setRoutingSystem(1)
+            autoflow_vehicles.append(vehicle)
+        else:
+            selfish_vehicles.append(vehicle)
+    return selfish_vehicles, autoflow_vehicles
+
+def simulateCarPositions(graph: RoadGraph, routes: RouteSet, seconds: float) -> dict:
+    """
+    Moves every vehicle along its route for the given number of seconds at the speed limit,
+    returns the car positions in the format sent by Unity, see recalculateRoutes.
+    """
+    carPositions = {}
+    for id, route in routes.items():
+        waypoints = route.waypoints(decimal=True)  # the values Unity receives, see RouteSet.to_update_message
+        timeLeft = seconds
+        index = 0
+        while index < len(waypoints) - 1:
+            (x0, y0, _), (x1, y1, roadID) = waypoints[index], waypoints[index + 1]
+            timeTaken = ((x1 - x0) ** 2 + (y1 - y0) ** 2) ** 0.5 / graph.roadSpeed[roadID]
+            if timeTaken > timeLeft:
+                break
+            timeLeft -= timeTaken
+            index += 1
+        remaining = waypoints[index:]
+        carPositions[id] = {"Routes": remaining, "Metadata": remaining[0] if remaining else (0, 0, -1)}
+    return carPositions
+
+def countNodesExpanded(routingFunction, *args, **kwargs) -> tuple[int, float]:
+    """
+    Runs a routing function and returns (number of nodes popped from the Open list, wall time in seconds).
+    Nodes are counted by the search statistics of the routers, see RoutingStats.
+    """
+    stats = RoutingStats()
+    startTime = time.perf_counter()
+    routingFunction(*args, stats=stats, **kwargs)
+    wallTime = time.perf_counter() - startTime
+
+    return sum(record.get("nodesPopped", 0) for record in stats.records), wallTime
+
+
+# ===============================================================================================
+# Benchmarks
+# ===============================================================================================
+
+def benchmarkLandmarks(size: int, vehicleCount: int, landmarkCount: int, seed: int) -> None:
+    """
+    Compares nodes expanded per vehicle by both routers with the manhattan distance heuristic and the ALT heuristic.
+    """
+    random.seed(seed)
+    landscape = generateLandscape(size)
+    MAX_ROAD_SPEED_MPS = maxRoadSpeed(landscape)
+    selfish_vehicles = spawnRandomVehicles(landscape, vehicleCount)
+    autoflow_vehicles = spawnRandomVehicles(landscape, vehicleCount, useAutoFlow=True)
+    graph = getRoadGraph(landscape)
+
+    print(f"Landscape: {landscape.xSize}x{landscape.ySize} cells, {graph.roadCount} roads, {vehicleCount} vehicles")
+
+    results = {}
+    for heuristic in ["manhattan", "ALT"]:
+        if heuristic == "ALT":
+            startTime = time.perf_counter()
+            precomputeLandmarks(landscape, landmarkCount)
+            print(f"Landmark preprocessing ({landmarkCount} landmarks): {time.perf_counter() - startTime:.3f}s")
+
+        results[heuristic] = (
+            countNodesExpanded(computeSelfishVehicleRoutes, selfish_vehicles, landscape, MAX_ROAD_SPEED_MPS, useCache=False),
+            countNodesExpanded(computeAutoflowVehicleRoutes, autoflow_vehicles, landscape, MAX_ROAD_SPEED_MPS),
+        )
+
+    print(f"{'heuristic':<10} {'router':<9} {'nodes/vehicle':>14} {'time (s)':>9}")
+    for heuristic, routerResults in results.items():
+        for router, (nodesExpanded, wallTime) in zip(["selfish", "AutoFlow"], routerResults):
+            print(f"{heuristic:<10} {router:<9} {nodesExpanded / vehicleCount:>14.1f} {wallTime:>9.3f}")
+
+def benchmarkBidirectional(size: int, vehicleCount: int, seed: int) -> None:
+    """
+    Compares nodes expanded per selfish vehicle by forward A* and bidirectional A*.
+    """
+    random.seed(seed)
+    landscape = generateLandscape(size)
+    MAX_ROAD_SPEED_MPS = maxRoadSpeed(landscape)
+    selfish_vehicles = spawnRandomVehicles(landscape, vehicleCount)
+    graph = getRoadGraph(landscape)
+
+    print(f"Landscape: {landscape.xSize}x{landscape.ySize} cells, {graph.roadCount} roads, {vehicleCount} vehicles")
+
+    print(f"{'search':<14} {'nodes/vehicle':>14} {'time (s)':>9}")
+    for search, bidirectional in [("forward", False), ("bidirectional", True)]:
+        nodesExpanded, wallTime = countNodesExpanded(
+            computeSelfishVehicleRoutes, selfish_vehicles, landscape, MAX_ROAD_SPEED_MPS, 
+            bidirectional=bidirectional, useCache=False
+        )
+        print(f"{search:<14} {nodesExpanded / vehicleCount:>14.1f} {wallTime:>9.3f}")
+
+
+def benchmarkOpenList(size: int, vehicleCount: int, seed: int) -> None:
+    """
+    Compares the routing time of both A* routers with every Open list implementation, see OpenList.
+    Selfish vehicles are routed individually, without the route cache.
+    """
+    random.seed(seed)
+    landscape = generateLandscape(size)
+    MAX_ROAD_SPEED_MPS = maxRoadSpeed(landscape)
+    selfish_vehicles = spawnRandomVehicles(landscape, vehicleCount)
+    autoflow_vehicles = spawnRandomVehicles(landscape, vehicleCount, useAutoFlow=True)
+    graph = getRoadGraph(landscape)
+
+    print(f"Landscape: {landscape.xSize}x{landscape.ySize} cells, {graph.roadCount} roads, {vehicleCount} vehicles")
+
+    print(f"{'open list':<10} {'selfish (s)':>12} {'AutoFlow (s)':>13}")
+    for openList in OPEN_LISTS:
+        startTime = time.perf_counter()
+        computeSelfishVehicleRoutes(
+            selfish_vehicles, landscape, MAX_ROAD_SPEED_MPS, 
+            useCache=False, openList=openList
+        )
+        selfishTime = time.perf_counter() - startTime
+        startTime = time.perf_counter()
+        computeAutoflowVehicleRoutes(autoflow_vehicles, landscape, MAX_ROAD_SPEED_MPS, openList=openList)
+        autoflowTime = time.perf_counter() - startTime
+        print(f"{openList:<10} {selfishTime:>12.3f} {autoflowTime:>13.3f}")
+
+def benchmarkZones(size: int, vehicleCount: int, zones: tuple[int, int], transport: str, seed: int) -> None:
+    """
+    Compares the single table AutoFlow planner with geographic sharding, see ZoneSharding.
+    Zoned routes may differ from the single table routes, the share of identical routes is reported.
+    """
+    random.seed(seed)
+    landscape = generateLandscape(size)
+    MAX_ROAD_SPEED_MPS = maxRoadSpeed(landscape)
+    autoflow_vehicles = spawnRandomVehicles(landscape, vehicleCount, useAutoFlow=True)
+    graph = getRoadGraph(landscape)
+    partition = ZonePartition(landscape, *zones)
+
+    print(f"Landscape: {landscape.xSize}x{landscape.ySize} cells, {graph.roadCount} roads, {vehicleCount} vehicles")
+    print(f"Zones: {partition.zoneCount}, owned roads {[len(roads) for roads in partition.zoneRoads]}, halo roads {[len(roads) for roads in partition.haloRoads]}")
+
+    startTime = time.perf_counter()
+    routes = computeAutoflowVehicleRoutes(autoflow_vehicles, landscape, MAX_ROAD_SPEED_MPS)
+    singleTime = time.perf_counter() - startTime
+    startTime = time.perf_counter()
+    zonedRoutes = computeAutoflowVehicleRoutes(autoflow_vehicles, landscape, MAX_ROAD_SPEED_MPS, zones=zones, zoneTransport=transport)
+    zonedTime = time.perf_counter() - startTime
+
+    identical = sum(route == zonedRoute for route, zonedRoute in zip(routes, zonedRoutes))
+    print(f"single table: {singleTime:.3f}s, zoned ({transport}): {zonedTime:.3f}s, identical routes: {identical / max(1, len(routes)):.1%}")
+
+def runSuiteCase(size: int, density: float, autoflowPercentage: float, updateInterval: int, seed: int, traceMemory: bool) -> dict:
+    """
+    Runs every stage of a simulation once, returns the landscape and fleet sizes
+    and stages[stage] => wall time in seconds, or peak memory in bytes if traceMemory is True.
+    Cases are seeded independently, so results do not depend on which other cases were run.
+    """
+    random.seed(f"{seed}-{size}-{density}-{autoflowPercentage}")
+    stages = {}
+
+    def runStage(name: str, function, *args, **kwargs):
+        if traceMemory:
+            tracemalloc.start()
+            result = function(*args, **kwargs)
+            stages[name] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        else:
+            startTime = time.perf_counter()
+            result = function(*args, **kwargs)
+            stages[name] = time.perf_counter() - startTime
+        return result
+
+    landscape = runStage("generate_landscape", generateLandscape, size)
+    graph = runStage("compile_road_graph", getRoadGraph, landscape)
+    MAX_ROAD_SPEED_MPS = maxRoadSpeed(landscape)
+    selfish_vehicles, autoflow_vehicles = runStage("spawn", spawnFleet, landscape, density, autoflowPercentage)
+
+    runStage("selfish_routing", computeSelfishVehicleRoutes, selfish_vehicles, landscape, MAX_ROAD_SPEED_MPS)
+    replanningState = ReplanningState(graph.roadCount)
+    routes = runStage(
+        "autoflow_routing", computeAutoflowVehicleRoutes, 
+        autoflow_vehicles, landscape, MAX_ROAD_SPEED_MPS, replanningState=replanningState
+    )
+
+    # Two ticks of a session that starts from the initial reservations, both only replan the vehicles affected by changes
+    routes = routes.relabel([vehicle.id for vehicle in sorted(autoflow_vehicles, key=lambda vehicle: vehicle.id)])
+    for stage in ["recalculate_first_tick", "recalculate_tick"]:
+        carPositions = simulateCarPositions(graph, routes, updateInterval)
+        routes = runStage(
+            stage, recalculateRoutes, 
+            carPositions, landscape, autoflow_vehicles, MAX_ROAD_SPEED_MPS, updateInterval, state=replanningState
+        )
+
+    return {
+        "size": size,
+        "density": density,
+        "roads": graph.roadCount,
+        "selfishVehicles": len(selfish_vehicles),
+        "autoflowVehicles": len(autoflow_vehicles),
+        "stages": stages,
+    }
+
+def benchmarkSuite(sizes: list[int], densities: list[float], autoflowPercentage: float, updateInterval: int, seed: int, traceMemory: bool, output: str) -> None:
+    """
+    Times every stage for every landscape size and vehicle density, and writes the results to output as JSON.
+    Peak memory is measured in a second run of every case with tracemalloc, which would otherwise slow down the timed run.
+    """
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], 
+            cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True
+        ).stdout.strip()
+    except OSError:
+        commit = ""
+
+    results = []
+    print(f"{'size':>5} {'density':>8} {'roads':>7} {'vehicles':>9}  stage times (s)")
+    for size in sizes:
+        for density in densities:
+            result = runSuiteCase(size, density, autoflowPercentage, updateInterval, seed, False)
+            timings = result.pop("stages")
+            peakMemory = runSuiteCase(size, density, autoflowPercentage, updateInterval, seed, True)["stages"] if traceMemory else {}
+            result["stages"] = {
+                stage: {"time": wallTime, "peakMemory": peakMemory.get(stage)} 
+                for stage, wallTime in timings.items()
+            }
+            results.append(result)
+
+            vehicleCount = result["selfishVehicles"] + result["autoflowVehicles"]
+            print(
+                f"{size:>5} {density:>8} {result['roads']:>7} {vehicleCount:>9}  " 
+                + " ".join(f"{stage}={wallTime:.3f}" for stage, wallTime in timings.items())
+            )
+
+    with open(output, "w") as file:
+        json.dump({
+            "commit": commit,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": seed,
+            "autoflowPercentage": autoflowPercentage,
+            "updateInterval": updateInterval,
+            "results": results,
+        }, file, indent=2)
+    print(f"Results written to {output}")
+
+def compareSuiteResults(oldOutput: str, newOutput: str) -> None:
+    """
+    Prints the change in wall time and peak memory of every stage between two suite results.
+    """
+    with open(oldOutput) as file:
+        old = json.load(file)
+    with open(newOutput) as file:
+        new = json.load(file)
+
+    oldResults = {(result["size"], result["density"]): result for result in old["results"]}
+    print(f"{old.get('commit', '')[:10] or oldOutput} -> {new.get('commit', '')[:10] or newOutput}")
+    print(f"{'size':>5} {'density':>8} {'stage':<24} {'old (s)':>9} {'new (s)':>9} {'change':>8} {'memory':>8}")
+    for result in new["results"]:
+        oldResult = oldResults.get((result["size"], result["density"]))
+        if oldResult is None:
+            continue
+        for stage, stageResult in result["stages"].items():
+            oldStage = oldResult["stages"].get(stage)
+            if oldStage is None:
+                continue
+            timeChange = stageResult["time"] / oldStage["time"] - 1 if oldStage["time"] > 0 else 0
+            memoryChange = ""
+            if stageResult["peakMemory"] and oldStage["peakMemory"]:
+                memoryChange = f"{stageResult['peakMemory'] / oldStage['peakMemory'] - 1:+.1%}"
+            print(
+                f"{result['size']:>5} {result['density']:>8} {stage:<24} " 
+                f"{oldStage['time']:>9.3f} {stageResult['time']:>9.3f} {timeChange:>+8.1%} {memoryChange:>8}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="AutoFlow routing benchmarks")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    landmarksParser = subparsers.add_parser("landmarks", help="nodes expanded per vehicle, manhattan vs ALT heuristic")
+    landmarksParser.add_argument("--size", type=int, default=30, help="landscape size in cells before road fitting")
+    landmarksParser.add_argument("--vehicles", type=int, default=500)
+    landmarksParser.add_argument("--landmarks", type=int, default=8)
+    landmarksParser.add_argument("--seed", type=int, default=1)
+
+    bidirectionalParser = subparsers.add_parser("bidirectional", help="nodes expanded per selfish vehicle, forward vs bidirectional A*")
+    bidirectionalParser.add_argument("--size", type=int, default=60, help="landscape size in cells before road fitting")
+    bidirectionalParser.add_argument("--vehicles", type=int, default=300)
+    bidirectionalParser.add_argument("--seed", type=int, default=1)
+
+    openListParser = subparsers.add_parser("openlist", help="routing time with every Open list implementation")
+    openListParser.add_argument("--size", type=int, default=60, help="landscape size in cells before road fitting")
+    openListParser.add_argument("--vehicles", type=int, default=1000)
+    openListParser.add_argument("--seed", type=int, default=1)
+
+    zonesParser = subparsers.add_parser("zones", help="AutoFlow routing time, single reservation table vs geographic sharding")
+    zonesParser.add_argument("--size", type=int, default=60, help="landscape size in cells before road fitting")
+    zonesParser.add_argument("--vehicles", type=int, default=3000)
+    zonesParser.add_argument("--zones", type=int, nargs=2, default=[2, 2], help="zones along the x and y axes")
+    zonesParser.add_argument("--transport", choices=["pipe", "socket"], default="pipe")
+    zonesParser.add_argument("--seed", type=int, default=1)
+
+    suiteParser = subparsers.add_parser("suite", help="stage timings and peak memory across landscape sizes and vehicle densities")
+    suiteParser.add_argument("--sizes", type=int, nargs="+", default=[15, 30, 60, 100, 200], help="landscape sizes in cells before road fitting")
+    suiteParser.add_argument("--densities", type=float, nargs="+", default=[5, 20, 50], help="percentages of positions used as starting positions")
+    suiteParser.add_argument("--autoflow", type=float, default=50, help="percentage of AutoFlow vehicles")
+    suiteParser.add_argument("--interval", type=int, default=1, help="update interval of recalculateRoutes in seconds")
+    suiteParser.add_argument("--seed", type=int, default=1)
+    suiteParser.add_argument("--no-memory", action="store_true", help="skip the peak memory run")
+    suiteParser.add_argument("--output", default="benchmarks.json")
+
+    compareParser = subparsers.add_parser("compare", help="change in stage timings between two suite results")
+    compareParser.add_argument("old")
+    compareParser.add_argument("new")
+
+    args = parser.parse_args()
+    if args.benchmark == "landmarks":
+        benchmarkLandmarks(args.size, args.vehicles, args.landmarks, args.seed)
+    elif args.benchmark == "bidirectional":
+        benchmarkBidirectional(args.size, args.vehicles, args.seed)
+    elif args.benchmark == "openlist":
+        benchmarkOpenList(args.size, args.vehicles, args.seed)
+    elif args.benchmark == "zones":
+        benchmarkZones(args.size, args.vehicles, tuple(args.zones), args.transport, args.seed)
+    elif args.benchmark == "suite":
+        benchmarkSuite(args.sizes, args.densities, args.autoflow, args.interval, args.seed, not args.no_memory, args.output)
+    elif args.benchmark == "compare":
+        compareSuiteResults(args.old, args.new)
@@ -3,6 +3,7 @@ import dataclasses
 from websockets.exceptions import ConnectionClosedOK
 from websockets.server import WebSocketServerProtocol, serve
 import json
+import time
 
 from AutoFlowBridgeCompat import outputToBridge
 from LandscapeComponents import Landscape
@@ -11,10 +12,12 @@ import websockets
 import AutoFlowBridgeCompat
 import LandscapeComponents
 from LandscapeComponents import Road
-from AutoFlow import recalculateRoutes
+from AutoFlow import recalculateRoutes, ReplanningState
 from AutoFlowBridgeCompat import MAX_ROAD_SPEED_MPS
+from RouteSet import RouteSet
 
 PORT = 8001
+PLANNING_BUDGET_FRACTION = 0.5  # share of the update interval route recalculation may take, the rest is left for messaging
 
 
 @dataclasses.dataclass
@@ -46,23 +49,6 @@ class VehicleInitMessage:
         return VehicleInitMessage(**d)
 
 
-@dataclasses.dataclass
-class Vector3Message:
-    x: float
-    y: float
-    z: float
-
-    def __dict__(self):
-        return {"x": self.x, "y": self.y, "z": self.z}
-
-    def serialize(self):
-        return json.dumps(self.__dict__())
-
-    @staticmethod
-    def deserialize(d):
-        return Vector3Message(**d)
-
-
 @dataclasses.dataclass
 class Vector2Message:
     x: float
@@ -154,41 +140,19 @@ class InitMessage:
 
 
 @dataclasses.dataclass
-class VehicleUpdateMessage:
-    id: int
-    route: list[Vector3Message]
-
-    def __dict__(self):
-        return {
-            "id": self.id,
-            "route": [r.__dict__() for r in self.route],
-            "type": "VehicleUpdateMessage",
-        }
-
-    def serialize(self):
-        return json.dumps(self.__dict__())
-
-    @staticmethod
-    def deserialize(d):
-        return VehicleInitMessage(**d)
-
-
-@dataclasses.dataclass
-class UpdateMessage:
-    updates: list[VehicleUpdateMessage]
+class RouteSetUpdateMessage:
+    """
+    UpdateMessage of the routes of many vehicles, serialised straight from the arrays of a RouteSet,
+    see RouteSet.to_update_message for the format.
+    If rounded is True, coordinates with an integral value are sent as ints, like the rounded routes recalculateRoutes
+    used to return (waypoints kept from the routes Unity sent back keep their value).
+    """
 
-    def __dict__(self):
-        return {
-            "updates": [u.__dict__() for u in self.updates],
-            "type": "UpdateMessage",
-        }
+    routes: RouteSet
+    rounded: bool = False
 
     def serialize(self):
-        return json.dumps(self.__dict__())
-
-    @staticmethod
-    def deserialize(d):
-        return VehicleInitMessage(**d)
+        return self.routes.to_update_message(self.rounded)
 
 
 class JSONUtils:
@@ -215,10 +179,14 @@ async def handler(websocket: WebSocketServerProtocol):
     inp: tuple[
         dict[int, tuple[float, float, Vehicle]],
         Landscape,
-        dict[int, list[tuple[float, float, float]]],
+        RouteSet,
         list[Vehicle],
+        ReplanningState,
     ] = outputToBridge(autoflowPercentage=autoflow_percentage)
 
+    # Routes and reservations of this session, kept between recalculation ticks
+    replanningState = inp[4]
+
     autoflow_vehicles = []
     selfish_vehicles = []
     for vehicle in inp[3]:
@@ -258,9 +226,7 @@ async def handler(websocket: WebSocketServerProtocol):
             )
         )
 
-    flatLandscapeMatrix = []
-    for row in inp[1].landscapeMatrix:
-        flatLandscapeMatrix.extend(row)
+    flatLandscapeMatrix = inp[1].landscapeMatrix.flatten()
 
     roadMessages = []
     for road in inp[1].roads:
@@ -291,11 +257,7 @@ async def handler(websocket: WebSocketServerProtocol):
     await asyncio.sleep(0.5)
 
     # Updates
-    updateMessages = []
-    for id, route in inp[2].items():
-        currentCar = VehicleUpdateMessage(id, [Vector3Message(*r) for r in route])
-        updateMessages.append(currentCar)
-    await websocket.send(UpdateMessage(updateMessages).serialize())
+    await websocket.send(RouteSetUpdateMessage(inp[2]).serialize())
 
     print("Finished routing")
 
@@ -304,24 +266,27 @@ async def handler(websocket: WebSocketServerProtocol):
     while True:
         try:
             message = await websocket.recv()
+            tickStart = time.perf_counter()
             
             # horrible security
             carPositions = eval(message)
-            updateMessages = []
 
-            newRoutes = recalculateRoutes(carPositions, inp[1], autoflow_vehicles, MAX_ROAD_SPEED_MPS, update_interval)
-
-            for k in newRoutes.keys():
-                currentCar = VehicleUpdateMessage(k, [Vector3Message(*r) for r in newRoutes[k]])
-                updateMessages.append(currentCar)
+            # Planning must not take longer than the update interval, otherwise Unity falls behind
+            newRoutes = recalculateRoutes(
+                carPositions, inp[1], autoflow_vehicles, MAX_ROAD_SPEED_MPS, update_interval, 
+                timeBudget=update_interval * PLANNING_BUDGET_FRACTION, state=replanningState
+            )
+            if replanningState.skippedCount > 0:
+                print(f"Out of time, {replanningState.skippedCount} vehicles keep their previous routes")
 
-            await websocket.send(UpdateMessage(updateMessages).serialize())
+            await websocket.send(RouteSetUpdateMessage(newRoutes, rounded=True).serialize())
             
         except websockets.exceptions.ConnectionClosedOK:
             print("Connection closed, stopping reception.")
             break
 
-        await asyncio.sleep(update_interval)
+        # The time spent planning is part of the update interval
+        await asyncio.sleep(max(0, update_interval - (time.perf_counter() - tickStart)))
 
 
 
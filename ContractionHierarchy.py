@@ -0,0 +1,321 @@
+"""
+This script contains the contraction hierarchy (CH) query engine used for selfish routing.
+
+Selfish vehicles only use static costs (see RoadGraph), which never change after a landscape is generated.
+A contraction hierarchy moves most of the work of a shortest path search into a one-off preprocessing step:
+1. Roads are contracted (removed from the graph) one at a time, in order of increasing importance
+2. Whenever a contraction would lengthen a shortest path between two remaining roads, a shortcut edge is added
+3. Every road is given a rank, i.e. the order in which it was contracted
+
+A query is then a bidirectional Dijkstra search that only ever moves towards roads of a higher rank,
+which settles a few dozen roads instead of a large portion of the map.
+Shortcuts remember the road they bypass, so the full sequence of roads can be unpacked recursively.
+"""
+
+
+# ================ IMPORTS ================
+from RoadGraph import *
+
+from heapq import heappush, heappop
+from math import inf
+
+# =========================================
+
+
+class ContractionHierarchy:
+
+    """
+    Contraction hierarchy of the static road graph, where every road is a node.
+
+    Upward edges are stored in CSR form:
+    - upwardOffsets, upwardRoads, upwardCost: edges u -> w where w has a higher rank than u (forward search)
+    - downwardOffsets, downwardRoads, downwardCost: edges w -> u where w has a higher rank than u,
+      stored at u (backward search)
+
+    shortcutMiddle maps a shortcut (u, w) to the road it bypasses, original edges are not stored.
+    """
+
+    def __init__(self, graph: RoadGraph, witnessSettleLimit: int = 64) -> None:
+        self.graph = graph
+        self.witnessSettleLimit = witnessSettleLimit
+        roadCount = graph.roadCount
+
+        # Remaining (uncontracted) graph, outEdges[u][w] => cost of edge u -> w
+        outEdges: list[dict[int, float]] = [{} for i in range(roadCount)]
+        inEdges: list[dict[int, float]] = [{} for i in range(roadCount)]
+        for u in range(roadCount):
+            for index in range(graph.successorOffsets[u], graph.successorOffsets[u + 1]):
+                w = graph.successorRoads[index]
+                cost = graph.roadTraversalTime[u] + graph.successorPathwayTime[index]
+                if cost < outEdges[u].get(w, inf):
+                    outEdges[u][w] = cost
+                    inEdges[w][u] = cost
+
+        self.shortcutMiddle: dict[tuple[int, int], int] = {}
+        self.rank: list[int] = [0 for i in range(roadCount)]
+        upwardEdges: list[list[tuple[int, float]]] = [[] for i in range(roadCount)]
+        downwardEdges: list[list[tuple[int, float]]] = [[] for i in range(roadCount)]
+        deletedNeighbours = [0 for i in range(roadCount)]
+
+        def witnessCosts(source: int, skipped: int, maxCost: float, targets: set[int]) -> dict[int, float]:
+            """
+            Bounded Dijkstra search from source that avoids the road being contracted.
+            """
+            distances = {source: 0}
+            open_nodes = [(0, source)]
+            settled = 0
+            while open_nodes and settled < witnessSettleLimit:
+                cost, u = heappop(open_nodes)
+                if cost > distances[u]:
+                    continue
+                if cost > maxCost:
+                    break
+                settled += 1
+                if u in targets:
+                    targets.discard(u)
+                    if not targets:
+                        break
+                for w, edgeCost in outEdges[u].items():
+                    if w == skipped:
+                        continue
+                    if cost + edgeCost < distances.get(w, inf):
+                        distances[w] = cost + edgeCost
+                        heappush(open_nodes, (cost + edgeCost, w))
+            return distances
+
+        def findShortcuts(v: int) -> list[tuple[int, int, float]]:
+            """
+            Returns the (u, w, cost) shortcuts required if road v was contracted.
+            """
+            shortcuts = []
+            for u, inCost in inEdges[v].items():
+                targets = {w: inCost + outCost for w, outCost in outEdges[v].items() if w != u}
+                if not targets:
+                    continue
+                distances = witnessCosts(u, v, max(targets.values()), set(targets))
+                for w, cost in targets.items():
+                    if distances.get(w, inf) > cost:
+                        shortcuts.append((u, w, cost))
+            return shortcuts
+
+        def priority(v: int) -> int:
+            """
+            Edge difference plus the number of contracted neighbours, roads with lower priority are contracted first.
+            """
+            return (
+                len(findShortcuts(v))
+                - len(inEdges[v])
+                - len(outEdges[v])
+                + deletedNeighbours[v]
+            )
+
+        # Contract roads in order of priority, priorities are updated lazily
+        queue = [(priority(v), v) for v in range(roadCount)]
+        queue.sort()
+        currentRank = 0
+        while queue:
+            oldPriority, v = heappop(queue)
+            newPriority = priority(v)
+            if queue and newPriority > queue[0][0]:
+                heappush(queue, (newPriority, v))
+                continue
+
+            # Remaining edges of v lead to roads of a higher rank
+            self.rank[v] = currentRank
+            currentRank += 1
+            upwardEdges[v] = list(outEdges[v].items())
+            downwardEdges[v] = list(inEdges[v].items())
+
+            for u, w, cost in findShortcuts(v):
+                if cost < outEdges[u].get(w, inf):
+                    outEdges[u][w] = cost
+                    inEdges[w][u] = cost
+                    self.shortcutMiddle[(u, w)] = v
+
+            # Remove v from the remaining graph
+            for u in inEdges[v]:
+                del outEdges[u][v]
+                deletedNeighbours[u] += 1
+            for w in outEdges[v]:
+                del inEdges[w][v]
+                deletedNeighbours[w] += 1
+            outEdges[v] = {}
+            inEdges[v] = {}
+
+        # Flatten upward edges into CSR form
+        self.upwardOffsets, self.upwardRoads, self.upwardCost = [0], [], []
+        self.downwardOffsets, self.downwardRoads, self.downwardCost = [0], [], []
+        for v in range(roadCount):
+            for w, cost in upwardEdges[v]:
+                self.upwardRoads.append(w)
+                self.upwardCost.append(cost)
+            self.upwardOffsets.append(len(self.upwardRoads))
+            for u, cost in downwardEdges[v]:
+                self.downwardRoads.append(u)
+                self.downwardCost.append(cost)
+            self.downwardOffsets.append(len(self.downwardRoads))
+
+    def rebuild(self, graph: RoadGraph) -> "ContractionHierarchy":
+        """
+        Returns a contraction hierarchy of another graph (e.g. a recompiled one, see getRoadGraph) with the same settings.
+        """
+        return ContractionHierarchy(graph, self.witnessSettleLimit)
+
+    def query(self, sources: list[tuple[int, float]], target: int) -> tuple[float, list[int]]:
+        """
+        Bidirectional upward search from any of the sources, given as (roadID, initial cost), to the start of target.
+        Returns (cost, sequence of roadIDs from a source to target), or (inf, []) if target is unreachable.
+        """
+
+        upwardOffsets, upwardRoads, upwardCost = self.upwardOffsets, self.upwardRoads, self.upwardCost
+        downwardOffsets, downwardRoads, downwardCost = self.downwardOffsets, self.downwardRoads, self.downwardCost
+
+        forwardCost: dict[int, float] = {}
+        forwardParent: dict[int, int] = {}
+        forwardOpen: list[tuple[float, int]] = []
+        for roadID, cost in sources:
+            if cost < forwardCost.get(roadID, inf):
+                forwardCost[roadID] = cost
+                forwardParent[roadID] = -1
+                heappush(forwardOpen, (cost, roadID))
+
+        backwardCost: dict[int, float] = {target: 0}
+        backwardParent: dict[int, int] = {target: -1}
+        backwardOpen: list[tuple[float, int]] = [(0, target)]
+
+        bestCost = inf
+        meetingRoad = -1
+
+        # Stop once neither search can improve the best meeting cost
+        while (forwardOpen and forwardOpen[0][0] < bestCost) or (backwardOpen and backwardOpen[0][0] < bestCost):
+            if forwardOpen and (not backwardOpen or forwardOpen[0][0] <= backwardOpen[0][0]):
+                cost, roadID = heappop(forwardOpen)
+                if cost > forwardCost[roadID]:
+                    continue
+                if roadID in backwardCost and cost + backwardCost[roadID] < bestCost:
+                    bestCost = cost + backwardCost[roadID]
+                    meetingRoad = roadID
+
+                # Stall-on-demand: skip roads that are reached faster from a higher ranked road
+                stalled = False
+                for index in range(downwardOffsets[roadID], downwardOffsets[roadID + 1]):
+                    if forwardCost.get(downwardRoads[index], inf) + downwardCost[index] < cost:
+                        stalled = True
+                        break
+                if stalled:
+                    continue
+
+                for index in range(upwardOffsets[roadID], upwardOffsets[roadID + 1]):
+                    neighbourID = upwardRoads[index]
+                    neighbourCost = cost + upwardCost[index]
+                    if neighbourCost < forwardCost.get(neighbourID, inf):
+                        forwardCost[neighbourID] = neighbourCost
+                        forwardParent[neighbourID] = roadID
+                        heappush(forwardOpen, (neighbourCost, neighbourID))
+            else:
+                cost, roadID = heappop(backwardOpen)
+                if cost > backwardCost[roadID]:
+                    continue
+                if roadID in forwardCost and cost + forwardCost[roadID] < bestCost:
+                    bestCost = cost + forwardCost[roadID]
+                    meetingRoad = roadID
+
+                # Stall-on-demand, see forward search
+                stalled = False
+                for index in range(upwardOffsets[roadID], upwardOffsets[roadID + 1]):
+                    if backwardCost.get(upwardRoads[index], inf) + upwardCost[index] < cost:
+                        stalled = True
+                        break
+                if stalled:
+                    continue
+
+                for index in range(downwardOffsets[roadID], downwardOffsets[roadID + 1]):
+                    neighbourID = downwardRoads[index]
+                    neighbourCost = cost + downwardCost[index]
+                    if neighbourCost < backwardCost.get(neighbourID, inf):
+                        backwardCost[neighbourID] = neighbourCost
+                        backwardParent[neighbourID] = roadID
+                        heappush(backwardOpen, (neighbourCost, neighbourID))
+
+        if meetingRoad == -1:
+            return inf, []
+
+        # Roads of the (packed) path, from the source to the meeting road and then on to the target
+        packedPath = []
+        roadID = meetingRoad
+        while roadID != -1:
+            packedPath.append(roadID)
+            roadID = forwardParent[roadID]
+        packedPath.reverse()
+        roadID = backwardParent[meetingRoad]
+        while roadID != -1:
+            packedPath.append(roadID)
+            roadID = backwardParent[roadID]
+
+        return bestCost, self.unpack(packedPath)
+
+    def unpack(self, packedPath: list[int]) -> list[int]:
+        """
+        Replaces every shortcut within a path by the roads it bypasses.
+        """
+        path = [packedPath[0]]
+        for u, w in zip(packedPath, packedPath[1:]):
+            stack = [(u, w)]
+            while stack:
+                u, w = stack.pop()
+                middle = self.shortcutMiddle.get((u, w))
+                if middle is None:
+                    path.append(w)
+                else:
+                    stack.append((middle, w))  # second half is unpacked after the first half
+                    stack.append((u, middle))
+        return path
+
+    def find_route(
+        self,
+        startRoadID: int,
+        startPosition: float,
+        destinationRoadID: int,
+        destinationPosition: float,
+    ) -> list[int]:
+        """
+        Returns the sequence of roadIDs travelled by a selfish vehicle, see RoadGraph.build_route.
+        """
+        graph = self.graph
+
+        # Destination is the starting position, or in front of the starting position
+        if startRoadID == destinationRoadID and startPosition == destinationPosition:
+            return []
+        if startRoadID == destinationRoadID and startPosition < destinationPosition:
+            return [destinationRoadID]
+
+        # Otherwise the vehicle has to move to the end of its starting road
+        if startPosition == 0:
+            timeTaken = graph.roadTraversalTime[startRoadID]
+        else:
+            startPos = graph.real_position(startRoadID, startPosition)
+            endPos = graph.roadEndPos[startRoadID]
+            timeTaken = (
+                ((startPos[0] - endPos[0]) ** 2 + (startPos[1] - endPos[1]) ** 2) ** 0.5
+                / graph.roadSpeed[startRoadID]
+            )
+
+        sources = [
+            (graph.successorRoads[index], timeTaken + graph.successorPathwayTime[index])
+            for index in range(graph.successorOffsets[startRoadID], graph.successorOffsets[startRoadID + 1])
+        ]
+        cost, path = self.query(sources, destinationRoadID)
+        if cost == inf:
+            raise Exception("Path does not exist")
+
+        return [startRoadID] + path
+
+
+def precomputeContractionHierarchy(landscape: Landscape) -> ContractionHierarchy:
+    """
+    Optional preprocessing step that builds the contraction hierarchy of this landscape ahead of the first query.
+    Selfish routing only uses it when asked to, see the useContractionHierarchy option of computeSelfishVehicleRoutes.
+    """
+    graph = getRoadGraph(landscape)
+    graph.contractionHierarchy = ContractionHierarchy(graph)
+    return graph.contractionHierarchy
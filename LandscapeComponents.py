@@ -15,17 +15,19 @@ An original algorithm for generating random landscapes is included. Below is the
 A landscape matrix describing the generated landscape is produced, as well as a directed graph representation
 of the road network that the Autoflow algorithm operates on in order to perform its multi-agent path searches.
 
-Three global constants (static variables) are defined:
+Five global constants (static variables) are defined:
 - CELL_SIZE_METRES: real scaling of each cell in metres
 - VEHICLE_LENGTH_METRES: how much space does each vehicle need in their lane
 - ACTIVE_LANDSCAPE: global reference to the currently used landscape
+- TILE_NAMES, TILE_CODES: tile name of every tile code stored in Landscape.tileMatrix and vice versa
 """
 
 
 # ================ IMPORTS ================
 from collections import defaultdict, deque
+from collections.abc import Mapping
 from random import randint, shuffle
-from copy import deepcopy
+import numpy as np
 
 # =========================================
 
@@ -33,6 +35,8 @@ from copy import deepcopy
 CELL_SIZE_METRES: int = 20
 VEHICLE_LENGTH_METRES: int = 5
 ACTIVE_LANDSCAPE: "Landscape" = None
+TILE_NAMES: tuple[str, ...] = (None, "LP", "IS", "HR", "VR")  # unassigned, land plot, intersection, horizontal road, vertical road
+TILE_CODES: dict[str, int] = {name: code for code, name in enumerate(TILE_NAMES)}
 # =========================================
 
 
@@ -92,19 +96,41 @@ class Intersection:
         # Lookup table for quickly accessing the when a particular road gets the green light
         self.trafficLightLookup: dict[Intersection, int] = {}
 
+        # Lookup table for quickly accessing the waiting time until the green light, see waiting_time
+        self.trafficLightWaitTable: dict[Intersection, list[int]] = {}
+        # Maps (intersection where the from-road starts) to the modulus time at which a vehicle arriving
+        # during every second of the traffic light cycle gets the green light
+
         # Hashmap for quickly accessing how many vehicles can pass through in a single green light
         self.trafficPassthroughRate: dict[Intersection, int] = {}
         # Maps (intersection where the from-road starts) to number of vehicles that can pass through
 
-        # Pseudo roads for joining roads at an intersection
-        self.intersectionPathways: dict[
-            Intersection, dict[Intersection, Road]
-        ] = defaultdict(dict)
-        # Maps (intersection where the from-road starts) to (intersection where the to-road ends)
+        # Turn table of the virtual pathways joining roads at the intersection, see create_traffic_light
+        self.neighbourIndex: dict[Intersection, int] = {}  # index of every neighbour within self.neighbours
+        self.turnTraversalTime: list[float] = []
+        self.turnLength: list[float] = []
+        self.turnDirection: list[str] = []
+        # Indexed by (index of the intersection where the from-road starts) * len(self.neighbours)
+        # + (index of the intersection where the to-road ends), None for U turns
+
+        # Pathway objects built so far, see pathway
+        self.pathways: dict[tuple[Intersection, Intersection], Pathway] = {}
+        self.intersectionPathways = IntersectionPathways(self)
+        # Maps (intersection where the from-road starts) to (intersection where the to-road ends) to Pathway
 
     def coordinates(self) -> tuple[int, int]:
         return (self.xPos, self.yPos)
 
+    def waiting_time(self, fromIntersection: "Intersection", time: float) -> float:
+        """
+        Returns how long a vehicle arriving at the given time on the road from fromIntersection waits for the green light.
+        """
+        waitTable = self.trafficLightWaitTable.get(fromIntersection)
+        if waitTable is None:  # no traffic light
+            return 0
+        modulusTime = time % len(waitTable)
+        return max(0, waitTable[int(modulusTime)] - modulusTime)
+
     def create_traffic_light(self) -> None:
         """
         Creates a random traffic signal pattern based on self.neighbours.
@@ -116,13 +142,14 @@ class Intersection:
         For example, self.neighbours[self.trafficLightPattern[1]] yields the intersection from where
         the road that gets the green light at every 2nd phase of the traffic light pattern starts.
 
-        A pseudo road between every connectable pair of road joined at the intersection is also created,
-        i.e. there will be 6 pseudo roads for a three way intersection, and 12 for a four way intersection.
+        A virtual pathway between every connectable pair of road joined at the intersection is also created,
+        i.e. there will be 6 pathways for a three way intersection, and 12 for a four way intersection.
         NOTE: U turns are NOT supported.
 
-        Pseudo roads are stored via self.intersectionPathways, which maps the intersection from where
-        the road that gets the green light starts to the intersection to to where the next road goes/ends.
-        This ensures that the mappings are unique.
+        Pathways are stored as a turn table (traversal time, length and direction of every pathway), indexed
+        by the intersection from where the road that gets the green light starts and the intersection to where
+        the next road goes/ends. This ensures that the mappings are unique.
+        Pathway objects holding the geometry are only built when requested, see pathway and self.intersectionPathways.
         """
 
         roadCount = len(self.neighbours)
@@ -143,6 +170,18 @@ class Intersection:
             # Randomise phase duration between 3-8 seconds
             self.trafficLightDuration = randint(3, 8)
 
+            # Create waiting time lookup table for every road, phases start and end on whole seconds
+            lightCycle = roadCount * self.trafficLightDuration
+            for intersection, phase in self.trafficLightLookup.items():
+                greenStart = phase * self.trafficLightDuration
+                greenEnd = greenStart + self.trafficLightDuration
+                self.trafficLightWaitTable[intersection] = [
+                    greenStart if second < greenStart  # earlier in the cycle, wait for this cycle's green light
+                    else second if second < greenEnd  # within the green light duration, no waiting
+                    else lightCycle + greenStart  # later in the cycle, wait for the next cycle's green light
+                    for second in range(lightCycle)
+                ]
+
             # Calculate traffic passthrough rate for every road
             for intersection in self.neighbours:
                 self.trafficPassthroughRate[intersection] = (
@@ -153,82 +192,126 @@ class Intersection:
                     // VEHICLE_LENGTH_METRES
                 )
 
-        # Create virtual pathways
-        for from_intersection in self.neighbours:
-            for to_intersection in self.neighbours:
-                if to_intersection.coordinates() != from_intersection.coordinates():
-                    pseudoPathway = Road(self.coordinates(), self.coordinates())
-
-                    # Set the starting and ending positions of the virtual pathway
-                    pseudoPathway.startPosReal = ACTIVE_LANDSCAPE.roadmap[
-                        from_intersection.coordinates()
-                    ][self.coordinates()].endPosReal
-                    pseudoPathway.endPosReal = ACTIVE_LANDSCAPE.roadmap[
-                        self.coordinates()
-                    ][to_intersection.coordinates()].startPosReal
-
-                    # Calculate real length and direction of the virtual pathway
-                    if (
-                        ACTIVE_LANDSCAPE.roadmap[from_intersection.coordinates()][
-                            self.coordinates()
-                        ].direction
-                        != ACTIVE_LANDSCAPE.roadmap[self.coordinates()][
-                            to_intersection.coordinates()
-                        ].direction
-                    ):  # a turn is required
-                        pseudoPathway.length = (
-                            (
-                                pseudoPathway.startPosReal[0]
-                                - pseudoPathway.endPosReal[0]
-                            )
-                            ** 2
-                            + (
-                                pseudoPathway.startPosReal[1]
-                                - pseudoPathway.endPosReal[1]
-                            )
-                            ** 2
-                        ) ** 0.5
-                        pseudoPathway.direction = (
-                            ACTIVE_LANDSCAPE.roadmap[from_intersection.coordinates()][
-                                self.coordinates()
-                            ].direction
-                            + ACTIVE_LANDSCAPE.roadmap[self.coordinates()][
-                                to_intersection.coordinates()
-                            ].direction
-                        )  # simply join the directions e.g. north road to east road => NE
-                    else:  # go straight, no turn required
-                        pseudoPathway.length = CELL_SIZE_METRES
-                        pseudoPathway.direction = ACTIVE_LANDSCAPE.roadmap[
-                            from_intersection.coordinates()
-                        ][
-                            self.coordinates()
-                        ].direction  # same direction
-
-                    # Asign speed limit of the virtual pathway
-                    pseudoPathway.set_speed_limit(
-                        (
-                            ACTIVE_LANDSCAPE.roadmap[from_intersection.coordinates()][
-                                self.coordinates()
-                            ].speedLimit
-                            + ACTIVE_LANDSCAPE.roadmap[self.coordinates()][
-                                to_intersection.coordinates()
-                            ].speedLimit
-                        )
-                        / 2
-                    )  # set speed limit of pathway to the average of the two connecting roads
+        # Create the turn table of the virtual pathways
+        self.neighbourIndex = {intersection: index for index, intersection in enumerate(self.neighbours)}
+        self.turnTraversalTime = [None] * (roadCount * roadCount)
+        self.turnLength = [None] * (roadCount * roadCount)
+        self.turnDirection = [None] * (roadCount * roadCount)
 
-                    # Calculate real traversal time and max vehicle count
-                    pseudoPathway.calculate_traversal_time()
-                    pseudoPathway.calculate_max_vehicle_count()
+        for fromIndex, from_intersection in enumerate(self.neighbours):
+            fromRoad = ACTIVE_LANDSCAPE.roadmap[from_intersection.coordinates()][self.coordinates()]
+            for toIndex, to_intersection in enumerate(self.neighbours):
+                if to_intersection.coordinates() == from_intersection.coordinates():
+                    continue
+                toRoad = ACTIVE_LANDSCAPE.roadmap[self.coordinates()][to_intersection.coordinates()]
+
+                # Calculate real length and direction of the virtual pathway
+                if fromRoad.direction != toRoad.direction:  # a turn is required
+                    length = (
+                        (fromRoad.endPosReal[0] - toRoad.startPosReal[0]) ** 2
+                        + (fromRoad.endPosReal[1] - toRoad.startPosReal[1]) ** 2
+                    ) ** 0.5
+                    direction = fromRoad.direction + toRoad.direction  # simply join the directions e.g. north road to east road => NE
+                else:  # go straight, no turn required
+                    length = CELL_SIZE_METRES
+                    direction = fromRoad.direction  # same direction
+
+                # Speed limit of the virtual pathway is the average of the two connecting roads
+                speedLimit = (fromRoad.speedLimit + toRoad.speedLimit) / 2
+
+                turn = fromIndex * roadCount + toIndex
+                self.turnTraversalTime[turn] = length / (speedLimit * 1000 / 3600)
+                self.turnLength[turn] = length
+                self.turnDirection[turn] = direction
+
+    def turn_traversal_time(self, fromIntersection: "Intersection", toIntersection: "Intersection") -> float:
+        """
+        Returns the traversal time (seconds) of the virtual pathway from the road starting at fromIntersection
+        to the road ending at toIntersection.
+        """
+        return self.turnTraversalTime[
+            self.neighbourIndex[fromIntersection] * len(self.neighbours) + self.neighbourIndex[toIntersection]
+        ]
 
-                    self.intersectionPathways[from_intersection][
-                        to_intersection
-                    ] = pseudoPathway
+    def pathway(self, fromIntersection: "Intersection", toIntersection: "Intersection") -> "Pathway":
+        """
+        Returns the virtual pathway from the road starting at fromIntersection to the road ending at toIntersection,
+        built from the turn table on first request.
+        """
+        pathway = self.pathways.get((fromIntersection, toIntersection))
+        if pathway is None:
+            turn = self.neighbourIndex[fromIntersection] * len(self.neighbours) + self.neighbourIndex[toIntersection]
+            if self.turnTraversalTime[turn] is None:
+                raise KeyError(toIntersection)  # U turns are NOT supported
+            pathway = self.pathways[(fromIntersection, toIntersection)] = Pathway(
+                self, fromIntersection, toIntersection,
+                self.turnTraversalTime[turn], self.turnLength[turn], self.turnDirection[turn]
+            )
+        return pathway
 
     def __hash__(self) -> int:
         return hash((self.xPos, self.yPos))
 
 
+class Pathway:
+
+    """
+    A virtual pathway joins two roads through an intersection, see Intersection.create_traffic_light.
+    Exposes the same geometry as a Road (start, end, real positions, length, direction, speed limit, traversal time).
+    """
+
+    __slots__ = (
+        "start", "end", "startPosReal", "endPosReal", "length", "direction",
+        "speedLimit", "speedLimit_MPS", "traversalTime", "maxVehicleCount",
+    )
+
+    def __init__(
+        self, intersection: Intersection, fromIntersection: Intersection, toIntersection: Intersection,
+        traversalTime: float, length: float, direction: str
+    ) -> None:
+        fromRoad = ACTIVE_LANDSCAPE.roadmap[fromIntersection.coordinates()][intersection.coordinates()]
+        toRoad = ACTIVE_LANDSCAPE.roadmap[intersection.coordinates()][toIntersection.coordinates()]
+
+        # The pathway starts where the from-road ends and ends where the to-road starts
+        self.start = self.end = intersection.coordinates()
+        self.startPosReal = fromRoad.endPosReal
+        self.endPosReal = toRoad.startPosReal
+
+        self.length = length
+        self.direction = direction
+        self.speedLimit = (fromRoad.speedLimit + toRoad.speedLimit) / 2
+        self.speedLimit_MPS = self.speedLimit * 1000 / 3600
+        self.traversalTime = traversalTime
+        self.maxVehicleCount = max(1, length // VEHICLE_LENGTH_METRES)
+
+
+class IntersectionPathways(Mapping):
+
+    """
+    View of the pathways of an intersection that behaves like the nested hashmap it replaces,
+    i.e. intersectionPathways[fromIntersection][toIntersection] => Pathway, see Intersection.pathway.
+    """
+
+    def __init__(self, intersection: Intersection, fromIntersection: Intersection = None) -> None:
+        self.intersection = intersection
+        self.fromIntersection = fromIntersection
+
+    def __getitem__(self, key: Intersection):
+        if key not in self.intersection.neighbourIndex:
+            raise KeyError(key)
+        if self.fromIntersection is None:
+            return IntersectionPathways(self.intersection, key)
+        return self.intersection.pathway(self.fromIntersection, key)
+
+    def __iter__(self):
+        for intersection in self.intersection.neighbourIndex:
+            if self.fromIntersection is None or intersection.coordinates() != self.fromIntersection.coordinates():
+                yield intersection
+
+    def __len__(self) -> int:
+        return sum(1 for intersection in self)
+
+
 class Road:
 
     """
@@ -254,6 +337,10 @@ class Road:
             None  # index within ACTIVELANDSCAPE.roads, assigned by ACTIVELANDSCAPE
         )
 
+        # Landscape the road belongs to, assigned by Landscape.connect_intersections
+        # NOTE: speed limit changes before then do not invalidate anything derived from the road network
+        self.landscape: "Landscape" = None
+
         # Set starting intersection and ending intersection of the road
         self.start = start
         self.end = end
@@ -370,6 +457,8 @@ class Road:
     def set_speed_limit(self, speedlimit: float = 60) -> None:
         self.speedLimit = speedlimit
         self.speedLimit_MPS = speedlimit * 1000 / 3600
+        if self.landscape is not None:
+            self.landscape.road_network_changed()
 
     def calculate_traversal_time(self) -> None:  # calculates traversal time in seconds
         self.traversalTime = self.length / self.speedLimit_MPS
@@ -428,6 +517,156 @@ class LandPlotDescriptor:
         self.randomOrientation = randomOrientation
 
 
+class PlacementIndex:
+
+    """
+    Index of the valid placement coordinates of land plots of a single size, see Landscape.random_placement.
+
+    valid[y][x] is True if a land plot of this size fits with its bottom left corner at (x, y).
+    Coordinates only ever become invalid (cells are never freed), so the index is updated by clearing the
+    coordinates around every newly placed land plot, without rescanning the grid.
+    Valid coordinates are also counted per row, so the k-th valid coordinate (ordered by y, then x)
+    is found in O(xSize + ySize) of the landscape, instead of O(xSize * ySize).
+    """
+
+    def __init__(self, valid: np.ndarray, xSize: int, ySize: int) -> None:
+        # Set size of the indexed land plots in number of cells
+        self.xSize = xSize
+        self.ySize = ySize
+
+        self.valid = valid
+        self.rowCounts: np.ndarray = valid.sum(axis=1, dtype=np.int64)
+        self.count = int(self.rowCounts.sum())  # number of valid coordinates
+
+    def remove_area(self, xPos: int, yPos: int, xSize: int, ySize: int) -> None:
+        """
+        Invalidates every coordinate at which a land plot would overlap the newly taken xSize by ySize rectangle
+        with bottom left coordinate (xPos, yPos).
+        """
+        xStart, yStart = max(0, xPos - self.xSize + 1), max(0, yPos - self.ySize + 1)
+        region = self.valid[yStart:yPos + ySize, xStart:xPos + xSize]
+        removed = region.sum(axis=1, dtype=np.int64)
+        if not removed.any():
+            return
+        region[:] = False
+        self.rowCounts[yStart:yStart + len(removed)] -= removed
+        self.count -= int(removed.sum())
+
+    def select(self, index: int) -> tuple[int, int]:
+        """
+        Returns the index-th valid coordinate (x, y), ordered by y, then x, i.e. get_valid_placements(...)[index].
+        """
+        cumulativeCounts = np.cumsum(self.rowCounts)
+        y = int(np.searchsorted(cumulativeCounts, index, side="right"))
+        x = int(np.flatnonzero(self.valid[y])[index - (cumulativeCounts[y] - self.rowCounts[y])])
+        return (x, y)
+
+
+
+class TileMatrix:
+
+    """
+    View of Landscape.tileMatrix (a uint8 array of tile codes) that reads and writes tile names,
+    i.e. landscapeMatrix[y][x] => None, "LP", "IS", "HR" or "VR", like the list of lists it replaces.
+    """
+
+    def __init__(self, landscape: "Landscape") -> None:
+        self.landscape = landscape
+
+    def __len__(self) -> int:
+        return self.landscape.tileMatrix.shape[0]
+
+    def __getitem__(self, y: int) -> "TileRow":
+        return TileRow(self.landscape.tileMatrix[y])
+
+    def __iter__(self):
+        for tiles in self.landscape.tileMatrix:
+            yield TileRow(tiles)
+
+    def flatten(self) -> list[str]:
+        """
+        Returns the tile names of every cell, row by row.
+        """
+        return np.array(TILE_NAMES, dtype=object)[self.landscape.tileMatrix].ravel().tolist()
+
+
+class TileRow:
+
+    """
+    View of a single row of Landscape.tileMatrix, see TileMatrix.
+    """
+
+    __slots__ = ("tiles",)
+
+    def __init__(self, tiles: np.ndarray) -> None:
+        self.tiles = tiles
+
+    def __len__(self) -> int:
+        return len(self.tiles)
+
+    def __getitem__(self, x: int) -> str:
+        return TILE_NAMES[self.tiles[x]]
+
+    def __setitem__(self, x: int, name: str) -> None:
+        self.tiles[x] = TILE_CODES[name]
+
+    def __iter__(self):
+        return iter([TILE_NAMES[code] for code in self.tiles.tolist()])
+
+    def __eq__(self, other) -> bool:
+        return list(self) == list(other)
+
+
+class LandMap(Mapping):
+
+    """
+    View of Landscape.landPlotIDMatrix that behaves like the hashmap it replaces, i.e. landMap[(y, x)] => LandPlot.
+    Only cells of land plots registered within Landscape.landPlots are keys.
+    """
+
+    def __init__(self, landscape: "Landscape") -> None:
+        self.landscape = landscape
+
+    def __getitem__(self, coordinate: tuple[int, int]) -> LandPlot:
+        y, x = coordinate
+        landPlotIDs = self.landscape.landPlotIDMatrix
+        if not (0 <= y < landPlotIDs.shape[0] and 0 <= x < landPlotIDs.shape[1]) or landPlotIDs[y, x] < 0:
+            raise KeyError(coordinate)
+        return self.landscape.landPlots[landPlotIDs[y, x]]
+
+    def __iter__(self):
+        for y, x in np.argwhere(self.landscape.landPlotIDMatrix >= 0).tolist():
+            yield (y, x)
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self.landscape.landPlotIDMatrix >= 0))
+
+
+class CoordToRoad(Mapping):
+
+    """
+    View of Landscape.roadIDMatrix that behaves like the hashmap it replaces, i.e. coordToRoad[(x, y)] => (Road, Road).
+    Only road cells recorded by Landscape.connect_intersections are keys.
+    """
+
+    def __init__(self, landscape: "Landscape") -> None:
+        self.landscape = landscape
+
+    def __getitem__(self, coordinate: tuple[int, int]) -> tuple["Road", "Road"]:
+        x, y = coordinate
+        roadIDs = self.landscape.roadIDMatrix
+        if not (0 <= y < roadIDs.shape[0] and 0 <= x < roadIDs.shape[1]) or roadIDs[y, x, 0] < 0:
+            raise KeyError(coordinate)
+        roads = self.landscape.roads
+        return (roads[roadIDs[y, x, 0]], roads[roadIDs[y, x, 1]])
+
+    def __iter__(self):
+        for y, x in np.argwhere(self.landscape.roadIDMatrix[:, :, 0] >= 0).tolist():
+            yield (x, y)
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self.landscape.roadIDMatrix[:, :, 0] >= 0))
+
 
 class Landscape:
 
@@ -506,14 +745,23 @@ class Landscape:
         # Counter for the amount of available area remaing in gridMatrix
         self.availableArea = self.xSize * self.ySize
 
-        # 2D matrix representing the generated landscape, x and y are cell coordinates
-        self.landscapeMatrix: list[list[str]] = [
-            [None for i in range(self.xSize)] for j in range(self.ySize)
-        ]
+        # Occupancy of gridMatrix (True if the cell is taken by a land plot), kept in sync by place_feature
+        self.occupancy = np.zeros((self.ySize, self.xSize), dtype=bool)
+        # Summed-area table of occupancy, rebuilt on first use after a placement, see occupancy_table
+        self.occupancyTable: np.ndarray = None
+
+        # Valid placement coordinates of every land plot size placed so far, kept in sync by place_feature
+        self.placementIndexes: dict[tuple[int, int], PlacementIndex] = {}
+
+        # 2D matrix representing the generated landscape as tile codes (see TILE_NAMES), x and y are cell coordinates
+        self.tileMatrix = np.zeros((self.ySize, self.xSize), dtype=np.uint8)
+        self.landscapeMatrix = TileMatrix(self)  # landscapeMatrix[y][x] => tile name
 
         # Component references
         self.landPlots: list[LandPlot] = []
-        self.landMap: dict[tuple[int, int], LandPlot] = {}  # coord: land plot
+        # Index within self.landPlots of the land plot of every cell, -1 if none
+        self.landPlotIDMatrix = np.full((self.ySize, self.xSize), -1, dtype=np.int32)
+        self.landMap = LandMap(self)  # coord: land plot
         self.roads: list[Road] = []
         self.intersections: dict[
             tuple[int, int], Intersection
@@ -524,9 +772,26 @@ class Landscape:
             dict
         )
 
-        # Hashmap for accessing the road of a particular coordinate, first Road has smaller coords than second Road
-        self.coordToRoad: dict[tuple[int, int], tuple[Road, Road]] = {}
-        # i.e. first Road goes west or south, second Road goes east or north
+        # Index within self.roads (i.e. roadID) of the two roads covering every cell, -1 if none,
+        # the first road has smaller coords than the second road, i.e. first road goes west or south, second road goes east or north
+        self.roadIDMatrix = np.full((self.ySize, self.xSize, 2), -1, dtype=np.int32)
+        self.coordToRoad = CoordToRoad(self)  # coord: (road, road)
+
+        # Integer-indexed road graph used by the routing algorithms, compiled lazily via RoadGraph.getRoadGraph
+        self.roadGraph = None
+
+        # Cache of selfish routes, created lazily via RouteCache.getRouteCache
+        self.routeCache = None
+
+        # Incremented whenever a speed limit or the road network of this landscape changes, see road_network_changed
+        self.roadNetworkRevision: int = 0
+
+    def road_network_changed(self) -> None:
+        """
+        Invalidates everything derived from the speed limits or the road network of this landscape,
+        i.e. its compiled road graph and cached routes.
+        """
+        self.roadNetworkRevision += 1
 
     @staticmethod
     def generate_features(
@@ -567,35 +832,69 @@ class Landscape:
 
         return generatedFeatures
 
-    def get_valid_placements(self, feature: LandPlot) -> list[tuple[int, int]]:
+    def occupancy_table(self) -> np.ndarray:
         """
-        Returns a list of all possible bottom left coordinates where the feature land plot can fit within self.gridMatrix.
+        Returns the summed-area table of self.occupancy, i.e. table[y][x] is the number of taken cells
+        with coordinates smaller than (x, y). Built in a single vectorised pass, then reused until the next placement.
         """
+        if self.occupancyTable is None:
+            self.occupancyTable = np.zeros((self.ySize + 1, self.xSize + 1), dtype=np.int32)
+            np.cumsum(np.cumsum(self.occupancy, axis=0, dtype=np.int32), axis=1, out=self.occupancyTable[1:, 1:])
+        return self.occupancyTable
 
-        valid_coordinates: list[tuple[int, int]] = []
+    def is_area_free(self, xPos: int, yPos: int, xSize: int, ySize: int) -> bool:
+        """
+        Checks whether no cell of the xSize by ySize rectangle with bottom left coordinate (xPos, yPos) is taken, in O(1).
+        """
+        table = self.occupancy_table()
+        return (
+            table[yPos + ySize, xPos + xSize] - table[yPos, xPos + xSize]
+            - table[yPos + ySize, xPos] + table[yPos, xPos]
+        ) == 0
+
+    def valid_placement_matrix(self, xSize: int, ySize: int) -> np.ndarray:
+        """
+        Returns valid[y][x], True if a xSize by ySize land plot fits with its bottom left corner at (x, y).
+
+        The number of taken cells covered by the land plot at every placement coordinate is computed at once
+        from the summed-area table, so every coordinate is checked in O(1) instead of checking every covered cell.
+        """
+
+        if xSize > self.xSize or ySize > self.ySize:
+            return np.zeros((0, 0), dtype=bool)
+
+        # taken[y][x] => number of taken cells covered by the land plot when placed at (x, y)
+        table = self.occupancy_table()
+        taken = (
+            table[ySize:, xSize:] - table[:-ySize, xSize:]
+            - table[ySize:, :-xSize] + table[:-ySize, :-xSize]
+        )
+        return taken == 0
 
-        # Check every possibly valid placement coordinate
-        for ycoord in range(self.ySize - feature.ySize + 1):
-            for xcoord in range(self.xSize - feature.xSize + 1):
-                # Assume current placement coordinate is valid
-                valid = True
+    def get_valid_placements(self, feature: LandPlot) -> list[tuple[int, int]]:
+        """
+        Returns a list of all possible bottom left coordinates where the feature land plot can fit within self.gridMatrix.
+        Coordinates are ordered by y, then x.
+        """
 
-                # Check every cell covered by the feature land plot
-                for y in range(ycoord, ycoord + feature.ySize):
-                    for x in range(xcoord, xcoord + feature.xSize):
-                        # cell has already been taken by another land plot
-                        if self.gridMatrix[y][x] != None:
-                            valid = False
-                            break
+        ycoords, xcoords = np.nonzero(self.valid_placement_matrix(feature.xSize, feature.ySize))
+        return list(zip(xcoords.tolist(), ycoords.tolist()))
 
-                    if not valid:
-                        break
+    def random_placement(self, feature: LandPlot) -> tuple[int, int]:
+        """
+        Returns a random valid bottom left coordinate for the feature land plot, or None if it cannot fit anywhere.
+        Equivalent to picking a random element of get_valid_placements, but uses the placement index of the size,
+        so no rescan of the grid is needed and sizes that cannot fit anymore are rejected in O(1).
+        """
 
-                # Append valid coordinates to list
-                if valid:
-                    valid_coordinates.append((xcoord, ycoord))
+        size = (feature.xSize, feature.ySize)
+        if size not in self.placementIndexes:
+            self.placementIndexes[size] = PlacementIndex(self.valid_placement_matrix(*size), *size)
+        placementIndex = self.placementIndexes[size]
 
-        return valid_coordinates
+        if placementIndex.count == 0:
+            return None
+        return placementIndex.select(randint(0, placementIndex.count - 1))
 
     def place_feature(self, feature: LandPlot, xPos: int, yPos: int) -> None:
         """
@@ -609,17 +908,22 @@ class Landscape:
             for x in range(xPos, xPos + feature.xSize):
                 self.gridMatrix[y][x] = (xPos, yPos)
                 self.availableArea -= 1
+        self.occupancy[yPos:yPos + feature.ySize, xPos:xPos + feature.xSize] = True
+        self.occupancyTable = None
+        for placementIndex in self.placementIndexes.values():
+            placementIndex.remove_area(xPos, yPos, feature.xSize, feature.ySize)
 
     def connect_intersections(
         self, intersection1: Intersection, intersection2: Intersection
     ) -> None:
         """
         Connects two intersections by creating two roads that go in opposite directions.
-        Then updates self.coordToRoad for vehicle agents to easily locate the road they're on.
+        Then updates self.roadIDMatrix (see self.coordToRoad) for vehicle agents to easily locate the road they're on.
         """
 
         # Generate random speed limit for both roads
         random_speed_limit = randint(40, 80)
+        self.road_network_changed()
 
         # Add intersection to component references
         self.intersections[intersection1.coordinates()] = intersection1
@@ -629,6 +933,7 @@ class Landscape:
         intersection1.neighbours.append(intersection2)
         road1 = Road(intersection1.coordinates(), intersection2.coordinates())
         road1.set_speed_limit(random_speed_limit)
+        road1.landscape = self
         self.roadmap[intersection1.coordinates()][intersection2.coordinates()] = road1
         self.roads.append(road1)
 
@@ -636,51 +941,49 @@ class Landscape:
         intersection2.neighbours.append(intersection1)
         road2 = Road(intersection2.coordinates(), intersection1.coordinates())
         road2.set_speed_limit(random_speed_limit)
+        road2.landscape = self
         self.roadmap[intersection2.coordinates()][intersection1.coordinates()] = road2
         self.roads.append(road2)
 
-        # Update self.coordToRoad to map every cell covered by road to road
+        # Update self.roadIDMatrix to map every cell covered by road to road (index within self.roads, i.e. roadID)
+        road1ID, road2ID = len(self.roads) - 2, len(self.roads) - 1
         if intersection1.yPos == intersection2.yPos:  # horizontally alligned
             if (
                 intersection1.xPos < intersection2.xPos
             ):  # intersection 1 is to the left of intersection 2
-                roadWest, roadEast = road2, road1
+                roadWest, roadEast = road2ID, road1ID
             else:  # intersection 2 is to the left of intersection 1
-                roadWest, roadEast = road1, road2
+                roadWest, roadEast = road1ID, road2ID
 
-            for xCoord in range(intersection1.xPos + 1, intersection2.xPos):
-                self.coordToRoad[(xCoord, intersection1.yPos)] = (roadWest, roadEast)
+            self.roadIDMatrix[intersection1.yPos, intersection1.xPos + 1:intersection2.xPos] = (roadWest, roadEast)
 
         else:  # vertically alligned
             if (
                 intersection1.yPos < intersection2.yPos
             ):  # intersection 1 is to the south of intersection 2
-                roadSouth, roadNorth = road2, road1
+                roadSouth, roadNorth = road2ID, road1ID
             else:  # intersection 2 is to the south of intersection 1
-                roadSouth, roadNorth = road1, road2
+                roadSouth, roadNorth = road1ID, road2ID
 
-            for yCoord in range(intersection1.yPos + 1, intersection2.yPos):
-                self.coordToRoad[(intersection1.xPos, yCoord)] = (roadSouth, roadNorth)
+            self.roadIDMatrix[intersection1.yPos + 1:intersection2.yPos, intersection1.xPos] = (roadSouth, roadNorth)
 
     def label_intersections(self, pos1: tuple[int, int], pos2: tuple[int, int]):
         """
-        Labels intersections on self.landscapeMatrix, as well as the roads in between.
+        Labels intersections on self.tileMatrix, as well as the roads in between.
         Does NOT create any intersection or road objects.
         """
 
-        # Add intersection labels to self.landscapeMatrix
-        self.landscapeMatrix[pos1[1]][pos1[0]] = "IS"
-        self.landscapeMatrix[pos2[1]][pos2[0]] = "IS"
+        # Add intersection labels to self.tileMatrix
+        self.tileMatrix[pos1[1], pos1[0]] = TILE_CODES["IS"]
+        self.tileMatrix[pos2[1], pos2[0]] = TILE_CODES["IS"]
 
-        # Add road labels between the two intersections to self.landscapeMatrix
+        # Add road labels between the two intersections to self.tileMatrix, only over unassigned cells
         if pos1[1] == pos2[1]:  # horizontal roads
-            for xCoord in range(min(pos1[0], pos2[0]) + 1, max(pos1[0], pos2[0])):
-                if self.landscapeMatrix[pos1[1]][xCoord] == None:
-                    self.landscapeMatrix[pos1[1]][xCoord] = "HR"
+            cells = self.tileMatrix[pos1[1], min(pos1[0], pos2[0]) + 1:max(pos1[0], pos2[0])]
+            cells[cells == TILE_CODES[None]] = TILE_CODES["HR"]
         else:  # vertical roads
-            for yCoord in range(min(pos1[1], pos2[1]) + 1, max(pos1[1], pos2[1])):
-                if self.landscapeMatrix[yCoord][pos1[0]] == None:
-                    self.landscapeMatrix[yCoord][pos1[0]] = "VR"
+            cells = self.tileMatrix[min(pos1[1], pos2[1]) + 1:max(pos1[1], pos2[1]), pos1[0]]
+            cells[cells == TILE_CODES[None]] = TILE_CODES["VR"]
 
     def generate_new_landscape(
         self,
@@ -717,23 +1020,14 @@ class Landscape:
         featuresToAdd = Landscape.generate_features(desiredFeatures=desiredFeatures)
         featuresToAdd.sort(key=lambda feature: feature.area(), reverse=True)
 
-        # Skip impossible placements quickly via temporary optimisation hashmap
-        isUnplaceable: dict[tuple[int, int] : bool] = defaultdict(lambda: False)
-
-        # Fit feature land plots into the landscape
+        # Fit feature land plots into the landscape, impossible placements are skipped quickly via the placement indexes
         for feature in featuresToAdd:
-            if isUnplaceable[(feature.xSize, feature.ySize)]:
-                continue
             if feature.area() > self.availableArea:
-                isUnplaceable[(feature.xSize, feature.ySize)] = True
                 continue
-            valid_coordinates = self.get_valid_placements(feature)
-            if not valid_coordinates:
-                isUnplaceable[(feature.xSize, feature.ySize)] = True
+            placement = self.random_placement(feature)
+            if placement is None:
                 continue
-            self.place_feature(
-                feature, *valid_coordinates[randint(0, len(valid_coordinates) - 1)]
-            )
+            self.place_feature(feature, *placement)
 
         # Generate filler land plots, then sort by decreasing area (place larger features first)
         fillerFeatures = Landscape.generate_features(
@@ -743,15 +1037,10 @@ class Landscape:
 
         # Fill in remaining area with filler, remaining area may not be completely filled if filler isn't 1 by 1
         for feature in fillerFeatures:
-            if isUnplaceable[(feature.xSize, feature.ySize)]:
+            placement = self.random_placement(feature)
+            if placement is None:
                 continue
-            valid_coordinates = self.get_valid_placements(feature)
-            if not valid_coordinates:
-                isUnplaceable[(feature.xSize, feature.ySize)] = True
-                continue
-            self.place_feature(
-                feature, *valid_coordinates[randint(0, len(valid_coordinates) - 1)]
-            )
+            self.place_feature(feature, *placement)
 
         self.generate_landscape_matrix()
 
@@ -768,135 +1057,87 @@ class Landscape:
 
     def generate_landscape_matrix(self) -> None:
         """
-        Generates and updates self.landscapeMatrix from self.gridMatrix.
+        Generates and updates self.tileMatrix (see self.landscapeMatrix) from self.gridMatrix.
         Landscape matrix is an unpacked version of grid matrix with road cells.
         """
 
-        # Buffer arrays for road expansions
-        xBuffer = [False for i in range(self.xSize)]
-        yBuffer = [False for i in range(self.ySize)]
-
-        # Counters for getting the new X and Y coordinates after road insertions
-        xExtend = 0
-        yExtend = 0
-
-        self.landscapeMatrix = deepcopy(self.gridMatrix)
-
-        # Extend width of landscape for new roads
-        for prevX in range(self.xSize):
-            for prevY in range(self.ySize):
-                # Skip unassigned area
-                if self.gridMatrix[prevY][prevX] == None:
-                    continue
-
-                # Calculate corresponding coordiantes in landscapeMatrix
-                newX, newY = prevX + xExtend, prevY + yExtend
-
-                # Check neighbour cell to the right, if it belongs to a different plot of land then add road
-                if (
-                    prevX < self.xSize - 1
-                    and self.gridMatrix[prevY][prevX]
-                    != self.gridMatrix[prevY][prevX + 1]
-                ):
-                    # Extend width of landscape matrix if not already extended
-                    if not xBuffer[prevX]:
-                        for y in range(self.ySize + yExtend):
-                            self.landscapeMatrix[y].insert(
-                                newX + 1,
-                                self.landscapeMatrix[y][newX]
-                                if self.landscapeMatrix[y][newX]
-                                == self.landscapeMatrix[y][newX + 1]
-                                else None,
-                            )
-                        xBuffer[prevX] = True
-                        xExtend += 1
-
-        # # Uncomment to see the results of horizontal extension
-        # for i in range(len(self.landscapeMatrix)):
-        #     print(self.landscapeMatrix[i])
-        # print()
+        # Land plot of every cell as an integer, 0 for unassigned area, land plots are identified by their coordinates
+        landPlotCells = [None]  # landPlotCells[landPlotID] => the gridMatrix entry of the land plot
+        landPlotIDs: dict[tuple[int, int], int] = {}
+        for row in self.gridMatrix:
+            for cell in row:
+                if cell is not None and cell not in landPlotIDs:
+                    landPlotIDs[cell] = len(landPlotCells)
+                    landPlotCells.append(cell)
+        grid = np.array(
+            [[0 if cell is None else landPlotIDs[cell] for cell in row] for row in self.gridMatrix], dtype=np.int64
+        ).reshape(self.ySize, self.xSize)
+
+        # Buffer arrays for road expansions, a road is inserted after every column (row) in which
+        # an assigned cell belongs to a different land plot than its neighbour to the right (below)
+        xBuffer = np.zeros(self.xSize, dtype=bool)
+        xBuffer[:-1] = ((grid[:, :-1] != 0) & (grid[:, :-1] != grid[:, 1:])).any(axis=0)
+        yBuffer = np.zeros(self.ySize, dtype=bool)
+        yBuffer[:-1] = ((grid[:-1, :] != 0) & (grid[:-1, :] != grid[1:, :])).any(axis=1)
+
+        # Counters for getting the new X and Y coordinates after road insertions,
+        # i.e. every column (row) moves by the number of roads inserted before it
+        newX = np.arange(self.xSize) + np.cumsum(xBuffer) - xBuffer
+        newY = np.arange(self.ySize) + np.cumsum(yBuffer) - yBuffer
+        xExtend, yExtend = int(xBuffer.sum()), int(yBuffer.sum())
+
+        # Extend width of landscape for new roads, an inserted cell continues the land plot on both of its sides
+        widened = np.zeros((self.ySize, self.xSize + xExtend), dtype=np.int64)
+        widened[:, newX] = grid
+        widened[:, newX[xBuffer] + 1] = np.where(grid[:, :-1] == grid[:, 1:], grid[:, :-1], 0)[:, xBuffer[:-1]]
 
         # Extend length of landscape for new roads
-        for prevY in range(self.ySize):
-            for prevX in range(self.xSize):
-                # Skip unassigned area
-                if self.gridMatrix[prevY][prevX] == None:
-                    continue
-
-                # Calculate corresponding coordiantes in landscapeMatrix
-                newX, newY = prevX + xExtend, prevY + yExtend
-
-                # Check neighbour cell below, if it belongs to a different plot of land then add road
-                if (
-                    prevY < self.ySize - 1
-                    and self.gridMatrix[prevY][prevX]
-                    != self.gridMatrix[prevY + 1][prevX]
-                ):
-                    # Extend length of landscape matrix if not already extended
-                    if not yBuffer[prevY]:
-                        self.landscapeMatrix.insert(
-                            newY + 1,
-                            [
-                                self.landscapeMatrix[newY][x]
-                                if self.landscapeMatrix[newY][x]
-                                == self.landscapeMatrix[newY + 1][x]
-                                else None
-                                for x in range(self.xSize + xExtend)
-                            ],
-                        )
-                        yBuffer[prevY] = True
-                        yExtend += 1
-
-        # # Uncomment to see the results of vertical extension
-        # for i in range(len(self.landscapeMatrix)):
-        #     print(self.landscapeMatrix[i])
-        # print()
+        expanded = np.zeros((self.ySize + yExtend, self.xSize + xExtend), dtype=np.int64)
+        expanded[newY] = widened
+        expanded[newY[yBuffer] + 1] = np.where(widened[:-1] == widened[1:], widened[:-1], 0)[yBuffer[:-1]]
 
         # Update actual map size
         self.xSize += xExtend
         self.ySize += yExtend
 
         # Pad landscape for land plot reconstruction and road fitting
-        self.landscapeMatrix = (
-            [[None for i in range(self.xSize + 2)]]
-            + [[None] + self.landscapeMatrix[i] + [None] for i in range(self.ySize)]
-            + [[None for i in range(self.xSize + 2)]]
-        )
+        padded = np.pad(expanded, 1)
+        landPlotGrid = padded.tolist()
 
-        # Reconstruct all land plots
-        for yPos in range(1, self.ySize + 1):
-            for xPos in range(1, self.xSize + 1):
-                # Skip unassigned area
-                if self.landscapeMatrix[yPos][xPos] == None:
-                    continue
+        # Every cell of a land plot is tiled as a land plot until roads are labelled, unassigned area stays unassigned
+        self.tileMatrix = np.where(padded != 0, TILE_CODES["LP"], TILE_CODES[None]).astype(np.uint8)
+        self.landPlotIDMatrix = np.full(padded.shape, -1, dtype=np.int32)
+        self.roadIDMatrix = np.full(padded.shape + (2,), -1, dtype=np.int32)
 
-                landPlotID = self.landscapeMatrix[yPos][xPos]
+        # Bottom left corners of all land plots, i.e. assigned cells whose west and south neighbours belong to other land plots
+        isCorner = np.zeros(padded.shape, dtype=bool)
+        isCorner[1:, 1:] = (padded[1:, 1:] != 0) & (padded[1:, 1:] != padded[1:, :-1]) & (padded[1:, 1:] != padded[:-1, 1:])
 
-                # If the current cell is the bottom left corner, create new land plot
-                if (
-                    landPlotID != self.landscapeMatrix[yPos][xPos - 1]
-                    and landPlotID != self.landscapeMatrix[yPos - 1][xPos]
-                ):
-                    # Initiate size variables of the land plot
-                    xSize, ySize = 0, 0
+        # Reconstruct all land plots, in row-major order of their corners
+        for yPos, xPos in np.argwhere(isCorner).tolist():
+            landPlotID = landPlotGrid[yPos][xPos]
 
-                    for xCoord in range(xPos, self.xSize + 1):
-                        if self.landscapeMatrix[yPos][xCoord] == landPlotID:
-                            xSize += 1
+            # Initiate size variables of the land plot
+            xSize, ySize = 0, 0
 
-                    for yCoord in range(yPos, self.ySize + 1):
-                        if self.landscapeMatrix[yCoord][xPos] == landPlotID:
-                            ySize += 1
+            # Land plots are still contiguous rectangles after road insertions, so their size ends at the first other cell
+            for xCoord in range(xPos, self.xSize + 1):
+                if landPlotGrid[yPos][xCoord] != landPlotID:
+                    break
+                xSize += 1
+
+            for yCoord in range(yPos, self.ySize + 1):
+                if landPlotGrid[yCoord][xPos] != landPlotID:
+                    break
+                ySize += 1
 
-                    # Create land plot
-                    landPlot = LandPlot(xSize, ySize)
-                    landPlot.set_coordinate(xPos, yPos)
-                    self.landPlots.append(landPlot)
+            # Create land plot
+            landPlot = LandPlot(xSize, ySize)
+            landPlot.set_coordinate(xPos, yPos)
 
-                    # Add land plot to component references
-                    for yCoord in range(yPos, yPos + ySize):
-                        for xCoord in range(xPos, xPos + xSize):
-                            self.landMap[(yCoord, xCoord)] = landPlot
+            # Add land plot to component references
+            self.landPlotIDMatrix[yPos:yPos + ySize, xPos:xPos + xSize] = len(self.landPlots)
+            self.landPlots.append(landPlot)
 
         # Create roads and intersections
         for landPlot in self.landPlots:
@@ -926,19 +1167,20 @@ class Landscape:
             self.label_intersections(topRight.coordinates(), topLeft.coordinates())
 
             # Update land plot labels
-            for yCoord in range(landPlot.yPos, landPlot.yPos + landPlot.ySize):
-                for xCoord in range(landPlot.xPos, landPlot.xPos + landPlot.xSize):
-                    self.landscapeMatrix[yCoord][xCoord] = "LP"
+            self.tileMatrix[
+                landPlot.yPos:landPlot.yPos + landPlot.ySize, landPlot.xPos:landPlot.xPos + landPlot.xSize
+            ] = TILE_CODES["LP"]
 
         # # Unpad landscape to remove the artificialroad perimeter
         # self.landscapeMatrix = [self.landscapeMatrix[i][1:self.xSize+1] for i in range(1, self.ySize+1)]
 
         # Fill unassigned area with land plots
-        for yCoord in range(self.ySize + 2):
-            for xCoord in range(self.xSize + 2):
-                if self.landscapeMatrix[yCoord][xCoord] == None:
-                    self.landscapeMatrix[yCoord][xCoord] = "LP"
-                    # NOTE: land plots added here are NOT registered within self.landPlots or self.landMap
+        self.tileMatrix[self.tileMatrix == TILE_CODES[None]] = TILE_CODES["LP"]
+        # NOTE: land plots added here are NOT registered within self.landPlots or self.landMap
+
+        # Plain lists of tile codes are much faster to scan cell by cell than the array
+        tiles = self.tileMatrix.tolist()
+        IS, LP = TILE_CODES["IS"], TILE_CODES["LP"]
 
         # Connect intersections via DFS and create road objects for graph
         stack = []
@@ -957,7 +1199,7 @@ class Landscape:
             visited.add((xPos, yPos))
 
             for xCoord in range(xPos + 1, self.xSize + 2):  # search for east neighbour
-                if self.landscapeMatrix[yPos][xCoord] == "IS":
+                if tiles[yPos][xCoord] == IS:
                     if (xCoord, yPos) not in visited:
                         self.connect_intersections(
                             self.intersections[(xPos, yPos)],
@@ -965,11 +1207,11 @@ class Landscape:
                         )
                         stack.append((xCoord, yPos))
                     break
-                elif self.landscapeMatrix[yPos][xCoord] == "LP":
+                elif tiles[yPos][xCoord] == LP:
                     break
 
             for xCoord in range(xPos - 1, -1, -1):  # search for west neighbour
-                if self.landscapeMatrix[yPos][xCoord] == "IS":
+                if tiles[yPos][xCoord] == IS:
                     if (xCoord, yPos) not in visited:
                         self.connect_intersections(
                             self.intersections[(xPos, yPos)],
@@ -977,11 +1219,11 @@ class Landscape:
                         )
                         stack.append((xCoord, yPos))
                     break
-                elif self.landscapeMatrix[yPos][xCoord] == "LP":
+                elif tiles[yPos][xCoord] == LP:
                     break
 
             for yCoord in range(yPos + 1, self.ySize + 2):  # search for north neighbour
-                if self.landscapeMatrix[yCoord][xPos] == "IS":
+                if tiles[yCoord][xPos] == IS:
                     if (xPos, yCoord) not in visited:
                         self.connect_intersections(
                             self.intersections[(xPos, yPos)],
@@ -989,11 +1231,11 @@ class Landscape:
                         )
                         stack.append((xPos, yCoord))
                     break
-                elif self.landscapeMatrix[yCoord][xPos] == "LP":
+                elif tiles[yCoord][xPos] == LP:
                     break
 
             for yCoord in range(yPos - 1, -1, -1):  # search for south neighbour
-                if self.landscapeMatrix[yCoord][xPos] == "IS" and (xPos, yCoord):
+                if tiles[yCoord][xPos] == IS and (xPos, yCoord):
                     if (xPos, yCoord) not in visited:
                         self.connect_intersections(
                             self.intersections[(xPos, yPos)],
@@ -1001,7 +1243,7 @@ class Landscape:
                         )
                         stack.append((xPos, yCoord))
                     break
-                elif self.landscapeMatrix[yCoord][xPos] == "LP":
+                elif tiles[yCoord][xPos] == LP:
                     break
 
     def calculateRoadData(self):
@@ -1051,7 +1293,7 @@ class Landscape:
         for inter in self.intersections.values():
             id = inter.coordinates()
 
-            if self.landscapeMatrix[id[1]][id[0]] != "IS":
+            if self.tileMatrix[id[1], id[0]] != TILE_CODES["IS"]:
                 raise ValueError("Found invalid intersection")
 
             enterRoadIDs: list[int] = []
@@ -0,0 +1,243 @@
+"""
+This script contains the space-time reservation table used by the AutoFlow routing algorithm.
+
+The table counts the number of AutoFlow vehicles expected on every road during every second of the simulation.
+It is stored as a dense NumPy array of roads x time slots (1 slot = 1 second):
+- reserving a road for [startTime, endTime) is a single slice addition instead of one increment per second
+- reading a time slot is a single array lookup instead of two nested dictionary lookups
+- memory usage is 4 bytes per slot, independent of the number of vehicles
+
+The time horizon (number of slots) grows by doubling whenever a reservation ends after it.
+
+SharedReservationTable stores the array in a multiprocessing.shared_memory block instead,
+so that worker processes can read the table without receiving a copy of it.
+
+ZoneReservationTable only stores the roads held by one zone of a sharded landscape, see ZoneSharding.
+"""
+
+
+# ================ IMPORTS ================
+import numpy as np
+
+from multiprocessing.shared_memory import SharedMemory
+
+# =========================================
+
+
+class ReservationTable:
+
+    """
+    Dense space-time reservation table, counts[roadID, timestamp in seconds] => number of vehicles on road at timestamp.
+    Time slots past the horizon have never been reserved and therefore hold no vehicles.
+    """
+
+    def __init__(self, roadCount: int, horizon: int = 256) -> None:
+        self.roadCount = roadCount
+        self.horizon = max(1, horizon)
+        self.counts = self.allocate(self.horizon)
+
+    def allocate(self, horizon: int) -> np.ndarray:
+        """
+        Returns an empty array of roads x horizon time slots.
+        """
+        return np.zeros((self.roadCount, horizon), dtype=np.int32)
+
+    def grow(self, timestamp: int) -> None:
+        """
+        Extends the horizon (by doubling) until timestamp is within it.
+        """
+        horizon = self.horizon
+        while horizon <= timestamp:
+            horizon *= 2
+        if horizon == self.horizon:
+            return
+        counts = self.allocate(horizon)
+        counts[:, :self.horizon] = self.counts
+        self.release()
+        self.counts = counts
+        self.horizon = horizon
+
+    def release(self) -> None:
+        """
+        Frees the array of the current horizon, called after it was copied into a larger array.
+        """
+        self.counts = None
+
+    def reserve(self, roadID: int, startTime: int, endTime: int, amount: int = 1) -> None:
+        """
+        Adds amount vehicles to the road for every time slot in [startTime, endTime).
+        """
+        startTime = max(0, startTime)
+        if endTime <= startTime:
+            return
+        if endTime > self.horizon:
+            self.grow(endTime - 1)
+        self.counts[roadID, startTime:endTime] += amount
+
+    def get(self, roadID: int, timestamp: int) -> int:
+        """
+        Returns the number of vehicles on the road at the given time slot.
+        """
+        if timestamp >= self.horizon:
+            return 0
+        return self.counts.item(roadID, timestamp)
+
+    def get_range(self, roadID: int, startTime: int, endTime: int) -> np.ndarray:
+        """
+        Returns the number of vehicles on the road for every time slot in [startTime, endTime).
+        """
+        startTime = max(0, startTime)
+        counts = np.zeros(max(0, endTime - startTime), dtype=np.int32)
+        available = min(endTime, self.horizon) - startTime
+        if available > 0:
+            counts[:available] = self.counts[roadID, startTime:startTime + available]
+        return counts
+
+
+class SharedReservationTable(ReservationTable):
+
+    """
+    Reservation table stored in shared memory, see ReservationTable.
+
+    Only the process that created the table may reserve time slots. Other processes attach to it
+    using (sharedName, roadCount, horizon), and must attach again after the horizon grows,
+    as growing moves the table into a new shared memory block (with a new sharedName).
+    """
+
+    def __init__(self, roadCount: int, horizon: int = 256) -> None:
+        self.owner = True
+        self.sharedMemory: SharedMemory = None
+        super().__init__(roadCount, horizon)
+
+    @classmethod
+    def attach(cls, sharedName: str, roadCount: int, horizon: int) -> "SharedReservationTable":
+        """
+        Attaches to a table created by another process, the table must only be read.
+        """
+        table = cls.__new__(cls)
+        table.owner = False
+        table.roadCount = roadCount
+        table.horizon = horizon
+        table.sharedMemory = SharedMemory(name=sharedName)  # workers share the resource tracker of the owner
+        table.counts = np.ndarray((roadCount, horizon), dtype=np.int32, buffer=table.sharedMemory.buf)
+        return table
+
+    @property
+    def sharedName(self) -> str:
+        return self.sharedMemory.name
+
+    def allocate(self, horizon: int) -> np.ndarray:
+        # The previous block is kept until the table has been copied, see grow
+        self.previousSharedMemory = self.sharedMemory
+        self.sharedMemory = SharedMemory(create=True, size=self.roadCount * horizon * 4)
+        counts = np.ndarray((self.roadCount, horizon), dtype=np.int32, buffer=self.sharedMemory.buf)
+        counts[:] = 0
+        return counts
+
+    def release(self) -> None:
+        self.counts = None  # the array must not outlive the block it points to
+        if self.previousSharedMemory is not None:
+            self.previousSharedMemory.close()
+            self.previousSharedMemory.unlink()
+            self.previousSharedMemory = None
+
+    def close(self) -> None:
+        """
+        Detaches from the shared memory block, which is also freed if this process created the table.
+        """
+        if self.sharedMemory is None:
+            return
+        self.counts = None
+        self.sharedMemory.close()
+        if self.owner:
+            self.sharedMemory.unlink()
+        self.sharedMemory = None
+
+
+class PersistentReservationTable(ReservationTable):
+
+    """
+    Reservation table that is kept for the whole simulation, see ReservationTable.
+
+    The first time slot is always the current simulation time (clock), times given to reserve and get
+    are therefore in seconds from now. Moving the clock forward expires all time slots before it.
+
+    Reservations made through reserve_vehicle are also recorded under the vehicle's id (its handle),
+    so that the remaining reservations of a vehicle can be withdrawn when it is given a new route.
+    """
+
+    def __init__(self, roadCount: int, horizon: int = 256) -> None:
+        super().__init__(roadCount, horizon)
+        self.clock = 0
+        self.vehicleReservations: dict[int, list[tuple[int, int, int, int]]] = {}
+        # vehicleReservations[vehicle id] => list of (roadID, start time, end time, amount), in simulation time
+
+    def advance(self, clock: int) -> None:
+        """
+        Moves the clock forward, time slots before the new clock expire.
+        """
+        shift = clock - self.clock
+        if shift <= 0:
+            return
+        if shift >= self.horizon:
+            self.counts[:] = 0
+        else:
+            self.counts[:, :-shift] = self.counts[:, shift:]
+            self.counts[:, -shift:] = 0
+        self.clock = clock
+
+    def reserve_vehicle(self, vehicleID: int, roadID: int, startTime: int, endTime: int, amount: int = 1) -> None:
+        """
+        Reserves the road for [startTime, endTime) seconds from now on behalf of a vehicle, see reserve.
+        """
+        self.reserve(roadID, startTime, endTime, amount)
+        if vehicleID not in self.vehicleReservations:
+            self.vehicleReservations[vehicleID] = []
+        self.vehicleReservations[vehicleID].append((roadID, self.clock + startTime, self.clock + endTime, amount))
+
+    def withdraw(self, vehicleID: int) -> list[tuple[int, int, int, int]]:
+        """
+        Removes the remaining reservations of a vehicle, returns all of its reservations (in simulation time).
+        """
+        reservations = self.vehicleReservations.pop(vehicleID, [])
+        for roadID, startTime, endTime, amount in reservations:
+            self.reserve(roadID, startTime - self.clock, endTime - self.clock, -amount)  # expired time slots are skipped
+        return reservations
+
+    def reservations(self, vehicleID: int) -> list[tuple[int, int, int, int]]:
+        """
+        Returns all reservations of a vehicle (in simulation time), an empty list if it has none.
+        """
+        return self.vehicleReservations.get(vehicleID, [])
+
+
+class ZoneReservationTable(ReservationTable):
+
+    """
+    Reservation table of the roads held by a single zone, see ZoneSharding.ZonePartition.
+    Roads are still referred to by roadID, each held road is mapped to a row of the table.
+    Roads the zone does not hold are treated as empty: they are never reserved and always hold no vehicles.
+    """
+
+    def __init__(self, roadIDs: list[int], roadCount: int, horizon: int = 256) -> None:
+        self.rowOfRoad: list[int] = [-1] * roadCount
+        for row, roadID in enumerate(roadIDs):
+            self.rowOfRoad[roadID] = row
+        super().__init__(len(roadIDs), horizon)
+
+    def reserve(self, roadID: int, startTime: int, endTime: int, amount: int = 1) -> None:
+        row = self.rowOfRoad[roadID]
+        if row != -1:
+            super().reserve(row, startTime, endTime, amount)
+
+    def get(self, roadID: int, timestamp: int) -> int:
+        row = self.rowOfRoad[roadID]
+        if row == -1 or timestamp >= self.horizon:
+            return 0
+        return self.counts.item(row, timestamp)
+
+    def get_range(self, roadID: int, startTime: int, endTime: int) -> np.ndarray:
+        row = self.rowOfRoad[roadID]
+        if row == -1:
+            return np.zeros(max(0, endTime - max(0, startTime)), dtype=np.int32)
+        return super().get_range(row, startTime, endTime)
@@ -0,0 +1,373 @@
+"""
+This script contains the compiled road graph that the routing algorithms operate on.
+
+A Landscape stores its road network as linked Road and Intersection objects, which are reached through hashmaps
+keyed by coordinate tuples and Intersection objects. That representation is convenient to build, but every lookup
+hashes a tuple or calls Intersection.__hash__, which dominates the cost of a path search.
+
+A RoadGraph is compiled once from a Landscape and stores the same network as flat lists indexed by roadID:
+- every road is a node, identified by its roadID
+- the successors of a road are stored in CSR (compressed sparse row) form, i.e. the successors of road i are
+  successorRoads[successorOffsets[i]:successorOffsets[i + 1]]
+- the traversal time of the virtual pathway that joins road i to each successor is stored alongside the successor
+
+Compiled graphs are cached on the landscape via getRoadGraph.
+"""
+
+
+# ================ IMPORTS ================
+from LandscapeComponents import *
+
+from heapq import heappush, heappop
+from math import inf
+from operator import sub
+# =========================================
+
+
+class RoadGraph:
+
+    """
+    Read-only, integer-indexed snapshot of the road network of a landscape.
+
+    Per-road lists (indexed by roadID):
+    - roadStartPos, roadEndPos: real starting & ending positions of the road
+    - roadDirX, roadDirY: unit direction of the road, e.g. (0, 1) for a road heading north
+    - roadLength, roadSpeed: real length in metres and speed limit in m/s
+    - roadTraversalTime: time taken to traverse the whole road, ignoring traffic lights
+    - roadLightCycle: length of the traffic light cycle at the road-end intersection, 0 if there is no traffic light
+    - roadWaitTable: green light lookup table of the road at the road-end intersection, see Intersection.waiting_time
+    - roadLightDuration, roadNeighbourCount, roadPassthroughRate: traffic light info used for congestion costs
+
+    Successor lists (CSR, see module docstring):
+    - successorOffsets: length roadCount + 1
+    - successorRoads: roadID of every road reachable from the end of a road (U turns excluded)
+    - successorPathwayTime: traversal time of the virtual pathway leading to the matching successor road
+
+    Predecessor lists (predecessorOffsets, predecessorRoads, predecessorPathwayTime) store the same edges transposed.
+
+    Static costs ignore traffic lights and congestion: moving from the start of road i to the start of a successor
+    road j costs roadTraversalTime[i] plus the traversal time of the virtual pathway between them.
+    """
+
+    def __init__(self, landscape: Landscape) -> None:
+        self.roadCount = len(landscape.roads)
+
+        # Per-road geometry
+        self.roadStartPos: list[tuple[float, float]] = []
+        self.roadEndPos: list[tuple[float, float]] = []
+        self.roadDirX: list[int] = []
+        self.roadDirY: list[int] = []
+        self.roadLength: list[float] = []
+        self.roadSpeed: list[float] = []
+        self.roadTraversalTime: list[float] = []
+
+        # Per-road traffic light info of the road-end intersection
+        self.roadLightCycle: list[int] = []
+        self.roadWaitTable: list[list[int]] = []
+        self.roadLightDuration: list[int] = []
+        self.roadNeighbourCount: list[int] = []
+        self.roadPassthroughRate: list[float] = []
+
+        # Successors in CSR form
+        self.successorOffsets: list[int] = [0]
+        self.successorRoads: list[int] = []
+        self.successorPathwayTime: list[float] = []
+
+        directions = {"N": (0, 1), "S": (0, -1), "E": (1, 0), "W": (-1, 0)}
+
+        for road in landscape.roads:
+            road_start_intersection: Intersection = landscape.intersections[road.start]
+            road_end_intersection: Intersection = landscape.intersections[road.end]
+
+            # Geometry
+            self.roadStartPos.append(road.startPosReal)
+            self.roadEndPos.append(road.endPosReal)
+            self.roadDirX.append(directions[road.direction][0])
+            self.roadDirY.append(directions[road.direction][1])
+            self.roadLength.append(road.length)
+            self.roadSpeed.append(road.speedLimit_MPS)
+            self.roadTraversalTime.append(
+                (
+                    (road.startPosReal[0] - road.endPosReal[0]) ** 2
+                    + (road.startPosReal[1] - road.endPosReal[1]) ** 2
+                )
+                ** 0.5
+                / road.speedLimit_MPS
+            )
+
+            # Traffic light info, only intersections with three or more roads have traffic lights
+            neighbourCount = len(road_end_intersection.neighbours)
+            self.roadNeighbourCount.append(neighbourCount)
+            self.roadLightDuration.append(road_end_intersection.trafficLightDuration)
+            if neighbourCount >= 3:
+                self.roadLightCycle.append(neighbourCount * road_end_intersection.trafficLightDuration)
+                self.roadWaitTable.append(road_end_intersection.trafficLightWaitTable[road_start_intersection])
+                self.roadPassthroughRate.append(
+                    road_end_intersection.trafficPassthroughRate[road_start_intersection]
+                )
+            else:
+                self.roadLightCycle.append(0)
+                self.roadWaitTable.append(None)
+                self.roadPassthroughRate.append(0)
+
+            # Successors, in the same order as road_end_intersection.neighbours
+            for neighbour_intersection in road_end_intersection.neighbours:
+                # No U turns allowed
+                if neighbour_intersection == road_start_intersection:
+                    continue
+
+                self.successorRoads.append(
+                    landscape.roadmap[road_end_intersection.coordinates()][
+                        neighbour_intersection.coordinates()
+                    ].roadID
+                )
+                self.successorPathwayTime.append(
+                    road_end_intersection.turn_traversal_time(road_start_intersection, neighbour_intersection)
+                )
+            self.successorOffsets.append(len(self.successorRoads))
+
+        # Predecessors in CSR form, i.e. the successor lists transposed
+        self.predecessorOffsets: list[int] = [0 for i in range(self.roadCount + 1)]
+        for roadID in self.successorRoads:
+            self.predecessorOffsets[roadID + 1] += 1
+        for roadID in range(self.roadCount):
+            self.predecessorOffsets[roadID + 1] += self.predecessorOffsets[roadID]
+
+        self.predecessorRoads: list[int] = [0 for i in range(len(self.successorRoads))]
+        self.predecessorPathwayTime: list[float] = [0 for i in range(len(self.successorRoads))]
+        insertPosition = self.predecessorOffsets[:-1]
+        for roadID in range(self.roadCount):
+            for index in range(self.successorOffsets[roadID], self.successorOffsets[roadID + 1]):
+                successorID = self.successorRoads[index]
+                self.predecessorRoads[insertPosition[successorID]] = roadID
+                self.predecessorPathwayTime[insertPosition[successorID]] = self.successorPathwayTime[index]
+                insertPosition[successorID] += 1
+
+        # Optional preprocessing results, see precomputeLandmarks and ContractionHierarchy.precomputeContractionHierarchy
+        self.landmarks: Landmarks = None
+        self.contractionHierarchy = None
+
+        # NumPy copies of the per-road arrays used to score vehicle priorities, see VehiclePriority.getRoadArrays
+        self.priorityArrays = None
+
+        # Revision of the road network the graph was compiled from, see getRoadGraph
+        self.revision = landscape.roadNetworkRevision
+
+    def real_position(self, roadID: int, position: float) -> tuple[float, float]:
+        """
+        Calculates the real 2D position given a roadID and a normalised position.
+        Equivalent to getRealPositionOnRoad in AutoFlow.
+        """
+        distance = self.roadLength[roadID] * position
+        startPos = self.roadStartPos[roadID]
+        return (
+            startPos[0] + self.roadDirX[roadID] * distance,
+            startPos[1] + self.roadDirY[roadID] * distance,
+        )
+
+    def build_route(
+        self, roads: list[int], destinationPosition: float
+    ) -> list[tuple[tuple[float, float], int]]:
+        """
+        Converts the sequence of roads travelled by a vehicle into a route, i.e. a list of (real position, roadID).
+
+        The first road is the road the vehicle starts on, the last road is the destination road.
+        An empty sequence means that the vehicle is already at its destination, while a single road means that
+        the destination is on the starting road, in front of the starting position.
+        """
+
+        if not roads:
+            return []
+
+        # Chronological sequence of (roadID, normalised position) nodes visited by the vehicle
+        if len(roads) == 1:
+            nodes = [(roads[0], destinationPosition)]
+        else:
+            nodes = [(roads[0], 1)]
+            for roadID in roads[1:-1]:
+                nodes.append((roadID, 0))
+                nodes.append((roadID, 1))
+            nodes.append((roads[-1], 0))
+            if destinationPosition != 0:
+                nodes.append((roads[-1], destinationPosition))
+
+        # Traceback order is used so duplicate coordinates are skipped exactly like the routers do
+        route: list[tuple[tuple[float, float], int]] = []
+        for roadID, position in reversed(nodes):
+            newRealPos = self.real_position(roadID, position)
+            if len(route) > 0 and newRealPos == route[-1][0]:
+                continue  # skip dupe coords in double intersections
+            route.append((newRealPos, roadID))
+        route.reverse()
+
+        return route
+
+
+    def static_distances(
+        self, sources: list[tuple[int, float]], reverse: bool = False
+    ) -> list[float]:
+        """
+        Dijkstra's algorithm over static costs, see class docstring.
+
+        Sources are given as (roadID, initial cost). Returns the static cost from the nearest source to the start of
+        every road, or from the start of every road to the nearest source if reverse is True.
+        Unreachable roads have an infinite cost.
+        """
+        return self.shortest_path_tree(sources, reverse)[0]
+
+    def shortest_path_tree(
+        self, sources: list[tuple[int, float]], reverse: bool = False
+    ) -> tuple[list[float], list[int]]:
+        """
+        Same as static_distances, but also returns the parent of every road within the shortest path tree.
+
+        If reverse is True, the parent of a road is its next hop, i.e. the successor road to take in order to
+        reach the nearest source. Sources and unreachable roads have a parent of -1.
+        """
+
+        if reverse:
+            offsets, neighbours, pathwayTimes = (
+                self.predecessorOffsets,
+                self.predecessorRoads,
+                self.predecessorPathwayTime,
+            )
+        else:
+            offsets, neighbours, pathwayTimes = (
+                self.successorOffsets,
+                self.successorRoads,
+                self.successorPathwayTime,
+            )
+        roadTraversalTime = self.roadTraversalTime
+
+        distances = [inf for i in range(self.roadCount)]
+        parents = [-1 for i in range(self.roadCount)]
+        open_nodes: list[tuple[float, int]] = []
+        for roadID, cost in sources:
+            if cost < distances[roadID]:
+                distances[roadID] = cost
+                heappush(open_nodes, (cost, roadID))
+
+        while open_nodes:
+            cost, roadID = heappop(open_nodes)
+            if cost > distances[roadID]:
+                continue  # stale entry
+
+            for index in range(offsets[roadID], offsets[roadID + 1]):
+                neighbourID = neighbours[index]
+
+                # The traversal time of the road being left is always part of the edge cost
+                if reverse:
+                    neighbour_cost = cost + roadTraversalTime[neighbourID] + pathwayTimes[index]
+                else:
+                    neighbour_cost = cost + roadTraversalTime[roadID] + pathwayTimes[index]
+
+                if neighbour_cost < distances[neighbourID]:
+                    distances[neighbourID] = neighbour_cost
+                    parents[neighbourID] = roadID
+                    heappush(open_nodes, (neighbour_cost, neighbourID))
+
+        return distances, parents
+
+
+class Landmarks:
+
+    """
+    ALT (A*, Landmarks and Triangle inequality) preprocessing of a road graph.
+
+    A small set of landmark roads is picked via farthest-point selection, then the static cost from every landmark
+    to every road (forward) and from every road to every landmark (backward) is stored.
+    For any roads r and d and landmark L, the triangle inequality gives two lower bounds of the static cost from r to d:
+    - forward[L][d] - forward[L][r]
+    - backward[L][r] - backward[L][d]
+
+    Static costs never overestimate the cost of a road (traffic lights and congestion only add time),
+    therefore the bounds are admissible for both selfish and AutoFlow vehicles.
+
+    Costs are stored per road as tuples over all landmarks, i.e. forwardByRoad[r][i] is the cost from landmark i to r.
+    Unreachable pairs are stored as UNREACHABLE_COST instead of infinity so that subtracting them stays well defined.
+    """
+
+    UNREACHABLE_COST = 1e9
+
+    def __init__(self, graph: RoadGraph, landmarkCount: int = 8) -> None:
+        self.landmarkCount = landmarkCount  # requested landmark count, see getRoadGraph
+        self.landmarkRoads: list[int] = []
+        forward: list[list[float]] = []
+        backward: list[list[float]] = []
+
+        landmarkCount = min(landmarkCount, graph.roadCount)
+
+        # Farthest-point selection, starting from the road farthest away from road 0
+        closestLandmarkCost = graph.static_distances([(0, 0)])
+        for i in range(landmarkCount):
+            landmark = max(
+                (
+                    roadID
+                    for roadID in range(graph.roadCount)
+                    if closestLandmarkCost[roadID] != inf
+                    and roadID not in self.landmarkRoads
+                ),
+                key=lambda roadID: closestLandmarkCost[roadID],
+                default=None,
+            )
+            if landmark is None:
+                break
+
+            self.landmarkRoads.append(landmark)
+            forward.append(graph.static_distances([(landmark, 0)]))
+            backward.append(graph.static_distances([(landmark, 0)], reverse=True))
+
+            if i == 0:
+                closestLandmarkCost = forward[-1][:]
+            else:
+                closestLandmarkCost = [
+                    min(cost, landmarkCost)
+                    for cost, landmarkCost in zip(closestLandmarkCost, forward[-1])
+                ]
+
+        # Transpose into per-road tuples
+        self.forwardByRoad: list[tuple[float, ...]] = [
+            tuple(Landmarks.UNREACHABLE_COST if cost == inf else cost for cost in costs)
+            for costs in zip(*forward)
+        ]
+        self.backwardByRoad: list[tuple[float, ...]] = [
+            tuple(Landmarks.UNREACHABLE_COST if cost == inf else cost for cost in costs)
+            for costs in zip(*backward)
+        ]
+
+    def estimate(self, roadID: int, destinationRoadID: int) -> float:
+        """
+        Lower bound of the static cost from the start of a road to the start of the destination road.
+        """
+        return max(
+            0,
+            max(map(sub, self.forwardByRoad[destinationRoadID], self.forwardByRoad[roadID])),
+            max(map(sub, self.backwardByRoad[roadID], self.backwardByRoad[destinationRoadID])),
+        )
+
+
+def getRoadGraph(landscape: Landscape) -> RoadGraph:
+    """
+    Returns the compiled road graph of a landscape, compiling it on first use.
+    The graph is compiled again if a speed limit or the road network of the landscape changed since,
+    see Landscape.road_network_changed. Landmarks and contraction hierarchies of the previous graph are
+    only valid for its costs, so they are recomputed for the new graph.
+    """
+    previousGraph: RoadGraph = landscape.roadGraph
+    if previousGraph is None or previousGraph.revision != landscape.roadNetworkRevision:
+        landscape.roadGraph = RoadGraph(landscape)
+        if previousGraph is not None:
+            if previousGraph.landmarks is not None:
+                landscape.roadGraph.landmarks = Landmarks(landscape.roadGraph, previousGraph.landmarks.landmarkCount)
+            if previousGraph.contractionHierarchy is not None:
+                landscape.roadGraph.contractionHierarchy = previousGraph.contractionHierarchy.rebuild(landscape.roadGraph)
+    return landscape.roadGraph
+
+
+def precomputeLandmarks(landscape: Landscape, landmarkCount: int = 8) -> Landmarks:
+    """
+    Optional preprocessing step that enables the ALT heuristic in both routers for this landscape.
+    """
+    graph = getRoadGraph(landscape)
+    graph.landmarks = Landmarks(graph, landmarkCount)
+    return graph.landmarks
@@ -0,0 +1,81 @@
+"""
+This script contains the route cache used for selfish routing.
+
+Selfish routes only depend on static costs (see RoadGraph), so the route of a vehicle is fully determined by
+its (start roadID, start position, destination roadID, destination position) and how it was routed, i.e. the routing
+method, whether landmarks were used and MAX_ROAD_SPEED_MPS (see AutoFlow.computeSelfishVehicleRoutes for the key).
+Routing the same vehicles on the same landscape again, e.g. once for every AutoFlow percentage of a parameter sweep,
+can therefore reuse them.
+
+The cache holds a bounded number of routes (as RouteViews that own their arrays, see RouteSet)
+and evicts the least recently used route first.
+It is cleared automatically whenever a speed limit or the road network of its landscape changes,
+see Landscape.road_network_changed.
+"""
+
+
+# ================ IMPORTS ================
+from LandscapeComponents import *
+from RouteSet import *
+
+from collections import OrderedDict
+
+# =========================================
+
+
+class RouteCache:
+
+    """
+    Least recently used cache of selfish routes, routes[(routing method, landmarks used, MAX_ROAD_SPEED_MPS,
+    start roadID, start position, destination roadID, destination position)] => route.
+    hits and misses count the lookups since the cache was created.
+    """
+
+    def __init__(self, landscape: Landscape, capacity: int = 100000) -> None:
+        self.landscape = landscape
+        self.capacity = capacity
+        self.routes: OrderedDict[tuple, RouteView] = OrderedDict()
+        self.revision = landscape.roadNetworkRevision
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple) -> RouteView:
+        """
+        Returns the cached route, or None if the route is not cached.
+        """
+        if self.revision != self.landscape.roadNetworkRevision:
+            self.clear()
+        route = self.routes.get(key)
+        if route is None:
+            self.misses += 1
+            return None
+        self.routes.move_to_end(key)
+        self.hits += 1
+        return route
+
+    def put(self, key: tuple, route: RouteView) -> None:
+        """
+        Caches a route, evicting the least recently used route if the cache is full.
+        """
+        if self.revision != self.landscape.roadNetworkRevision:
+            self.clear()
+        self.routes[key] = route
+        self.routes.move_to_end(key)
+        if len(self.routes) > self.capacity:
+            self.routes.popitem(last=False)
+
+    def clear(self) -> None:
+        """
+        Removes every cached route, hits and misses are kept.
+        """
+        self.routes.clear()
+        self.revision = self.landscape.roadNetworkRevision
+
+
+def getRouteCache(landscape: Landscape) -> RouteCache:
+    """
+    Returns the route cache of a landscape, creating it on first use.
+    """
+    if landscape.routeCache is None:
+        landscape.routeCache = RouteCache(landscape)
+    return landscape.routeCache
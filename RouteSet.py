@@ -0,0 +1,287 @@
+"""
+This script contains the compact route representation shared by the routing algorithms and the bridge.
+
+A route is a sequence of waypoints, each waypoint being a real position and the roadID it lies on.
+Instead of one list of tuples per vehicle, a RouteSet stores the routes of many vehicles in flat arrays:
+- vehicleIDs: id of the vehicle each route belongs to (int64)
+- offsets: route i is stored at [offsets[i], offsets[i + 1]) of the waypoint arrays (int64)
+- coordinates: real (x, y) position of every waypoint (float32, shape (waypoint count, 2))
+- roadIDs: roadID of every waypoint (int32)
+
+Indexing a RouteSet returns a RouteView, whose arrays are views into the RouteSet (no copy is made).
+Iterating over a RouteView yields ((x, y), roadID) waypoints, the same format the routers used to return.
+
+The bridge sends routes straight from the arrays, see RouteSet.to_update_message. Coordinates are sent as the shortest
+decimals that round to the stored float32 values (see shortestDecimals), e.g. 12.3 rather than 12.300000190734863.
+"""
+
+
+# ================ IMPORTS ================
+import numpy as np
+
+from array import array
+
+# =========================================
+
+
+# Largest number of decimals tried by shortestDecimals, float32 values of at least 1 never need more
+MAX_DECIMALS = 9
+
+# JSON of a single VehicleUpdateMessage and of one of its waypoints, see RouteSet.to_update_message
+VEHICLE_UPDATE_FORMAT = '{"id": %d, "route": [%s], "type": "VehicleUpdateMessage"}'
+WAYPOINT_FORMAT = '{"x": %s, "y": %s, "z": %s}'
+
+
+def shortestDecimals(values: np.ndarray) -> np.ndarray:
+    """
+    Returns the float64 values with the fewest decimals that round to the given float32 values,
+    i.e. the values a client that reads coordinates as float32 sees, e.g. 12.3 instead of 12.300000190734863.
+    Values that need more than MAX_DECIMALS decimals are returned exactly.
+    """
+    exact = values.astype(np.float64)
+    shortest = exact.copy()
+    remaining = np.ones(values.shape, dtype=bool)
+    for decimals in range(MAX_DECIMALS + 1):
+        rounded = np.round(exact, decimals)
+        found = remaining & (rounded.astype(np.float32) == values)
+        shortest[found] = rounded[found]
+        remaining &= ~found
+        if not remaining.any():
+            break
+    return shortest
+
+
+class RouteView:
+
+    """
+    Read-only view of a single route within a RouteSet.
+    """
+
+    __slots__ = ("coordinates", "roadIDs")
+
+    def __init__(self, coordinates: np.ndarray, roadIDs: np.ndarray) -> None:
+        self.coordinates = coordinates
+        self.roadIDs = roadIDs
+
+    def __len__(self) -> int:
+        return len(self.roadIDs)
+
+    def __getitem__(self, index: int) -> tuple[tuple[float, float], int]:
+        x, y = self.coordinates[index].tolist()
+        return ((x, y), int(self.roadIDs[index]))
+
+    def __iter__(self):
+        return iter(self.to_list())
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, RouteView):
+            return np.array_equal(self.coordinates, other.coordinates) and np.array_equal(self.roadIDs, other.roadIDs)
+        return self.to_list() == list(other)
+
+    def copy(self) -> "RouteView":
+        """
+        Returns a RouteView that owns its arrays, so that it does not keep the whole RouteSet alive.
+        """
+        return RouteView(self.coordinates.copy(), self.roadIDs.copy())
+
+    def to_list(self) -> list[tuple[tuple[float, float], int]]:
+        """
+        Returns the route as a list of ((x, y), roadID).
+        """
+        return [((x, y), roadID) for (x, y), roadID in zip(self.coordinates.tolist(), self.roadIDs.tolist())]
+
+    def waypoints(self, decimal: bool = False) -> list[tuple[float, float, int]]:
+        """
+        Returns the route as a list of (x, y, roadID), the format used by the bridge.
+        If decimal is True, coordinates are the values the bridge sends, see shortestDecimals.
+        """
+        coordinates = shortestDecimals(self.coordinates) if decimal else self.coordinates
+        return [(x, y, roadID) for (x, y), roadID in zip(coordinates.tolist(), self.roadIDs.tolist())]
+
+
+class RouteSet:
+
+    """
+    Routes of many vehicles stored in flat arrays, see module docstring.
+    """
+
+    def __init__(self, vehicleIDs: np.ndarray, offsets: np.ndarray, coordinates: np.ndarray, roadIDs: np.ndarray) -> None:
+        self.vehicleIDs = vehicleIDs
+        self.offsets = offsets
+        self.coordinates = coordinates
+        self.roadIDs = roadIDs
+        self.indexByVehicle: dict[int, int] = None  # created on first use, see get
+
+    @classmethod
+    def from_routes(cls, vehicleIDs: list[int], routes: list[list[tuple[tuple[float, float], int]]]) -> "RouteSet":
+        """
+        Creates a RouteSet from routes given as lists of ((x, y), roadID).
+        """
+        builder = RouteSetBuilder()
+        for vehicleID, route in zip(vehicleIDs, routes):
+            builder.add_route(vehicleID, route)
+        return builder.build()
+
+    @classmethod
+    def from_waypoints(cls, vehicleIDs: list[int], routes: list[list[tuple[float, float, int]]]) -> "RouteSet":
+        """
+        Creates a RouteSet from routes given as lists of (x, y, roadID).
+        """
+        builder = RouteSetBuilder()
+        for vehicleID, route in zip(vehicleIDs, routes):
+            builder.add_waypoints(vehicleID, route)
+        return builder.build()
+
+    @classmethod
+    def from_views(cls, vehicleIDs: list[int], views: list[RouteView]) -> "RouteSet":
+        """
+        Creates a RouteSet from RouteViews, e.g. routes taken from other RouteSets.
+        """
+        offsets = np.zeros(len(views) + 1, dtype=np.int64)
+        np.cumsum([len(view) for view in views], out=offsets[1:])
+        return RouteSet(
+            np.asarray(vehicleIDs, dtype=np.int64),
+            offsets,
+            np.concatenate([view.coordinates for view in views] + [np.empty((0, 2), dtype=np.float32)]),
+            np.concatenate([view.roadIDs for view in views] + [np.empty(0, dtype=np.int32)]),
+        )
+
+    @staticmethod
+    def concatenate(routeSets: list["RouteSet"]) -> "RouteSet":
+        """
+        Joins several RouteSets into one, keeping the order of the routes.
+        """
+        if not routeSets:
+            return RouteSetBuilder().build()
+        waypointCounts = np.cumsum([0] + [len(routeSet.roadIDs) for routeSet in routeSets])
+        return RouteSet(
+            np.concatenate([routeSet.vehicleIDs for routeSet in routeSets]),
+            np.concatenate(
+                [[0]] + [routeSet.offsets[1:] + waypointCount for routeSet, waypointCount in zip(routeSets, waypointCounts)]
+            ).astype(np.int64),
+            np.concatenate([routeSet.coordinates for routeSet in routeSets]).reshape(-1, 2),
+            np.concatenate([routeSet.roadIDs for routeSet in routeSets]),
+        )
+
+    def __len__(self) -> int:
+        return len(self.vehicleIDs)
+
+    def __getitem__(self, index: int) -> RouteView:
+        start, end = self.offsets[index], self.offsets[index + 1]
+        return RouteView(self.coordinates[start:end], self.roadIDs[start:end])
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def get(self, vehicleID: int) -> RouteView:
+        """
+        Returns the route of a vehicle, or None if the RouteSet has no route for it.
+        """
+        if self.indexByVehicle is None:
+            self.indexByVehicle = {vehicleID: index for index, vehicleID in enumerate(self.vehicleIDs.tolist())}
+        index = self.indexByVehicle.get(vehicleID)
+        return None if index is None else self[index]
+
+    def keys(self) -> list[int]:
+        return self.vehicleIDs.tolist()
+
+    def items(self):
+        """
+        Yields (vehicle id, RouteView) for every route.
+        """
+        for index, vehicleID in enumerate(self.vehicleIDs.tolist()):
+            yield vehicleID, self[index]
+
+    def take(self, indexes: list[int]) -> "RouteSet":
+        """
+        Returns a new RouteSet that contains the routes at the given indexes, in the given order.
+        """
+        indexes = np.asarray(indexes, dtype=np.int64)
+        starts = self.offsets[indexes]
+        lengths = self.offsets[indexes + 1] - starts
+        offsets = np.zeros(len(indexes) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+
+        # Index of every waypoint to gather, i.e. starts[i] + 0, starts[i] + 1, ... for every route i
+        waypoints = np.arange(offsets[-1], dtype=np.int64) - np.repeat(offsets[:-1] - starts, lengths)
+        return RouteSet(self.vehicleIDs[indexes], offsets, self.coordinates[waypoints], self.roadIDs[waypoints])
+
+    def to_update_message(self, rounded: bool = False) -> str:
+        """
+        Returns the UpdateMessage JSON of the bridge, i.e. {"updates": [VehicleUpdateMessage], "type": "UpdateMessage"}
+        where every VehicleUpdateMessage is {"id": vehicle id, "route": [{"x": x, "y": y, "z": roadID}], ...}.
+        Coordinates are sent as their shortest decimals (see shortestDecimals), and if rounded is True, coordinates
+        with an integral value are sent as ints, like the rounded routes recalculateRoutes used to return.
+
+        Values are converted from the arrays in one pass and every route is written with a single string formatting,
+        no dict or list is built per waypoint.
+        """
+        coordinates = shortestDecimals(self.coordinates)
+        values = np.empty((len(self.roadIDs), 3), dtype=object)
+        values[:, :2] = coordinates
+        if rounded:
+            integral = np.isfinite(coordinates) & (coordinates == np.floor(coordinates))
+            values[:, :2][integral] = coordinates[integral].astype(np.int64)
+        values[:, 2] = self.roadIDs
+        values = values.ravel().tolist()
+
+        offsets = self.offsets.tolist()
+        routeFormats: dict[int, str] = {}  # format of the waypoints of a route, by waypoint count
+        updates = []
+        for index, vehicleID in enumerate(self.vehicleIDs.tolist()):
+            start, end = offsets[index], offsets[index + 1]
+            routeFormat = routeFormats.get(end - start)
+            if routeFormat is None:
+                routeFormat = routeFormats[end - start] = ", ".join([WAYPOINT_FORMAT] * (end - start))
+            updates.append(VEHICLE_UPDATE_FORMAT % (vehicleID, routeFormat % tuple(values[3 * start:3 * end])))
+        return '{"updates": [%s], "type": "UpdateMessage"}' % ", ".join(updates)
+
+    def relabel(self, vehicleIDs: list[int]) -> "RouteSet":
+        """
+        Returns a RouteSet with the same routes (shared, not copied) belonging to different vehicles.
+        """
+        return RouteSet(np.asarray(vehicleIDs, dtype=np.int64), self.offsets, self.coordinates, self.roadIDs)
+
+
+class RouteSetBuilder:
+
+    """
+    Appends routes one at a time to growable buffers, see RouteSet.
+    """
+
+    def __init__(self) -> None:
+        self.vehicleIDs = array("q")
+        self.offsets = array("q", [0])
+        self.coordinates = array("f")
+        self.roadIDs = array("i")
+
+    def add_route(self, vehicleID: int, route: list[tuple[tuple[float, float], int]]) -> None:
+        """
+        Appends a route given as a list of ((x, y), roadID).
+        """
+        for (x, y), roadID in route:
+            self.coordinates.append(x)
+            self.coordinates.append(y)
+            self.roadIDs.append(roadID)
+        self.vehicleIDs.append(vehicleID)
+        self.offsets.append(len(self.roadIDs))
+
+    def add_waypoints(self, vehicleID: int, route: list[tuple[float, float, int]]) -> None:
+        """
+        Appends a route given as a list of (x, y, roadID).
+        """
+        for x, y, roadID in route:
+            self.coordinates.append(x)
+            self.coordinates.append(y)
+            self.roadIDs.append(roadID)
+        self.vehicleIDs.append(vehicleID)
+        self.offsets.append(len(self.roadIDs))
+
+    def build(self) -> RouteSet:
+        return RouteSet(
+            np.frombuffer(self.vehicleIDs, dtype=np.int64).copy(),
+            np.frombuffer(self.offsets, dtype=np.int64).copy(),
+            np.frombuffer(self.coordinates, dtype=np.float32).reshape(-1, 2).copy(),
+            np.frombuffer(self.roadIDs, dtype=np.int32).copy(),
+        )
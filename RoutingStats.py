@@ -0,0 +1,88 @@
+"""
+This script contains the search instrumentation of the routing algorithms.
+
+A RoutingStats object can be passed to computeRoutes (and the functions it calls), in which case every
+routed vehicle adds one record of counters describing its search:
+- nodesPopped: nodes popped from the Open list(s)
+- heapPushes: nodes pushed into the Open list(s)
+- stalePops: popped nodes that had already been expanded, or were superseded by a cheaper entry
+- closedSetSize: number of nodes closed by the search
+- routeLength: number of waypoints in the route
+- wallTime: time taken by the search in seconds
+AutoFlow searches also count:
+- reservationReads: lookups in the reservation table
+- reservationWrites: time periods the route reserves in the reservation table
+- trafficLightWait: total time (in seconds) added by waiting for green lights
+
+Routers only keep a few integer counters while searching, and the counters are only stored (and searches only
+timed) if a RoutingStats object was given, so routing without one is not measurably slower.
+"""
+
+
+# ================ IMPORTS ================
+import numpy as np
+
+# =========================================
+
+
+class RoutingStats:
+
+    """
+    Per-vehicle search counters, see module docstring.
+    """
+
+    def __init__(self) -> None:
+        self.records: list[dict] = []
+
+    def record(self, router: str, method: str, vehicleID: int, counters: dict) -> None:
+        """
+        Adds the counters of a single search.
+        - router: "selfish" or "autoflow"
+        - method: search used for the route, e.g. "A*" or "contraction hierarchy"
+        """
+        self.records.append({"router": router, "method": method, "vehicle": vehicleID, **counters})
+
+    def extend(self, records: list[dict]) -> None:
+        """
+        Adds records collected elsewhere, e.g. by a worker process.
+        """
+        self.records.extend(records)
+
+    def summary(self, groupBy: str = "router", percentiles: tuple[int, ...] = (50, 90, 99)) -> dict[str, dict[str, dict[str, float]]]:
+        """
+        Aggregates the records by router (or method),
+        summary[router][counter] => {"count", "total", "mean", "max", "p50", "p90", "p99"}.
+        """
+        groups: dict[str, list[dict]] = {}
+        for record in self.records:
+            groups.setdefault(record[groupBy], []).append(record)
+
+        summary = {}
+        for group, records in groups.items():
+            summary[group] = {}
+            counters = [key for key in records[0] if key not in ("router", "method", "vehicle")]
+            for record in records[1:]:
+                counters.extend(key for key in record if key not in counters and key not in ("router", "method", "vehicle"))
+
+            for counter in counters:
+                values = np.array([record[counter] for record in records if counter in record], dtype=np.float64)
+                aggregate = {
+                    "count": len(values),
+                    "total": float(values.sum()),
+                    "mean": float(values.mean()),
+                    "max": float(values.max()),
+                }
+                for percentile, value in zip(percentiles, np.percentile(values, percentiles)):
+                    aggregate[f"p{percentile}"] = float(value)
+                summary[group][counter] = aggregate
+        return summary
+
+    def slowest(self, count: int = 10, counter: str = "wallTime") -> list[dict]:
+        """
+        Returns the records with the highest value of a counter, i.e. the vehicles that dominate routing time.
+        """
+        return sorted(
+            (record for record in self.records if counter in record),
+            key=lambda record: record[counter],
+            reverse=True
+        )[:count]
@@ -0,0 +1,69 @@
+"""
+This script contains the search workspace reused by the A* routing algorithms.
+
+Every A* search needs per-road bookkeeping (best fcost, previous nodes, closed nodes). Instead of allocating
+new dictionaries and sets for every vehicle, each thread keeps one workspace of preallocated arrays indexed
+by roadID, which is reused by every search of the thread, across vehicles and ticks.
+
+Entries are generation-stamped: an entry is only valid if its stamp equals the generation of the current search.
+Starting a search increments the generation, which invalidates every entry in O(1) without touching the arrays.
+"""
+
+
+# ================ IMPORTS ================
+from RoadGraph import *
+
+from math import inf
+import threading
+
+# =========================================
+
+
+class SearchWorkspace:
+
+    """
+    Preallocated per-road arrays of a single A* search, see module docstring.
+    - fcost[roadID], previousStart[roadID]: best fcost of the start node of the road and the road leading to it,
+      both valid if fcostStamp[roadID] == generation
+    - previousEnd[roadID]: previous node of the end node of the road, valid if previousEndStamp[roadID] == generation
+    - closedStartStamp[roadID] == generation: start node of the road is closed
+    - closedEndStamp[roadID] == generation: end node of the road is closed
+    """
+
+    def __init__(self, roadCount: int) -> None:
+        self.roadCount = roadCount
+        self.generation = 0
+        self.fcost: list[float] = [inf] * roadCount
+        self.previousStart: list[int] = [-1] * roadCount
+        self.fcostStamp: list[int] = [0] * roadCount
+        self.previousEnd: list = [None] * roadCount
+        self.previousEndStamp: list[int] = [0] * roadCount
+        self.closedStartStamp: list[int] = [0] * roadCount
+        self.closedEndStamp: list[int] = [0] * roadCount
+
+    def begin(self) -> int:
+        """
+        Starts a new search, invalidating every entry of the previous search. Returns the new generation.
+        """
+        self.generation += 1
+        return self.generation
+
+    def closed_count(self) -> int:
+        """
+        Returns the number of nodes closed by the current search (iterates over every road).
+        """
+        generation = self.generation
+        return self.closedStartStamp.count(generation) + self.closedEndStamp.count(generation)
+
+
+# Workspace of every thread, see getSearchWorkspace
+SEARCH_WORKSPACES = threading.local()
+
+def getSearchWorkspace(graph: RoadGraph) -> SearchWorkspace:
+    """
+    Returns the search workspace of the current thread, creating it on first use or if the number of roads changed.
+    """
+    workspace: SearchWorkspace = getattr(SEARCH_WORKSPACES, "workspace", None)
+    if workspace is None or workspace.roadCount != graph.roadCount:
+        workspace = SEARCH_WORKSPACES.workspace = SearchWorkspace(graph.roadCount)
+    return workspace
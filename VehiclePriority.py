@@ -0,0 +1,199 @@
+"""
+This script contains the batch priority scoring of AutoFlow vehicles, see sortVehicles in AutoFlow.
+
+AutoFlow vehicles are planned one at a time in priority order, and the order is recomputed on every recalculation tick.
+Instead of computing the priority of each vehicle with Python calls, the whole fleet is scored at once:
+- buildPriorityFeatures reads the vehicles once and builds a feature matrix (one row per vehicle, see PRIORITY_FEATURES),
+  real positions and road speeds are gathered from the compiled road graph with array indexing
+- scorePriorities scores every row with the default formula, or with a PriorityModel (gradient boosted regression trees)
+- priorityOrder returns the indexes of the vehicles from highest to lowest priority
+
+The default formula is passengerCount * manhattan distance to the destination, ties broken by the higher emission rate,
+which is the order sortVehicles has always produced (vehicles with equal keys keep their original order).
+"""
+
+
+# ================ IMPORTS ================
+from RoadGraph import *
+
+from itertools import chain
+import json
+import numpy as np
+
+# =========================================
+
+
+# Columns of the feature matrix, in order
+PRIORITY_FEATURES = (
+    "startX",               # real position of the vehicle
+    "startY",
+    "destinationX",         # real position of the destination
+    "destinationY",
+    "manhattanDistance",    # manhattan distance between the vehicle and its destination (metres)
+    "passengerCount",
+    "emissionRate",
+    "cost",
+    "startRoadSpeed",       # speed limit of the road the vehicle is on (m/s)
+    "destinationRoadSpeed", # speed limit of the destination road (m/s)
+    "startRoadRemaining",   # distance left on the road the vehicle is on (metres)
+)
+FEATURE_INDEX = {feature: index for index, feature in enumerate(PRIORITY_FEATURES)}
+
+
+def getRoadArrays(graph: RoadGraph) -> tuple[np.ndarray, ...]:
+    """
+    Returns the per-road arrays used by buildPriorityFeatures (start position, direction, length, speed),
+    converted to NumPy once and cached on the graph.
+    """
+    if graph.priorityArrays is None:
+        graph.priorityArrays = (
+            np.asarray(graph.roadStartPos, dtype=np.float64).reshape(-1, 2),
+            np.asarray(graph.roadDirX, dtype=np.float64),
+            np.asarray(graph.roadDirY, dtype=np.float64),
+            np.asarray(graph.roadLength, dtype=np.float64),
+            np.asarray(graph.roadSpeed, dtype=np.float64),
+        )
+    return graph.priorityArrays
+
+
+def buildPriorityFeatures(vehicles: list, graph: RoadGraph) -> np.ndarray:
+    """
+    Builds the feature matrix of a fleet, shape (len(vehicles), len(PRIORITY_FEATURES)), see PRIORITY_FEATURES.
+    Vehicles are only read once, every other feature is computed with array operations.
+    Real positions are computed exactly like RoadGraph.real_position (and getRealPositionOnRoad).
+    """
+    # Attributes of every vehicle streamed straight into a single buffer (much faster than np.array on a list of tuples)
+    vehicleData = np.fromiter(
+        chain.from_iterable(
+            (
+                vehicle.road.roadID, vehicle.position,
+                vehicle.destinationRoad.roadID, vehicle.destinationPosition,
+                vehicle.passengerCount, vehicle.emissionRate, vehicle.cost
+            )
+            for vehicle in vehicles
+        ),
+        dtype=np.float64,
+        count=7 * len(vehicles)
+    ).reshape(-1, 7)
+    startRoads = vehicleData[:, 0].astype(np.int64)
+    destinationRoads = vehicleData[:, 2].astype(np.int64)
+
+    roadStartPos, roadDirX, roadDirY, roadLength, roadSpeed = getRoadArrays(graph)
+    features = np.empty((len(vehicleData), len(PRIORITY_FEATURES)), dtype=np.float64)
+
+    # Real positions, start of the road + direction * distance along the road
+    startDistance = roadLength[startRoads] * vehicleData[:, 1]
+    features[:, 0] = roadStartPos[startRoads, 0] + roadDirX[startRoads] * startDistance
+    features[:, 1] = roadStartPos[startRoads, 1] + roadDirY[startRoads] * startDistance
+    destinationDistance = roadLength[destinationRoads] * vehicleData[:, 3]
+    features[:, 2] = roadStartPos[destinationRoads, 0] + roadDirX[destinationRoads] * destinationDistance
+    features[:, 3] = roadStartPos[destinationRoads, 1] + roadDirY[destinationRoads] * destinationDistance
+    features[:, 4] = np.abs(features[:, 0] - features[:, 2]) + np.abs(features[:, 1] - features[:, 3])
+
+    features[:, 5:8] = vehicleData[:, 4:7]
+    features[:, 8] = roadSpeed[startRoads]
+    features[:, 9] = roadSpeed[destinationRoads]
+    features[:, 10] = roadLength[startRoads] - startDistance
+    return features
+
+
+class PriorityModel:
+
+    """
+    Ensemble of regression trees (e.g. gradient boosted trees) that scores vehicles from their features.
+    The score of a vehicle is baseScore + learningRate * sum of the leaf values reached in every tree.
+
+    All trees are stored in padded (tree count, max node count) arrays:
+    - feature[t, i], threshold[t, i]: split of node i of tree t, rows with value <= threshold go to left[t, i], others to right[t, i]
+    - value[t, i]: output of node i of tree t if it is a leaf
+    Leaves point to themselves, so every tree can be evaluated for every vehicle with depth steps of array indexing.
+    """
+
+    def __init__(self, features: list[str], trees: list[dict], baseScore: float = 0, learningRate: float = 1) -> None:
+        """
+        - features: name of every feature the trees refer to (by index), see PRIORITY_FEATURES
+        - trees: one dict per tree with the lists "feature", "threshold", "left", "right" and "value",
+          indexed by node (node 0 is the root), left and right are -1 for leaves
+        """
+        self.columns = np.array([FEATURE_INDEX[feature] for feature in features], dtype=np.int64)
+        self.baseScore = baseScore
+        self.learningRate = learningRate
+
+        treeCount = len(trees)
+        nodeCount = max((len(tree["value"]) for tree in trees), default=1)
+        self.feature = np.zeros((treeCount, nodeCount), dtype=np.int64)
+        self.threshold = np.zeros((treeCount, nodeCount), dtype=np.float64)
+        self.left = np.tile(np.arange(nodeCount, dtype=np.int64), (treeCount, 1))
+        self.right = self.left.copy()
+        self.value = np.zeros((treeCount, nodeCount), dtype=np.float64)
+
+        self.depth = 0
+        for t, tree in enumerate(trees):
+            left = np.asarray(tree["left"], dtype=np.int64)
+            right = np.asarray(tree["right"], dtype=np.int64)
+            isSplit = left != -1
+            splits = np.flatnonzero(isSplit)
+            self.feature[t, splits] = self.columns[np.asarray(tree["feature"], dtype=np.int64)[splits]]
+            self.threshold[t, splits] = np.asarray(tree["threshold"], dtype=np.float64)[splits]
+            self.left[t, splits] = left[splits]
+            self.right[t, splits] = right[splits]
+            self.value[t, :len(tree["value"])] = tree["value"]
+
+            # Depth of the tree, i.e. number of steps needed to reach every leaf
+            stack = [(0, 0)]
+            while stack:
+                node, depth = stack.pop()
+                if isSplit[node]:
+                    stack.append((left[node], depth + 1))
+                    stack.append((right[node], depth + 1))
+                else:
+                    self.depth = max(self.depth, depth)
+
+    @classmethod
+    def load(cls, path: str) -> "PriorityModel":
+        """
+        Loads a model saved as JSON: {"features": [...], "trees": [...], "baseScore": ..., "learningRate": ...},
+        see __init__ for the format of the trees.
+        """
+        with open(path) as file:
+            model = json.load(file)
+        return cls(model["features"], model["trees"], model.get("baseScore", 0), model.get("learningRate", 1))
+
+    def predict(self, features: np.ndarray) -> np.ndarray:
+        """
+        Returns the score of every row of a feature matrix built by buildPriorityFeatures.
+        """
+        rows = np.arange(len(features))[:, None]
+        trees = np.arange(len(self.feature))[None, :]
+        nodes = np.zeros((len(features), len(self.feature)), dtype=np.int64)
+
+        # Every step moves all (vehicle, tree) pairs one level down, pairs already on a leaf stay on it
+        for step in range(self.depth):
+            goLeft = features[rows, self.feature[trees, nodes]] <= self.threshold[trees, nodes]
+            nodes = np.where(goLeft, self.left[trees, nodes], self.right[trees, nodes])
+
+        return self.baseScore + self.learningRate * self.value[trees, nodes].sum(axis=1)
+
+
+def scorePriorities(features: np.ndarray, model: PriorityModel = None) -> np.ndarray:
+    """
+    Returns the priority score of every row of a feature matrix, higher scores are planned first.
+    Without a model, the score is passengerCount * manhattanDistance.
+    """
+    if model is not None:
+        return model.predict(features)
+    return features[:, FEATURE_INDEX["passengerCount"]] * features[:, FEATURE_INDEX["manhattanDistance"]]
+
+
+def priorityOrder(vehicles: list, graph: RoadGraph, model: PriorityModel = None) -> np.ndarray:
+    """
+    Returns the indexes of the vehicles sorted from highest to lowest (score, emissionRate).
+    The sort is stable, vehicles with equal keys keep their original order.
+    """
+    if not vehicles:
+        return np.empty(0, dtype=np.int64)
+    features = buildPriorityFeatures(vehicles, graph)
+    scores = scorePriorities(features, model)
+
+    # lexsort sorts by the last key first, negated keys give a stable descending order
+    return np.lexsort((-features[:, FEATURE_INDEX["emissionRate"]], -scores))
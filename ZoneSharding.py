@@ -0,0 +1,270 @@
+"""
+This script contains the geographic sharding of AutoFlow cooperative planning across worker processes.
+
+The landscape is split into rectangular zones (see ZonePartition). Split lines always run along road lines,
+so every land plot block lies entirely within one zone. Every road belongs to exactly one zone, its owner.
+Each zone is served by its own worker process, which plans the vehicles that start in the zone and keeps the
+part of the reservation table that the zone holds (see ReservationTable.ZoneReservationTable):
+- the roads the zone owns, which it always knows exactly
+- the halo roads, i.e. roads owned by other zones that lie within haloCells of the zone, which it mirrors
+
+Routes may cross zone boundaries. A worker sends every reservation it makes on a road that another zone holds
+(a boundary reservation) to the coordinator, which forwards it to the owner of the road and to every zone
+mirroring it. Reads of roads a zone does not hold return no vehicles.
+
+Vehicles are planned in windows of (batch size * zone count) vehicles in priority order. The zones plan their
+vehicles of a window in parallel, and boundary reservations are exchanged between windows, so a zone sees the
+boundary reservations of other zones at most one window late. Reservations within a zone are seen immediately.
+
+The coordinator and the workers only exchange messages over multiprocessing connections, which run either over
+pipes (transport="pipe") or over sockets (transport="socket"). Over sockets, the coordinator listens on an address
+and workers connect to it, so workers may also run on other machines, see connectZoneWorker.
+
+Messages from the coordinator to a worker:
+- ("init", zone, held roadIDs, private roadIDs, road graph or None, MAX_ROAD_SPEED_MPS, congestionCost, collectStats, openList)
+- ("reserve", [(roadID, start time, end time, amount)]): reservations made by other zones
+- ("plan", [(index, start roadID, start position, destination roadID, destination position)]): vehicles in priority order
+- ("close",)
+Messages from a worker to the coordinator:
+- ("planned", RouteSet labelled by index, [indexes without a path], [(index, search counters)], [boundary reservations])
+- ("error", traceback) if the worker failed
+"""
+
+
+# ================ IMPORTS ================
+from RoadGraph import *
+from RouteSet import *
+
+from bisect import bisect_right
+from math import inf
+from multiprocessing.connection import Listener, Client
+import os
+
+# =========================================
+
+
+class ZonePartition:
+
+    """
+    Split of a landscape into zonesX * zonesY rectangular zones, see module docstring.
+    - xSplits, ySplits: cell coordinates of the road lines between zones, a road lying on a split line
+      belongs to the zone east (north) of it
+    - zoneOfRoad[roadID]: zone that owns the road, zone = zoneY * zonesX + zoneX
+    - zoneRoads[zone]: roadIDs owned by the zone
+    - haloRoads[zone]: roadIDs owned by other zones that the zone mirrors
+    - roadHolders[roadID]: every zone holding the road, its owner first
+    """
+
+    def __init__(self, landscape: Landscape, zonesX: int, zonesY: int, haloCells: int = 10) -> None:
+        self.zonesX = zonesX
+        self.zonesY = zonesY
+        self.zoneCount = zonesX * zonesY
+
+        # Midpoint of every road in cell coordinates
+        midpoints = [((road.start[0] + road.end[0]) / 2, (road.start[1] + road.end[1]) / 2) for road in landscape.roads]
+
+        # Split lines are road lines, picked so that zones own roughly as many roads each
+        self.xSplits = self.split_lines(
+            sorted({intersection[0] for intersection in landscape.intersections}), sorted(x for x, y in midpoints), zonesX
+        )
+        self.ySplits = self.split_lines(
+            sorted({intersection[1] for intersection in landscape.intersections}), sorted(y for x, y in midpoints), zonesY
+        )
+
+        self.zoneOfRoad: list[int] = [
+            bisect_right(self.ySplits, y) * zonesX + bisect_right(self.xSplits, x) for x, y in midpoints
+        ]
+        self.zoneRoads: list[list[int]] = [[] for zone in range(self.zoneCount)]
+        for roadID, zone in enumerate(self.zoneOfRoad):
+            self.zoneRoads[zone].append(roadID)
+
+        # Halo of every zone, roads of other zones within haloCells of the zone's rectangle
+        self.haloRoads: list[list[int]] = [[] for zone in range(self.zoneCount)]
+        self.roadHolders: list[tuple[int, ...]] = [(zone,) for zone in self.zoneOfRoad]
+        for zone in range(self.zoneCount):
+            xMin, xMax = self.bounds(self.xSplits, zone % zonesX)
+            yMin, yMax = self.bounds(self.ySplits, zone // zonesX)
+            for roadID, (x, y) in enumerate(midpoints):
+                if (
+                    self.zoneOfRoad[roadID] != zone
+                    and xMin - haloCells <= x <= xMax + haloCells
+                    and yMin - haloCells <= y <= yMax + haloCells
+                ):
+                    self.haloRoads[zone].append(roadID)
+                    self.roadHolders[roadID] += (zone,)
+
+    @staticmethod
+    def split_lines(lines: list[int], coordinates: list[float], zoneCount: int) -> list[int]:
+        """
+        Returns zoneCount - 1 increasing road lines, each the closest line to a quantile of the (sorted) coordinates.
+        Fewer split lines are returned if there are not enough road lines.
+        """
+        splits: list[int] = []
+        for zone in range(1, zoneCount):
+            if not coordinates:
+                break
+            quantile = coordinates[len(coordinates) * zone // zoneCount]
+            candidates = [line for line in lines if not splits or line > splits[-1]]
+            if not candidates:
+                break
+            splits.append(min(candidates, key=lambda line: abs(line - quantile)))
+        return splits
+
+    @staticmethod
+    def bounds(splits: list[int], index: int) -> tuple[float, float]:
+        """
+        Returns the range of cell coordinates covered by the index-th zone along an axis.
+        """
+        return (
+            splits[index - 1] if 0 < index <= len(splits) else -inf,
+            splits[index] if index < len(splits) else inf,
+        )
+
+    def held_roads(self, zone: int) -> list[int]:
+        """
+        Returns the roadIDs held by the zone, i.e. owned or mirrored.
+        """
+        return self.zoneRoads[zone] + self.haloRoads[zone]
+
+    def private_roads(self, zone: int) -> list[int]:
+        """
+        Returns the roadIDs that only the zone holds, reservations on every other road are boundary reservations.
+        """
+        return [roadID for roadID in self.zoneRoads[zone] if len(self.roadHolders[roadID]) == 1]
+
+
+def connectZoneWorker(address: tuple[str, int], authkey: bytes, serveZone) -> None:
+    """
+    Connects to a ZoneCoordinator listening on address and serves a zone until the coordinator closes it.
+    serveZone(connection, graph) is the worker loop, see AutoFlow.serveZone, the graph is sent by the coordinator.
+    """
+    connection = Client(address, authkey=authkey)
+    serveZone(connection, None)
+
+
+class ZoneCoordinator:
+
+    """
+    Runs one worker per zone and forwards boundary reservations between them, see module docstring.
+    Use as a context manager, workers are stopped on exit.
+    - serveZone: worker loop, called as serveZone(connection, graph) in every worker process
+    - context: multiprocessing context used to start the workers
+    - transport: "pipe" or "socket"
+    - address, authkey: where the coordinator listens for workers when transport is "socket"
+    - spawnWorkers: if False, no worker is started and the coordinator waits for one worker per zone
+      to connect to address (e.g. from other machines, see connectZoneWorker)
+    """
+
+    def __init__(
+        self, partition: ZonePartition, serveZone, context, transport: str = "pipe",
+        address: tuple[str, int] = ("127.0.0.1", 0), authkey: bytes = None, spawnWorkers: bool = True
+    ) -> None:
+        if transport not in ("pipe", "socket"):
+            raise ValueError(f"Unknown transport: {transport}")
+        self.partition = partition
+        self.serveZone = serveZone
+        self.context = context
+        self.transport = transport
+        self.address = address
+        self.authkey = authkey if authkey is not None else os.urandom(16)
+        self.spawnWorkers = spawnWorkers
+        self.connections = []
+        self.processes = []
+        self.listener: Listener = None
+
+    def __enter__(self) -> "ZoneCoordinator":
+        return self
+
+    def __exit__(self, *exception) -> None:
+        self.close()
+
+    def start(self, graph: RoadGraph, MAX_ROAD_SPEED_MPS: float, congestionCost: int, collectStats: bool, openList: str) -> None:
+        """
+        Starts (or waits for) the workers and sends every zone its part of the landscape.
+        """
+        partition = self.partition
+        if self.transport == "pipe":
+            # Forked workers inherit the graph instead of receiving it
+            for zone in range(partition.zoneCount):
+                connection, workerConnection = self.context.Pipe()
+                process = self.context.Process(target=self.serveZone, args=(workerConnection, graph), daemon=True)
+                process.start()
+                workerConnection.close()
+                self.connections.append(connection)
+                self.processes.append(process)
+        else:
+            self.listener = Listener(self.address, authkey=self.authkey)
+            self.address = self.listener.address
+            if self.spawnWorkers:
+                for zone in range(partition.zoneCount):
+                    process = self.context.Process(
+                        target=connectZoneWorker, args=(self.address, self.authkey, self.serveZone), daemon=True
+                    )
+                    process.start()
+                    self.processes.append(process)
+            # Zones are assigned in order of connection
+            for zone in range(partition.zoneCount):
+                self.connections.append(self.listener.accept())
+
+        for zone, connection in enumerate(self.connections):
+            connection.send((
+                "init", zone, partition.held_roads(zone), partition.private_roads(zone),
+                graph if self.transport == "socket" else None,
+                MAX_ROAD_SPEED_MPS, congestionCost, collectStats, openList
+            ))
+
+    def reserve(self, reservations: list[tuple[int, int, int, int]], sender: int = -1) -> None:
+        """
+        Sends reservations (roadID, start time, end time, amount) to every zone holding their road, except sender.
+        """
+        zoneReservations: list[list[tuple[int, int, int, int]]] = [[] for zone in range(self.partition.zoneCount)]
+        roadHolders = self.partition.roadHolders
+        for reservation in reservations:
+            for zone in roadHolders[reservation[0]]:
+                if zone != sender:
+                    zoneReservations[zone].append(reservation)
+        for zone, connection in enumerate(self.connections):
+            if zoneReservations[zone]:
+                connection.send(("reserve", zoneReservations[zone]))
+
+    def plan(self, tasks: dict[int, list[tuple[int, int, float, int, float]]]) -> dict[int, tuple[RouteSet, list[int], list[tuple[int, dict]]]]:
+        """
+        Plans the vehicles of every zone in parallel, tasks[zone] => vehicles in priority order, see module docstring.
+        Boundary reservations are forwarded once every zone is done.
+        Returns results[zone] => (routes labelled by index, indexes without a path, search counters by index).
+        """
+        for zone, vehicles in tasks.items():
+            self.connections[zone].send(("plan", vehicles))
+
+        results = {}
+        boundaryReservations = {}
+        for zone in tasks:
+            message = self.connections[zone].recv()
+            if message[0] == "error":
+                raise Exception(f"Zone {zone} failed:\n{message[1]}")
+            kind, routes, failed, records, boundaryReservations[zone] = message
+            results[zone] = (routes, failed, records)
+
+        for zone, reservations in boundaryReservations.items():
+            self.reserve(reservations, sender=zone)
+        return results
+
+    def close(self) -> None:
+        """
+        Stops the workers and closes every connection.
+        """
+        for connection in self.connections:
+            try:
+                connection.send(("close",))
+                connection.close()
+            except (OSError, EOFError):
+                pass
+        for process in self.processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        if self.listener is not None:
+            self.listener.close()
+        self.connections = []
+        self.processes = []
+        self.listener = None
@@ -0,0 +1,67 @@
+"""
+Fingerprints of generated landscapes and computed routes, used to pin their equivalence with the original implementation.
+
+Fingerprints only rely on the interfaces the original implementation already had (landscapeMatrix rows, the landMap,
+coordToRoad and intersectionPathways hashmaps, and routes as {vehicle id: [((x, y), roadID)]}), so the expected
+digests in the tests were produced by running these same functions on the original implementation.
+Real positions are rounded to 3 decimals, as routes now store them as float32.
+"""
+
+
+# ================ IMPORTS ================
+import hashlib
+import random
+
+# =========================================
+
+
+def digest(value) -> str:
+    return hashlib.sha1(repr(value).encode()).hexdigest()
+
+def landscapeMatrixFingerprint(landscape) -> str:
+    return digest([list(row) for row in landscape.landscapeMatrix])
+
+def landMapFingerprint(landscape) -> str:
+    return digest(sorted(
+        (coordinate, landPlot.xPos, landPlot.yPos, landPlot.xSize, landPlot.ySize)
+        for coordinate, landPlot in landscape.landMap.items()
+    ))
+
+def coordToRoadFingerprint(landscape) -> str:
+    return digest(sorted(
+        (coordinate, roads[0].roadID, roads[1].roadID)
+        for coordinate, roads in landscape.coordToRoad.items()
+    ))
+
+def pathwaysFingerprint(landscape) -> str:
+    pathways = []
+    for coordinate, intersection in landscape.intersections.items():
+        for fromIntersection, row in intersection.intersectionPathways.items():
+            for toIntersection, pathway in row.items():
+                pathways.append((
+                    coordinate, fromIntersection.coordinates(), toIntersection.coordinates(),
+                    pathway.startPosReal, pathway.endPosReal, pathway.direction,
+                    round(pathway.length, 6), round(pathway.traversalTime, 6), pathway.maxVehicleCount,
+                ))
+    return digest(sorted(pathways))
+
+def routesFingerprint(routes) -> str:
+    return digest(sorted(
+        (id, [((round(float(position[0]), 3), round(float(position[1]), 3)), int(roadID)) for position, roadID in route])
+        for id, route in routes.items()
+    ))
+
+def spawnVehicles(landscape, vehicleCount: int, useAutoFlow: bool, vehicleClass) -> list:
+    """
+    Same as Benchmarks.spawnRandomVehicles, which the original implementation did not have.
+    """
+    roads = [road for road in landscape.roads if road.cellSpan > 0]
+    vehicles = []
+    for id in range(vehicleCount):
+        vehicle = vehicleClass(id, useAutoFlow)
+        road = roads[random.randint(0, len(roads) - 1)]
+        vehicle.setLocation(road, random.randint(0, road.cellSpan * 4 - 1) / (road.cellSpan * 4))
+        road = roads[random.randint(0, len(roads) - 1)]
+        vehicle.setDestination(road, random.randint(0, road.cellSpan * 4 - 1) / (road.cellSpan * 4))
+        vehicles.append(vehicle)
+    return vehicles
@@ -0,0 +1,60 @@
+"""
+Shared fixtures of the test suite.
+
+The modules of the simulation live at the root of the repository and import each other by name,
+so the root is added to sys.path before any test module imports them.
+Every fixture seeds the random number generator, so landscapes and vehicles are the same on every run.
+"""
+
+
+# ================ IMPORTS ================
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Benchmarks import *
+
+# =========================================
+
+
+def routeRoads(route) -> list[int]:
+    """
+    Returns the sequence of roadIDs travelled along a route, see RoadGraph.build_route.
+    """
+    roads: list[int] = []
+    for position, roadID in route:
+        if not roads or roads[-1] != roadID:
+            roads.append(roadID)
+    return roads
+
+def staticCost(graph: RoadGraph, roads: list[int]) -> float:
+    """
+    Returns the static cost of a sequence of roads from the end of the first road to the start of the last road.
+    """
+    cost = 0
+    for previousID, roadID in zip(roads, roads[1:]):
+        successors = range(graph.successorOffsets[previousID], graph.successorOffsets[previousID + 1])
+        cost += min(graph.successorPathwayTime[index] for index in successors if graph.successorRoads[index] == roadID)
+        if roadID != roads[-1]:
+            cost += graph.roadTraversalTime[roadID]
+    return cost
+
+
+@pytest.fixture
+def landscape() -> Landscape:
+    random.seed(7)
+    return generateLandscape(25)
+
+@pytest.fixture
+def selfish_vehicles(landscape: Landscape) -> list[Vehicle]:
+    random.seed(8)
+    return spawnRandomVehicles(landscape, 200)
+
+@pytest.fixture
+def autoflow_vehicles(landscape: Landscape) -> list[Vehicle]:
+    random.seed(9)
+    return spawnRandomVehicles(landscape, 200, useAutoFlow=True)
@@ -0,0 +1,38 @@
+"""
+Tests of the benchmark suite, see Benchmarks.benchmarkSuite.
+"""
+
+
+# ================ IMPORTS ================
+from conftest import *
+
+# =========================================
+
+
+SUITE_STAGES = [
+    "generate_landscape", "compile_road_graph", "spawn", "selfish_routing",
+    "autoflow_routing", "recalculate_first_tick", "recalculate_tick",
+]
+
+
+def test_suite_cases_are_reproducible():
+    # Cases are seeded independently, running another case first must not change a case
+    first = runSuiteCase(12, 0.4, 50, 2, 3, False)
+    runSuiteCase(14, 0.2, 50, 2, 3, False)
+    second = runSuiteCase(12, 0.4, 50, 2, 3, False)
+
+    assert list(first["stages"]) == list(second["stages"]) == SUITE_STAGES
+    first.pop("stages"), second.pop("stages")
+    assert first == second and first["selfishVehicles"] + first["autoflowVehicles"] > 0
+
+def test_suite_results_can_be_compared(tmp_path, capsys):
+    output = str(tmp_path / "suite.json")
+    benchmarkSuite([12], [0.3], 50, 2, 5, True, output)
+    with open(output) as file:
+        results = json.load(file)
+    assert results["seed"] == 5 and len(results["results"]) == 1
+    stages = results["results"][0]["stages"]
+    assert list(stages) == SUITE_STAGES and all(stage["peakMemory"] > 0 for stage in stages.values())
+
+    compareSuiteResults(output, output)
+    assert "recalculate_tick" in capsys.readouterr().out
@@ -0,0 +1,87 @@
+"""
+Tests of the change detection of the replanning ticks, see AutoFlow.recalculateRoutes.
+"""
+
+
+# ================ IMPORTS ================
+from conftest import *
+from AutoFlow import isFollowingRoute, isFollowingReservations, markChangedRegion, overlapsChangedRegion
+
+# =========================================
+
+
+ROUTE = [(0.0, 0.0, 4), (20.0, 0.0, 5), (40.0, 0.0, 5), (60.0, 0.0, 6)]
+FOOTPRINT = [(4, 0, 2, 1), (4, 5, 8, 1), (5, 8, 12, 1), (6, 12, 20, 1)]
+
+
+def test_following_route():
+    assert isFollowingRoute(ROUTE, ROUTE)
+    assert isFollowingRoute(ROUTE[2:], ROUTE)
+    assert not isFollowingRoute(ROUTE[:1] + ROUTE[2:], ROUTE)
+    assert not isFollowingRoute(ROUTE + [(80.0, 0.0, 7)], ROUTE)
+
+def test_following_reservations():
+    # A vehicle waiting on its current road matches the first of its reservations of that road
+    assert isFollowingReservations(FOOTPRINT, ROUTE, 4, 1, 1)
+    assert isFollowingReservations(FOOTPRINT, ROUTE[1:], 5, 7, 1)
+
+    # Moved ahead: on a road it only reserved later
+    assert not isFollowingReservations(FOOTPRINT, ROUTE[1:], 5, 3, 1)
+
+    # Fallen behind: still has to use a road whose reservation has ended
+    assert not isFollowingReservations(FOOTPRINT, ROUTE, 4, 14, 1)
+    assert isFollowingReservations(FOOTPRINT, ROUTE[3:], 6, 14, 1)
+
+def test_changed_regions():
+    changedRegions = defaultdict(list)
+    markChangedRegion(changedRegions, [(5, 10, 14, 1)])
+    assert overlapsChangedRegion(changedRegions, FOOTPRINT, 0)
+    assert not overlapsChangedRegion(changedRegions, [(5, 14, 16, 1), (6, 10, 14, 1)], 0)
+
+    # Time periods that already ended are no longer affected
+    assert not overlapsChangedRegion(changedRegions, FOOTPRINT, 12)
+
+def test_only_vehicles_affected_by_a_deviation_are_replanned():
+    random.seed(43)
+    landscape = generateLandscape(20)
+    MAX_ROAD_SPEED_MPS = maxRoadSpeed(landscape)
+    vehicles = spawnRandomVehicles(landscape, 150, useAutoFlow=True)
+    state = ReplanningState(getRoadGraph(landscape).roadCount)
+    routes = computeAutoflowVehicleRoutes(vehicles, landscape, MAX_ROAD_SPEED_MPS, replanningState=state)
+
+    def stationaryCarPositions() -> dict:
+        return {
+            id: {"Routes": list(route), "Metadata": route[0] if route else (0, 0, -1)}
+            for id, route in state.routes.items()
+        }
+
+    # An undisturbed tick replans nobody
+    stats = RoutingStats()
+    recalculateRoutes(stationaryCarPositions(), landscape, vehicles, MAX_ROAD_SPEED_MPS, 1, stats=stats, state=state)
+    assert stats.records == []
+
+    # A vehicle skips a waypoint of its route
+    carPositions = stationaryCarPositions()
+    deviated = max(carPositions, key=lambda id: len(carPositions[id]["Routes"]))
+    carPositions[deviated]["Routes"] = carPositions[deviated]["Routes"][:1] + carPositions[deviated]["Routes"][2:]
+    footprints = {id: state.reservation_table.reservations(id) for id in carPositions}
+
+    stats = RoutingStats()
+    recalculateRoutes(carPositions, landscape, vehicles, MAX_ROAD_SPEED_MPS, 1, stats=stats, state=state)
+    replanned = [record["vehicle"] for record in stats.records]
+    clock = state.reservation_table.clock
+
+    # Every other replanned vehicle reserved a time period changed by the deviated vehicle or by a vehicle replanned before it
+    assert deviated in replanned and len(replanned) < len(carPositions)
+    changedRegions = defaultdict(list)
+    markChangedRegion(changedRegions, footprints[deviated])
+    for id in replanned:
+        if id != deviated:
+            assert overlapsChangedRegion(changedRegions, footprints[id], clock)
+        markChangedRegion(changedRegions, footprints[id])
+        markChangedRegion(changedRegions, state.reservation_table.reservations(id))
+
+    # Vehicles that were not replanned kept their reservations
+    for id in carPositions:
+        if id not in replanned:
+            assert state.reservation_table.reservations(id) == footprints[id]
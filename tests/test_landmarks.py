@@ -0,0 +1,62 @@
+"""
+Tests of the ALT heuristic, see RoadGraph.Landmarks.
+"""
+
+
+# ================ IMPORTS ================
+from conftest import *
+
+# =========================================
+
+
+@pytest.fixture
+def landmarked() -> tuple[Landscape, list[Vehicle]]:
+    """
+    A landscape with precomputed landmarks, and selfish vehicles driving across it.
+    """
+    random.seed(67)
+    landscape = generateLandscape(20)
+    vehicles = spawnRandomVehicles(landscape, 150)
+    precomputeLandmarks(landscape, 6)
+    return landscape, vehicles
+
+
+def test_landmark_bounds_are_admissible(landmarked):
+    landscape, vehicles = landmarked
+    graph = getRoadGraph(landscape)
+    landmarks = graph.landmarks
+    assert len(landmarks.landmarkRoads) == len(set(landmarks.landmarkRoads)) == 6
+
+    for roadID in random.sample(range(graph.roadCount), 30):
+        costs = graph.static_distances([(roadID, 0)])
+        for destinationRoadID, cost in enumerate(costs):
+            if cost != inf:
+                assert landmarks.estimate(roadID, destinationRoadID) <= cost + 1e-9
+        assert landmarks.estimate(roadID, roadID) == 0
+
+def test_alt_routes_are_shortest(landmarked):
+    landscape, vehicles = landmarked
+    MAX_ROAD_SPEED_MPS = maxRoadSpeed(landscape)
+    graph = getRoadGraph(landscape)
+
+    # Shortest path trees are exact, the ALT bound is admissible and consistent so A* finds routes of the same cost
+    exact = computeSelfishVehicleRoutes(vehicles, landscape, MAX_ROAD_SPEED_MPS, minBatchSize=1, useCache=False)
+    for index, vehicle in enumerate(vehicles):
+        roads = findSelfishRoute(
+            graph, vehicle.road.roadID, vehicle.position,
+            vehicle.destinationRoad.roadID, vehicle.destinationPosition, MAX_ROAD_SPEED_MPS
+        )
+        exactRoads = routeRoads(exact[index])
+        if len(roads) < 2:
+            assert routeRoads(graph.build_route(roads, vehicle.destinationPosition)) == exactRoads
+            continue
+        assert roads[0] == exactRoads[0] and roads[-1] == exactRoads[-1]
+        assert staticCost(graph, roads) == pytest.approx(staticCost(graph, exactRoads))
+
+def test_landmarks_follow_the_road_graph(landmarked):
+    landscape, vehicles = landmarked
+    graph = getRoadGraph(landscape)
+    landscape.road_network_changed()
+    newGraph = getRoadGraph(landscape)
+    assert newGraph is not graph and newGraph.landmarks is not None
+    assert newGraph.landmarks.landmarkRoads == graph.landmarks.landmarkRoads
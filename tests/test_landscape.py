@@ -0,0 +1,127 @@
+"""
+Tests of landscape generation, see LandscapeComponents.Landscape.
+
+Generated landscapes must stay identical to the ones of the original implementation for a given seed,
+the expected fingerprints were produced by running Fingerprints on the original implementation.
+"""
+
+
+# ================ IMPORTS ================
+from conftest import *
+from Fingerprints import *
+
+# =========================================
+
+
+# (seed, size) => fingerprints of the landscape generated by the original implementation
+BASELINE_LANDSCAPES = {
+    (7, 25): {
+        "matrix": "8efb3800be759df40ab1841d20868fbc0530be01",
+        "landMap": "9b6bfbed011b7fb72b204bebc8638cf54b5623d3",
+        "coordToRoad": "879c64fd0092ec9336ae7a42b42a046bb0539a4d",
+        "pathways": "7dd1017fe0ce969cc27766c6481d5c2e06ce3411",
+    },
+    (3, 40): {
+        "matrix": "43b2f836608e29969522ae5d87d6668efde8aa41",
+        "landMap": "9b9888ff4eed315a21f3c48e21d3345672a9592c",
+        "coordToRoad": "f4532546c52f23d615c3b4b10e9e2d26c1ac3b16",
+        "pathways": "6cda3658f9cbf16b5baef564e4fb7e8b4e34956c",
+    },
+}
+
+
+@pytest.mark.parametrize("seed, size", BASELINE_LANDSCAPES)
+def test_landscape_matches_baseline(seed, size):
+    random.seed(seed)
+    landscape = generateLandscape(size)
+    expected = BASELINE_LANDSCAPES[(seed, size)]
+    assert landscapeMatrixFingerprint(landscape) == expected["matrix"]
+    assert landMapFingerprint(landscape) == expected["landMap"]
+    assert coordToRoadFingerprint(landscape) == expected["coordToRoad"]
+    assert pathwaysFingerprint(landscape) == expected["pathways"]
+
+def test_tile_matrix_views(landscape):
+    tiles = landscape.tileMatrix
+    assert landscape.landscapeMatrix.flatten() == [TILE_NAMES[code] for code in tiles.ravel().tolist()]
+    assert len(landscape.landscapeMatrix) == tiles.shape[0] and len(landscape.landscapeMatrix[0]) == tiles.shape[1]
+
+    assert len(landscape.landMap) == len(list(landscape.landMap)) > 0
+    for y, x in landscape.landMap:
+        assert landscape.landscapeMatrix[y][x] == "LP"
+    assert len(landscape.coordToRoad) == len(list(landscape.coordToRoad)) > 0
+    for (x, y), (first, second) in landscape.coordToRoad.items():
+        assert landscape.landscapeMatrix[y][x] in ("HR", "VR")
+        assert landscape.roads[first.roadID] is first and landscape.roads[second.roadID] is second
+
+    # Coordinates outside of the matrix are missing keys, not wrapped around
+    assert (-1, 0) not in landscape.landMap and (0, -1) not in landscape.coordToRoad
+    assert (tiles.shape[0], 0) not in landscape.landMap and (tiles.shape[1], 0) not in landscape.coordToRoad
+
+def test_occupancy_matches_grid_matrix(landscape):
+    occupied = [[cell is not None for cell in row] for row in landscape.gridMatrix]
+    assert landscape.occupancy.tolist() == occupied
+    assert landscape.availableArea == landscape.occupancy.size - int(landscape.occupancy.sum())
+
+def test_pathways_match_turn_table(landscape):
+    for intersection in landscape.intersections.values():
+        assert intersection.pathways == {}  # pathways are only built on first request
+        for fromIntersection in intersection.neighbours:
+            for toIntersection in intersection.neighbours:
+                if toIntersection is fromIntersection:
+                    with pytest.raises(KeyError):
+                        intersection.pathway(fromIntersection, toIntersection)
+                    continue
+                pathway = intersection.intersectionPathways[fromIntersection][toIntersection]
+                assert pathway is intersection.pathway(fromIntersection, toIntersection)
+                assert pathway.traversalTime == intersection.turn_traversal_time(fromIntersection, toIntersection)
+                assert pathway.startPosReal == landscape.roadmap[fromIntersection.coordinates()][intersection.coordinates()].endPosReal
+
+def bruteForcePlacements(landscape: Landscape, xSize: int, ySize: int) -> list[tuple[int, int]]:
+    """
+    Placements of a land plot found by checking every covered cell of gridMatrix, ordered by y, then x.
+    """
+    return [
+        (x, y)
+        for y in range(landscape.ySize - ySize + 1)
+        for x in range(landscape.xSize - xSize + 1)
+        if all(landscape.gridMatrix[y + dy][x + dx] is None for dy in range(ySize) for dx in range(xSize))
+    ]
+
+def test_valid_placements_match_cell_checks():
+    random.seed(97)
+    packed = Landscape(14, 11)
+    sizes = [(1, 1), (2, 1), (1, 3), (3, 2), (4, 4), (14, 1), (1, 11), (15, 1)]
+    for i in range(12):
+        for xSize, ySize in sizes:
+            assert packed.get_valid_placements(LandPlot(xSize, ySize)) == bruteForcePlacements(packed, xSize, ySize)
+
+        # Pack a random land plot, placements must follow
+        feature = LandPlot(random.randint(1, 4), random.randint(1, 3))
+        placement = packed.random_placement(feature)
+        if placement is not None:
+            assert placement in bruteForcePlacements(packed, feature.xSize, feature.ySize)
+            packed.place_feature(feature, *placement)
+    assert packed.availableArea < 14 * 11
+
+
+def test_road_insertion_on_a_hand_built_grid():
+    # A 2x2 land plot next to a 1x1 land plot, the rest of the 4x2 grid is unassigned:
+    #   A A 0 0
+    #   A A B 0   (row 0 at the bottom)
+    # Roads are inserted after columns 1 and 2 and after row 0, where a land plot meets another cell,
+    # inserted cells only continue a land plot if it is on both of their sides, then the grid is padded
+    landscape = Landscape(4, 2)
+    landscape.place_feature(LandPlot(2, 2), 0, 0)
+    landscape.place_feature(LandPlot(1, 1), 2, 0)
+    landscape.generate_landscape_matrix()
+
+    assert (landscape.xSize, landscape.ySize) == (6, 3)
+    assert [(plot.xPos, plot.yPos, plot.xSize, plot.ySize) for plot in landscape.landPlots] == [(1, 1, 2, 3), (4, 1, 1, 1)]
+    IS, LP, HR, VR = [TILE_CODES[code] for code in ["IS", "LP", "HR", "VR"]]
+    assert landscape.tileMatrix.tolist() == [
+        [IS, HR, HR, IS, HR, IS, LP, LP],
+        [VR, LP, LP, VR, LP, VR, LP, LP],
+        [VR, LP, LP, IS, HR, IS, LP, LP],
+        [VR, LP, LP, VR, LP, LP, LP, LP],
+        [IS, HR, HR, IS, LP, LP, LP, LP],
+    ]
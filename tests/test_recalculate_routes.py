@@ -0,0 +1,123 @@
+"""
+Tests of the replanning ticks of AutoFlow vehicles, see AutoFlow.recalculateRoutes.
+"""
+
+
+# ================ IMPORTS ================
+from conftest import *
+
+from copy import deepcopy
+
+# =========================================
+
+
+def stationaryCarPositions(routes: dict[int, list[tuple[float, float, int]]]) -> dict:
+    """
+    Returns the carPositions message of vehicles that did not move since they were sent their routes.
+    """
+    return {
+        id: {"Routes": list(route), "Metadata": route[0] if route else (0, 0, -1)}
+        for id, route in routes.items()
+    }
+
+def sentRoutes(routes: RouteSet) -> dict[int, list[tuple[float, float, int]]]:
+    """
+    Returns the routes as Unity receives them, see RouteSet.to_update_message.
+    """
+    return {id: route.waypoints(decimal=True) for id, route in routes.items()}
+
+def replannedVehicles(stats: RoutingStats) -> set[int]:
+    return {record["vehicle"] for record in stats.records}
+
+
+@pytest.fixture
+def session() -> tuple[Landscape, list[Vehicle], RouteSet, ReplanningState]:
+    """
+    An AutoFlow fleet whose initial routes seed a new replanning session.
+    """
+    random.seed(41)
+    landscape = generateLandscape(20)
+    vehicles = spawnRandomVehicles(landscape, 120, useAutoFlow=True)
+    state = ReplanningState(getRoadGraph(landscape).roadCount)
+    routes = computeAutoflowVehicleRoutes(vehicles, landscape, maxRoadSpeed(landscape), replanningState=state)
+    return landscape, vehicles, routes, state
+
+
+def test_seeded_session_keeps_initial_routes(session):
+    landscape, vehicles, routes, state = session
+    MAX_ROAD_SPEED_MPS = maxRoadSpeed(landscape)
+    assert list(routes) == list(computeAutoflowVehicleRoutes(vehicles, landscape, MAX_ROAD_SPEED_MPS))
+    assert state.routes == sentRoutes(routes)
+    assert set(state.reservation_table.vehicleReservations) == {vehicle.id for vehicle in vehicles}
+    with pytest.raises(ValueError):
+        computeAutoflowVehicleRoutes(vehicles, landscape, MAX_ROAD_SPEED_MPS, workers=2, replanningState=state)
+
+    # The first tick starts from the initial reservations, vehicles that follow their routes are not replanned
+    stats = RoutingStats()
+    newRoutes = recalculateRoutes(
+        deepcopy(stationaryCarPositions(state.routes)), landscape, vehicles, MAX_ROAD_SPEED_MPS, 1, stats=stats, state=state
+    )
+    assert replannedVehicles(stats) == set()
+    assert state.reservation_table.clock == 1
+    assert sentRoutes(newRoutes) == state.routes
+
+def test_sessions_do_not_share_state(session):
+    landscape, vehicles, routes, state = session
+    MAX_ROAD_SPEED_MPS = maxRoadSpeed(landscape)
+    other = ReplanningState(getRoadGraph(landscape).roadCount)
+    carPositions = stationaryCarPositions(sentRoutes(routes))
+
+    # A new session replans every vehicle, whatever the ticks of other sessions on the same landscape
+    for tick in range(2):
+        stats = RoutingStats()
+        recalculateRoutes(deepcopy(carPositions), landscape, vehicles, MAX_ROAD_SPEED_MPS, 1, stats=stats, state=state)
+    seeded = deepcopy(state.reservation_table.vehicleReservations)
+
+    stats = RoutingStats()
+    recalculateRoutes(deepcopy(carPositions), landscape, vehicles, MAX_ROAD_SPEED_MPS, 1, stats=stats, state=other)
+    assert replannedVehicles(stats) == {id for id, data in carPositions.items() if len(data["Routes"]) > 2}
+    assert other.reservation_table.clock == 1 and state.reservation_table.clock == 2
+    assert state.reservation_table.vehicleReservations == seeded
+    assert not hasattr(landscape, "replanningState")
+
+def test_skipped_vehicles_keep_their_reservations(session):
+    landscape, vehicles, routes, state = session
+    MAX_ROAD_SPEED_MPS = maxRoadSpeed(landscape)
+    sent = {id: route for id, route in sentRoutes(routes).items() if len(route) > 3}
+    vehicles = [vehicle for vehicle in vehicles if vehicle.id in sent]
+
+    # First tick of a new session plans every vehicle
+    state = ReplanningState(getRoadGraph(landscape).roadCount)
+    sent = recalculateRoutes(deepcopy(stationaryCarPositions(sent)), landscape, vehicles, MAX_ROAD_SPEED_MPS, 1, state=state)
+    sent = sentRoutes(sent)
+
+    # Vehicles that skip a waypoint deviate from their route, but there is no time left to replan them
+    carPositions = stationaryCarPositions(sent)
+    deviated = sorted(sent)[:10]
+    for id in deviated:
+        carPositions[id]["Routes"] = carPositions[id]["Routes"][:1] + carPositions[id]["Routes"][2:]
+    before = {id: list(state.reservation_table.reservations(id)) for id in sent}
+
+    newRoutes = recalculateRoutes(deepcopy(carPositions), landscape, vehicles, MAX_ROAD_SPEED_MPS, 1, timeBudget=0, state=state)
+
+    assert set(deviated) <= state.pending
+    for id in state.pending:
+        assert newRoutes.get(id).waypoints(decimal=True) == carPositions[id]["Routes"]
+        assert state.reservation_table.reservations(id) == before[id]
+
+@pytest.mark.parametrize("seeded", [False, True])
+def test_zero_budget_keeps_previous_routes(session, seeded):
+    landscape, vehicles, routes, state = session
+    MAX_ROAD_SPEED_MPS = maxRoadSpeed(landscape)
+    if not seeded:
+        state = ReplanningState(getRoadGraph(landscape).roadCount)
+    carPositions = simulateCarPositions(getRoadGraph(landscape), routes, 3)
+    previousRoutes = deepcopy(carPositions)
+
+    newRoutes = recalculateRoutes(carPositions, landscape, vehicles, MAX_ROAD_SPEED_MPS, 3, timeBudget=0, state=state)
+
+    # Vehicles that needed a new route are all skipped, every vehicle keeps the route it was following
+    assert state.skippedCount == len(state.pending)
+    assert state.skippedCount > 0
+    for id, data in previousRoutes.items():
+        assert newRoutes.get(id).waypoints(decimal=True) == [tuple(waypoint) for waypoint in data["Routes"]]
@@ -0,0 +1,86 @@
+"""
+Tests of the space-time reservation tables, see ReservationTable.
+"""
+
+
+# ================ IMPORTS ================
+from conftest import *
+
+# =========================================
+
+
+def test_dense_table_matches_slot_counts():
+    random.seed(71)
+    table = ReservationTable(5, horizon=4)
+    expected = defaultdict(int) # expected[(roadID, timestamp)] => number of vehicles, like the original nested dicts
+    for i in range(300):
+        roadID, startTime = random.randrange(5), random.randint(-3, 40)
+        endTime, amount = startTime + random.randint(-1, 12), random.choice([1, 1, 2, -1])
+        table.reserve(roadID, startTime, endTime, amount)
+        for timestamp in range(max(0, startTime), endTime):
+            expected[(roadID, timestamp)] += amount
+
+    assert table.horizon == 64 and table.counts.shape == (5, 64)
+    for roadID in range(5):
+        assert [table.get(roadID, timestamp) for timestamp in range(80)] == [expected[(roadID, timestamp)] for timestamp in range(80)]
+        assert table.get_range(roadID, -2, 70).tolist() == [expected[(roadID, timestamp)] for timestamp in range(0, 70)]
+    assert table.get_range(0, 5, 5).tolist() == []
+
+def test_shared_table_is_read_by_attached_tables():
+    table = SharedReservationTable(3, horizon=8)
+    try:
+        table.reserve(1, 2, 6)
+        attached = SharedReservationTable.attach(table.sharedName, table.roadCount, table.horizon)
+        assert [attached.get(1, timestamp) for timestamp in range(8)] == [0, 0, 1, 1, 1, 1, 0, 0]
+        attached.close()
+
+        # Growing moves the table into a new block, which must be attached again
+        previousName = table.sharedName
+        table.reserve(2, 5, 20, 3)
+        assert table.sharedName != previousName and table.horizon == 32
+        attached = SharedReservationTable.attach(table.sharedName, table.roadCount, table.horizon)
+        assert attached.get(1, 3) == 1 and attached.get_range(2, 18, 22).tolist() == [3, 3, 0, 0]
+        attached.close()
+    finally:
+        table.close()
+
+def test_advance_expires_time_slots():
+    table = PersistentReservationTable(4, horizon=8)
+    table.reserve_vehicle(7, 2, 0, 5)
+    assert [table.get(2, timestamp) for timestamp in range(6)] == [1, 1, 1, 1, 1, 0]
+
+    # Times are relative to the clock, reservations of the vehicle stay in simulation time
+    table.advance(3)
+    assert [table.get(2, timestamp) for timestamp in range(3)] == [1, 1, 0]
+    assert table.reservations(7) == [(2, 0, 5, 1)]
+
+    table.reserve_vehicle(7, 3, 1, 4)
+    assert table.reservations(7) == [(2, 0, 5, 1), (3, 4, 7, 1)]
+
+    # Moving the clock back does nothing, moving it past every reservation empties the table
+    table.advance(1)
+    assert table.clock == 3 and table.get(3, 1) == 1
+    table.advance(3 + 8)
+    assert not table.counts.any()
+
+def test_advance_past_a_grown_horizon():
+    table = PersistentReservationTable(2, horizon=4)
+    table.reserve_vehicle(1, 0, 2, 10)
+    assert table.horizon == 16
+    table.advance(9)
+    assert [table.get(0, timestamp) for timestamp in range(3)] == [1, 0, 0]
+    table.advance(40)
+    assert not table.counts.any()
+
+def test_withdraw_releases_remaining_reservations():
+    table = PersistentReservationTable(3, horizon=16)
+    table.reserve(0, 0, 10)  # another vehicle, not recorded under a handle
+    table.reserve_vehicle(5, 0, 2, 8, amount=2)
+    table.reserve_vehicle(5, 1, 8, 12, amount=2)
+    table.advance(4)
+
+    withdrawn = table.withdraw(5)
+    assert withdrawn == [(0, 2, 8, 2), (1, 8, 12, 2)]
+    assert [table.get(0, timestamp) for timestamp in range(8)] == [1, 1, 1, 1, 1, 1, 0, 0]
+    assert not table.counts[1].any()
+    assert table.reservations(5) == [] and table.withdraw(5) == []
@@ -0,0 +1,53 @@
+"""
+Tests of the compiled integer-indexed road graph, see RoadGraph.
+"""
+
+
+# ================ IMPORTS ================
+from conftest import *
+
+# =========================================
+
+
+@pytest.fixture
+def landscape() -> Landscape:
+    random.seed(101)
+    return generateLandscape(18)
+
+
+def test_successors_match_the_road_network(landscape):
+    graph = getRoadGraph(landscape)
+    assert graph.roadCount == len(landscape.roads)
+    for road in landscape.roads:
+        startIntersection, endIntersection = landscape.intersections[road.start], landscape.intersections[road.end]
+        expected = [
+            (
+                landscape.roadmap[endIntersection.coordinates()][neighbour.coordinates()].roadID,
+                endIntersection.intersectionPathways[startIntersection][neighbour].traversalTime,
+            )
+            for neighbour in endIntersection.neighbours
+            if neighbour != startIntersection  # no U turns
+        ]
+        successors = range(graph.successorOffsets[road.roadID], graph.successorOffsets[road.roadID + 1])
+        assert [(graph.successorRoads[index], graph.successorPathwayTime[index]) for index in successors] == expected
+        assert graph.roadTraversalTime[road.roadID] == pytest.approx(road.length / road.speedLimit_MPS)
+
+def test_predecessors_are_transposed_successors(landscape):
+    graph = getRoadGraph(landscape)
+    edges = sorted(
+        (graph.successorRoads[index], roadID, graph.successorPathwayTime[index])
+        for roadID in range(graph.roadCount)
+        for index in range(graph.successorOffsets[roadID], graph.successorOffsets[roadID + 1])
+    )
+    transposed = sorted(
+        (roadID, graph.predecessorRoads[index], graph.predecessorPathwayTime[index])
+        for roadID in range(graph.roadCount)
+        for index in range(graph.predecessorOffsets[roadID], graph.predecessorOffsets[roadID + 1])
+    )
+    assert transposed == edges and graph.predecessorOffsets[-1] == len(edges)
+
+def test_real_positions_match_roads(landscape):
+    graph = getRoadGraph(landscape)
+    for road in landscape.roads[::7]:
+        for position in [0, 0.25, 0.5, 1]:
+            assert graph.real_position(road.roadID, position) == pytest.approx(getRealPositionOnRoad(road, position))
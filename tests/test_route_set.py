@@ -0,0 +1,57 @@
+"""
+Tests of the flat route storage and of the route messages of the bridge, see RouteSet.
+"""
+
+
+# ================ IMPORTS ================
+from conftest import *
+
+import json
+
+# =========================================
+
+
+def updateMessage(routes: RouteSet, rounded: bool) -> dict:
+    """
+    Builds the UpdateMessage of a RouteSet one waypoint at a time, see RouteSet.to_update_message.
+    """
+    updates = []
+    for id, route in routes.items():
+        waypoints = []
+        for x, y, roadID in route.waypoints(decimal=True):
+            if rounded:
+                x, y = [int(value) if value == int(value) else value for value in (x, y)]
+            waypoints.append({"x": x, "y": y, "z": roadID})
+        updates.append({"id": id, "route": waypoints, "type": "VehicleUpdateMessage"})
+    return {"updates": updates, "type": "UpdateMessage"}
+
+
+def test_shortest_decimals_round_trip():
+    values = np.array([12.3, 0.1, 1 / 3, 150.25, 4096.123, -7.5, 1e-7, 0], dtype=np.float32)
+    decimals = shortestDecimals(values)
+    assert decimals.tolist()[:2] == [12.3, 0.1]
+    assert np.array_equal(decimals.astype(np.float32), values)
+    assert all(len(repr(decimal)) <= len(repr(float(value))) for decimal, value in zip(decimals.tolist(), values.tolist()))
+
+def test_route_set_views():
+    routes = RouteSet.from_waypoints([4, 2, 9], [[(1.5, 2.0, 3), (12.3, 2.0, 4)], [], [(0.0, 7.25, 1)]])
+    assert routes.keys() == [4, 2, 9]
+    assert routes.get(2).to_list() == [] and routes.get(5) is None
+    assert routes.get(4).waypoints(decimal=True) == [(1.5, 2.0, 3), (12.3, 2.0, 4)]
+    assert routes.get(9) == [((0.0, 7.25), 1)]
+
+    taken = routes.take([2, 0])
+    assert taken.keys() == [9, 4] and taken[1] == routes[0]
+    joined = RouteSet.concatenate([routes, taken.relabel([10, 11])])
+    assert joined.keys() == [4, 2, 9, 10, 11] and joined.get(11) == routes.get(4)
+
+@pytest.mark.parametrize("rounded", [False, True])
+def test_update_message_matches_waypoints(rounded):
+    random.seed(31)
+    landscape = generateLandscape(20)
+    routes = computeRoutes([], spawnRandomVehicles(landscape, 60, useAutoFlow=True), landscape, maxRoadSpeed(landscape))
+    routes = RouteSet.concatenate([routes, RouteSet.from_waypoints([1000, 1001], [[(12.3, 4.0, 1)], []])])
+
+    message = routes.to_update_message(rounded)
+    assert json.loads(message) == updateMessage(routes, rounded)
+    assert '"x": 12.3, "y": %s' % ("4" if rounded else "4.0") in message
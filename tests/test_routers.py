@@ -0,0 +1,140 @@
+"""
+Tests of the search engines shared by the routers, see ContractionHierarchy, findBidirectionalSelfishRoute and OpenList.
+"""
+
+
+# ================ IMPORTS ================
+from conftest import *
+from Fingerprints import *
+
+# =========================================
+
+
+# Fingerprint of the selfish routes computed with contraction hierarchy queries (seed 21, size 30, 250 vehicles),
+# the routing path of the bridge when USE_CONTRACTION_HIERARCHY is set
+CONTRACTION_HIERARCHY_ROUTES = "4edace17dda87998a06818c4088d8dd2278c1419"
+
+
+def test_contraction_hierarchy_costs_match_dijkstra(landscape, selfish_vehicles):
+    graph = getRoadGraph(landscape)
+    hierarchy = precomputeContractionHierarchy(landscape)
+
+    for vehicle in selfish_vehicles:
+        startRoadID, destinationRoadID = vehicle.road.roadID, vehicle.destinationRoad.roadID
+        sources = [
+            (graph.successorRoads[index], graph.successorPathwayTime[index])
+            for index in range(graph.successorOffsets[startRoadID], graph.successorOffsets[startRoadID + 1])
+        ]
+        cost, path = hierarchy.query(sources, destinationRoadID)
+        assert cost == pytest.approx(graph.static_distances(sources)[destinationRoadID])
+
+        # The unpacked path only uses roads of the graph, and its cost is the cost of the query
+        roads = [startRoadID] + path
+        assert roads[-1] == destinationRoadID
+        assert staticCost(graph, roads) == pytest.approx(cost)
+
+def test_contraction_hierarchy_routes_are_pinned():
+    random.seed(21)
+    landscape = generateLandscape(30)
+    MAX_ROAD_SPEED_MPS = maxRoadSpeed(landscape)
+    selfish_vehicles = spawnRandomVehicles(landscape, 250)
+    routes = computeRoutes(selfish_vehicles, [], landscape, MAX_ROAD_SPEED_MPS, useContractionHierarchy=True)
+    assert routesFingerprint(routes) == CONTRACTION_HIERARCHY_ROUTES
+
+    # Every route is a shortest route of the static graph
+    graph = getRoadGraph(landscape)
+    for vehicle in selfish_vehicles:
+        roads = routeRoads(routes.get(vehicle.id))
+        if len(roads) < 2:
+            continue
+        sources = [
+            (graph.successorRoads[index], graph.successorPathwayTime[index])
+            for index in range(graph.successorOffsets[roads[0]], graph.successorOffsets[roads[0] + 1])
+        ]
+        assert staticCost(graph, roads) == pytest.approx(graph.static_distances(sources)[roads[-1]])
+
+def test_precomputed_hierarchy_is_opt_in(landscape, selfish_vehicles):
+    MAX_ROAD_SPEED_MPS = maxRoadSpeed(landscape)
+    before = computeSelfishVehicleRoutes(selfish_vehicles, landscape, MAX_ROAD_SPEED_MPS, useCache=False)
+    precomputeContractionHierarchy(landscape)
+    after = computeSelfishVehicleRoutes(selfish_vehicles, landscape, MAX_ROAD_SPEED_MPS, useCache=False)
+    assert list(after) == list(before)
+
+    stats = RoutingStats()
+    computeSelfishVehicleRoutes(selfish_vehicles, landscape, MAX_ROAD_SPEED_MPS, bidirectional=True, useCache=False, stats=stats)
+    assert {record["method"] for record in stats.records} == {"bidirectional A*"}
+    with pytest.raises(ValueError):
+        computeSelfishVehicleRoutes(selfish_vehicles, landscape, MAX_ROAD_SPEED_MPS, bidirectional=True, useContractionHierarchy=True)
+
+def test_bidirectional_routes_are_shortest():
+    random.seed(79)
+    landscape = generateLandscape(20)
+    MAX_ROAD_SPEED_MPS = maxRoadSpeed(landscape)
+    graph = getRoadGraph(landscape)
+    selfish_vehicles = spawnRandomVehicles(landscape, 150)
+
+    for vehicle in selfish_vehicles:
+        stats = {}
+        roads = findBidirectionalSelfishRoute(
+            graph, vehicle.road.roadID, vehicle.position,
+            vehicle.destinationRoad.roadID, vehicle.destinationPosition, MAX_ROAD_SPEED_MPS, stats
+        )
+        assert routeRoads(graph.build_route(roads, vehicle.destinationPosition))[-1:] == [vehicle.destinationRoad.roadID]
+        if len(roads) < 2:
+            continue
+
+        # Both directions meet on a shortest route of the static graph
+        sources = [
+            (graph.successorRoads[index], graph.successorPathwayTime[index])
+            for index in range(graph.successorOffsets[roads[0]], graph.successorOffsets[roads[0] + 1])
+        ]
+        assert roads[0] == vehicle.road.roadID
+        assert staticCost(graph, roads) == pytest.approx(graph.static_distances(sources)[roads[-1]])
+        assert stats["nodesPopped"] == stats["closedSetSize"] + stats["stalePops"] <= stats["heapPushes"]
+
+@pytest.mark.parametrize("bidirectional", [False, True])
+def test_open_lists_agree_on_selfish_routes(landscape, selfish_vehicles, bidirectional):
+    MAX_ROAD_SPEED_MPS = maxRoadSpeed(landscape)
+    routes = {
+        openList: computeSelfishVehicleRoutes(
+            selfish_vehicles, landscape, MAX_ROAD_SPEED_MPS, bidirectional=bidirectional, useCache=False, openList=openList
+        )
+        for openList in OPEN_LISTS
+    }
+    assert list(routes["bucket"]) == list(routes["heap"])
+
+def test_open_lists_agree_on_autoflow_routes(landscape, autoflow_vehicles):
+    MAX_ROAD_SPEED_MPS = maxRoadSpeed(landscape)
+    routes = {
+        openList: computeAutoflowVehicleRoutes(autoflow_vehicles, landscape, MAX_ROAD_SPEED_MPS, openList=openList)
+        for openList in OPEN_LISTS
+    }
+    assert list(routes["bucket"]) == list(routes["heap"])
+
+def test_open_lists_pop_in_the_same_order():
+    random.seed(11)
+    # Keys behind the current bucket, negative keys (backward searches) and keys far beyond the initial buckets
+    script = [(random.randint(-40, 1600) / 8, id, random.random() < 0.3) for id in range(2000)]
+    popped = {}
+    for name, openListClass in OPEN_LISTS.items():
+        openList, order = openListClass(), []
+        for key, id, pop in script:
+            openList.push((key, id))
+            if pop:
+                peeked = openList.peek()
+                assert openList.pop() == peeked
+                order.append(peeked)
+        assert len(openList) == len(script) - len(order)
+        while len(openList):
+            order.append(openList.pop())
+        with pytest.raises(IndexError):
+            openList.pop()
+        with pytest.raises(IndexError):
+            openList.peek()
+
+        # An emptied Open list can be reused
+        openList.push((3.5, 0))
+        openList.push((-2.0, 1))
+        order += [openList.pop(), openList.pop()]
+        popped[name] = order
+    assert popped["bucket"] == popped["heap"]
@@ -0,0 +1,86 @@
+"""
+Tests of the routes computed by computeRoutes.
+
+Routes must stay identical to the ones of the original implementation for a given seed,
+the expected fingerprints were produced by running Fingerprints on the original implementation.
+"""
+
+
+# ================ IMPORTS ================
+from conftest import *
+from Fingerprints import *
+
+# =========================================
+
+
+# (seed, size, vehicle count) => fingerprints of the routes computed by the original implementation
+BASELINE_ROUTES = {
+    (7, 25, 200): {
+        "selfish": "8d5c9d8c448a494371d5b0f5e6cee3f3a41afd82",
+        "autoflow": "10e69546bff4ec7daefe7e5eca9c6e88f099c6de",
+    },
+    (3, 40, 400): {
+        "selfish": "6b285651ba27af3253a6c888e21d771f574aaa14",
+        "autoflow": "3092c41a92d59c08dec470862cc06a1b5867edbb",
+    },
+}
+
+
+@pytest.mark.parametrize("seed, size, vehicleCount", BASELINE_ROUTES)
+def test_routes_match_baseline(seed, size, vehicleCount):
+    random.seed(seed)
+    landscape = generateLandscape(size)
+    MAX_ROAD_SPEED_MPS = maxRoadSpeed(landscape)
+    selfish_vehicles = spawnRandomVehicles(landscape, vehicleCount)
+    autoflow_vehicles = spawnRandomVehicles(landscape, vehicleCount, useAutoFlow=True)
+
+    expected = BASELINE_ROUTES[(seed, size, vehicleCount)]
+    assert routesFingerprint(computeRoutes(selfish_vehicles, [], landscape, MAX_ROAD_SPEED_MPS)) == expected["selfish"]
+    assert routesFingerprint(computeRoutes([], autoflow_vehicles, landscape, MAX_ROAD_SPEED_MPS)) == expected["autoflow"]
+
+@pytest.mark.parametrize("minBatchSize", [None, 2])
+def test_selfish_workers_match_serial(landscape, selfish_vehicles, minBatchSize):
+    MAX_ROAD_SPEED_MPS = maxRoadSpeed(landscape)
+    serial = computeSelfishVehicleRoutes(
+        selfish_vehicles, landscape, MAX_ROAD_SPEED_MPS, minBatchSize=minBatchSize, useCache=False
+    )
+    parallel = computeSelfishVehicleRoutes(
+        selfish_vehicles, landscape, MAX_ROAD_SPEED_MPS, minBatchSize=minBatchSize, workers=3, useCache=False
+    )
+    assert list(parallel) == list(serial)
+
+@pytest.mark.parametrize("batchSize", [8, 64])
+def test_autoflow_workers_match_serial(landscape, autoflow_vehicles, batchSize):
+    MAX_ROAD_SPEED_MPS = maxRoadSpeed(landscape)
+    serial = computeAutoflowVehicleRoutes(autoflow_vehicles, landscape, MAX_ROAD_SPEED_MPS)
+    parallel = computeAutoflowVehicleRoutes(autoflow_vehicles, landscape, MAX_ROAD_SPEED_MPS, workers=3, batchSize=batchSize)
+    assert list(parallel) == list(serial)
+
+def test_single_zone_matches_serial(landscape, autoflow_vehicles):
+    MAX_ROAD_SPEED_MPS = maxRoadSpeed(landscape)
+    serial = computeAutoflowVehicleRoutes(autoflow_vehicles, landscape, MAX_ROAD_SPEED_MPS)
+    zoned = computeAutoflowVehicleRoutes(autoflow_vehicles, landscape, MAX_ROAD_SPEED_MPS, zones=(1, 1))
+    assert list(zoned) == list(serial)
+
+def test_zoned_routes_are_valid(landscape, autoflow_vehicles):
+    MAX_ROAD_SPEED_MPS = maxRoadSpeed(landscape)
+    graph = getRoadGraph(landscape)
+    serial = computeAutoflowVehicleRoutes(autoflow_vehicles, landscape, MAX_ROAD_SPEED_MPS)
+    zoned = {
+        transport: computeAutoflowVehicleRoutes(
+            autoflow_vehicles, landscape, MAX_ROAD_SPEED_MPS, batchSize=16, zones=(2, 2), zoneTransport=transport
+        )
+        for transport in ["pipe", "socket"]
+    }
+
+    # Zones only differ from the single table planner in the reservations they see, not in how they exchange them
+    assert list(zoned["socket"]) == list(zoned["pipe"])
+    assert list(zoned["pipe"].keys()) == list(serial.keys())
+
+    for vehicle in autoflow_vehicles:
+        roads, serialRoads = routeRoads(zoned["pipe"].get(vehicle.id)), routeRoads(serial.get(vehicle.id))
+        assert roads[0] == serialRoads[0] == vehicle.road.roadID
+        assert roads[-1] == serialRoads[-1] == vehicle.destinationRoad.roadID
+        for previousID, roadID in zip(roads, roads[1:]):
+            successors = range(graph.successorOffsets[previousID], graph.successorOffsets[previousID + 1])
+            assert roadID in [graph.successorRoads[index] for index in successors]
@@ -0,0 +1,53 @@
+"""
+Tests of the per-vehicle search counters, see RoutingStats.
+"""
+
+
+# ================ IMPORTS ================
+from conftest import *
+
+# =========================================
+
+
+@pytest.fixture
+def stats() -> RoutingStats:
+    """
+    Ten A* searches whose counters are 1 to 10, and two cached routes without search counters.
+    """
+    stats = RoutingStats()
+    for value in range(1, 11):
+        stats.record("selfish", "A*", 100 + value, {"nodesPopped": value, "wallTime": value / 10})
+    stats.extend([
+        {"router": "autoflow", "method": "cache", "vehicle": 1, "routeLength": 4},
+        {"router": "autoflow", "method": "cache", "vehicle": 2, "routeLength": 6},
+    ])
+    return stats
+
+
+def test_summary_aggregates_each_counter(stats):
+    summary = stats.summary()
+    assert set(summary) == {"selfish", "autoflow"}
+    assert set(summary["autoflow"]) == {"routeLength"}
+
+    nodesPopped = summary["selfish"]["nodesPopped"]
+    assert {key: nodesPopped[key] for key in ["count", "total", "mean", "max"]} == {"count": 10, "total": 55, "mean": 5.5, "max": 10}
+    assert [nodesPopped[key] for key in ["p50", "p90", "p99"]] == pytest.approx([5.5, 9.1, 9.91])
+    assert summary["autoflow"]["routeLength"]["p50"] == 5
+
+    byMethod = stats.summary(groupBy="method", percentiles=(0, 100))
+    assert set(byMethod) == {"A*", "cache"}
+    assert byMethod["A*"]["wallTime"]["p0"] == pytest.approx(0.1) and byMethod["A*"]["wallTime"]["p100"] == pytest.approx(1)
+
+def test_slowest_records(stats):
+    assert [record["vehicle"] for record in stats.slowest(3)] == [110, 109, 108]
+    assert [record["vehicle"] for record in stats.slowest(counter="routeLength")] == [2, 1]
+    assert stats.slowest(counter="heapPushes") == []
+
+def test_routers_record_every_vehicle():
+    random.seed(53)
+    landscape = generateLandscape(15)
+    selfish_vehicles = spawnRandomVehicles(landscape, 80)
+    stats = RoutingStats()
+    computeSelfishVehicleRoutes(selfish_vehicles, landscape, maxRoadSpeed(landscape), useCache=False, stats=stats)
+    assert sorted(record["vehicle"] for record in stats.records) == sorted(vehicle.id for vehicle in selfish_vehicles)
+    assert stats.summary()["selfish"]["nodesPopped"]["count"] == len(selfish_vehicles)
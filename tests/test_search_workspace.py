@@ -0,0 +1,64 @@
+"""
+Tests of the search workspace reused by the A* routers, see SearchWorkspace.
+"""
+
+
+# ================ IMPORTS ================
+from conftest import *
+
+# =========================================
+
+
+@pytest.fixture
+def fleet() -> tuple[Landscape, list[Vehicle]]:
+    random.seed(83)
+    landscape = generateLandscape(15)
+    return landscape, spawnRandomVehicles(landscape, 60)
+
+
+def test_stamps_invalidate_previous_searches():
+    workspace = SearchWorkspace(4)
+    generation = workspace.begin()
+    workspace.closedStartStamp[1] = workspace.closedEndStamp[1] = workspace.closedEndStamp[3] = generation
+    assert workspace.closed_count() == 3
+
+    assert workspace.begin() == generation + 1
+    assert workspace.closed_count() == 0
+
+def test_searches_do_not_depend_on_previous_searches(fleet):
+    landscape, vehicles = fleet
+    MAX_ROAD_SPEED_MPS = maxRoadSpeed(landscape)
+    graph = getRoadGraph(landscape)
+
+    def search(vehicle: Vehicle) -> list[int]:
+        return findSelfishRoute(
+            graph, vehicle.road.roadID, vehicle.position,
+            vehicle.destinationRoad.roadID, vehicle.destinationPosition, MAX_ROAD_SPEED_MPS
+        )
+
+    # Routes searched in a fresh workspace, then in a workspace left over by every other search, in reverse order
+    fresh = []
+    for vehicle in vehicles:
+        SEARCH_WORKSPACES.workspace = None
+        fresh.append(search(vehicle))
+    workspace = getSearchWorkspace(graph)
+    assert [search(vehicle) for vehicle in reversed(vehicles)] == fresh[::-1]
+    assert getSearchWorkspace(graph) is workspace and workspace.generation == len(vehicles) + 1
+
+def test_workspace_per_thread_and_road_count(fleet):
+    landscape, vehicles = fleet
+    graph = getRoadGraph(landscape)
+    workspace = getSearchWorkspace(graph)
+    assert workspace.roadCount == graph.roadCount
+
+    workspaces = []
+    thread = threading.Thread(target=lambda: workspaces.append(getSearchWorkspace(graph)))
+    thread.start()
+    thread.join()
+    assert workspaces[0] is not workspace and getSearchWorkspace(graph) is workspace
+
+    # A graph with another number of roads gets a new workspace
+    random.seed(89)
+    otherGraph = getRoadGraph(generateLandscape(10))
+    assert otherGraph.roadCount != graph.roadCount
+    assert getSearchWorkspace(otherGraph).roadCount == otherGraph.roadCount
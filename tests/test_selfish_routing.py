@@ -0,0 +1,101 @@
+"""
+Tests of selfish routing, see AutoFlow.computeSelfishVehicleRoutes.
+"""
+
+
+# ================ IMPORTS ================
+from conftest import *
+
+from copy import copy
+
+# =========================================
+
+
+def sharedDestinationFleet(vehicles: list[Vehicle], groupSize: int) -> list[Vehicle]:
+    """
+    Returns copies of the vehicles where every run of groupSize vehicles shares the destination of its first vehicle.
+    """
+    fleet: list[Vehicle] = []
+    for index, vehicle in enumerate(vehicles):
+        vehicle = copy(vehicle)
+        leader = vehicles[index - index % groupSize]
+        vehicle.setDestination(leader.destinationRoad, leader.destinationPosition)
+        fleet.append(vehicle)
+    return fleet
+
+
+def test_route_does_not_depend_on_shared_destinations(landscape, selfish_vehicles):
+    MAX_ROAD_SPEED_MPS = maxRoadSpeed(landscape)
+    fleet = sharedDestinationFleet(selfish_vehicles, 8)
+    grouped = computeSelfishVehicleRoutes(fleet, landscape, MAX_ROAD_SPEED_MPS, useCache=False)
+
+    for index, vehicle in enumerate(fleet):
+        alone = computeSelfishVehicleRoutes([vehicle], landscape, MAX_ROAD_SPEED_MPS, useCache=False)
+        assert grouped[index] == alone[0]
+
+def test_unbatched_routes_match_single_searches(landscape, selfish_vehicles):
+    MAX_ROAD_SPEED_MPS = maxRoadSpeed(landscape)
+    graph = getRoadGraph(landscape)
+    routes = computeSelfishVehicleRoutes(selfish_vehicles, landscape, MAX_ROAD_SPEED_MPS, useCache=False)
+
+    for index, vehicle in enumerate(selfish_vehicles):
+        roads = findSelfishRoute(
+            graph, vehicle.road.roadID, vehicle.position,
+            vehicle.destinationRoad.roadID, vehicle.destinationPosition, MAX_ROAD_SPEED_MPS
+        )
+        assert routes[index].to_list() == graph.build_route(roads, vehicle.destinationPosition)
+
+def test_batched_routes_are_shortest(landscape, selfish_vehicles):
+    MAX_ROAD_SPEED_MPS = maxRoadSpeed(landscape)
+    graph = getRoadGraph(landscape)
+    fleet = sharedDestinationFleet(selfish_vehicles, 8)
+    batched = computeSelfishVehicleRoutes(fleet, landscape, MAX_ROAD_SPEED_MPS, minBatchSize=2, useCache=False)
+    unbatched = computeSelfishVehicleRoutes(fleet, landscape, MAX_ROAD_SPEED_MPS, useCache=False)
+
+    for index, vehicle in enumerate(fleet):
+        batchedRoads = routeRoads(batched[index])
+        unbatchedRoads = routeRoads(unbatched[index])
+        assert batchedRoads[0] == unbatchedRoads[0] and batchedRoads[-1] == unbatchedRoads[-1]
+        if len(batchedRoads) < 2:
+            assert batchedRoads == unbatchedRoads
+            continue
+
+        # The shared reverse search is exact, A* may only find equally cheap or more expensive routes
+        costs = graph.static_distances([(vehicle.destinationRoad.roadID, 0)], reverse=True)
+        shortest = min(
+            graph.successorPathwayTime[successor] + costs[graph.successorRoads[successor]]
+            for successor in range(graph.successorOffsets[batchedRoads[0]], graph.successorOffsets[batchedRoads[0] + 1])
+        )
+        assert staticCost(graph, batchedRoads) == pytest.approx(shortest)
+        assert staticCost(graph, unbatchedRoads) >= shortest - 1e-9
+
+
+def test_cached_routes_match_uncached(landscape, selfish_vehicles):
+    MAX_ROAD_SPEED_MPS = maxRoadSpeed(landscape)
+    expected = {
+        (speed, bidirectional): computeSelfishVehicleRoutes(
+            selfish_vehicles, landscape, speed, bidirectional=bidirectional, useCache=False
+        )
+        for speed in [MAX_ROAD_SPEED_MPS, MAX_ROAD_SPEED_MPS / 2]
+        for bidirectional in [False, True]
+    }
+
+    # Every call reads routes cached by the other calls
+    for repeat in range(2):
+        for (speed, bidirectional), routes in expected.items():
+            cached = computeSelfishVehicleRoutes(selfish_vehicles, landscape, speed, bidirectional=bidirectional)
+            assert list(cached) == list(routes)
+    assert getRouteCache(landscape).hits > 0
+
+def test_road_graph_is_kept_across_landscapes(landscape):
+    graph = getRoadGraph(landscape)
+    precomputeLandmarks(landscape, 4)
+    random.seed(10)
+    generateLandscape(15)
+    assert getRoadGraph(landscape) is graph
+
+    # A speed limit change recompiles the graph, and its preprocessing is recomputed for the new graph
+    landscape.roads[0].set_speed_limit(landscape.roads[0].speedLimit + 10)
+    recompiled = getRoadGraph(landscape)
+    assert recompiled is not graph
+    assert recompiled.landmarks is not None and recompiled.landmarks.landmarkCount == 4
@@ -0,0 +1,56 @@
+"""
+Tests of the traffic light wait tables, see Intersection.waiting_time.
+"""
+
+
+# ================ IMPORTS ================
+from conftest import *
+
+# =========================================
+
+
+def threeCaseWaitingTime(greenStart: int, greenEnd: int, lightCycle: int, time: float) -> float:
+    """
+    Waiting time for the green light computed like the original router did, from the green light phase of the road.
+    """
+    modulusTime = time % lightCycle
+    if greenEnd > modulusTime:
+        return max(0, greenStart - modulusTime) # earlier in the cycle, or within the green light duration
+    return lightCycle - modulusTime + greenStart # later in the cycle
+
+
+@pytest.fixture
+def landscape() -> Landscape:
+    random.seed(73)
+    return generateLandscape(15)
+
+
+def test_wait_tables_match_light_phases(landscape):
+    times = [second / 4 for second in range(400)]
+    lights = 0
+    for intersection in landscape.intersections.values():
+        if intersection.trafficLightPattern is None:
+            assert intersection.trafficLightWaitTable == {}
+            assert intersection.waiting_time(intersection.neighbours[0], 7.5) == 0
+            continue
+        lights += 1
+        lightCycle = len(intersection.neighbours) * intersection.trafficLightDuration
+        for fromIntersection, phase in intersection.trafficLightLookup.items():
+            greenStart, greenEnd = phase * intersection.trafficLightDuration, (phase + 1) * intersection.trafficLightDuration
+            assert len(intersection.trafficLightWaitTable[fromIntersection]) == lightCycle
+            for time in times:
+                assert intersection.waiting_time(fromIntersection, time) == pytest.approx(
+                    threeCaseWaitingTime(greenStart, greenEnd, lightCycle, time)
+                )
+    assert lights > 0
+
+def test_road_graph_exposes_wait_tables(landscape):
+    graph = getRoadGraph(landscape)
+    for road in landscape.roads:
+        endIntersection = landscape.intersections[road.end]
+        if graph.roadLightCycle[road.roadID]:
+            waitTable = endIntersection.trafficLightWaitTable[landscape.intersections[road.start]]
+            assert graph.roadWaitTable[road.roadID] is waitTable
+            assert graph.roadLightCycle[road.roadID] == len(waitTable)
+        else:
+            assert graph.roadWaitTable[road.roadID] is None
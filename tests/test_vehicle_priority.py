@@ -0,0 +1,74 @@
+"""
+Tests of the batch priority scoring of AutoFlow vehicles, see VehiclePriority.
+"""
+
+
+# ================ IMPORTS ================
+from conftest import *
+
+import json
+
+# =========================================
+
+
+# passengerCount <= 2 scores 1, otherwise manhattanDistance <= 100 scores 5 and longer trips score 10
+# The second tree is a single leaf
+MODEL = {
+    "features": ["passengerCount", "manhattanDistance"],
+    "trees": [
+        {"feature": [0, 0, 1, 0, 0], "threshold": [2, 0, 100, 0, 0], "left": [1, -1, 3, -1, -1], "right": [2, -1, 4, -1, -1], "value": [0, 1, 0, 5, 10]},
+        {"feature": [0], "threshold": [0], "left": [-1], "right": [-1], "value": [0.5]},
+    ],
+    "baseScore": 1,
+    "learningRate": 0.5,
+}
+
+
+def featureMatrix(rows: list[tuple[float, float]]) -> np.ndarray:
+    features = np.zeros((len(rows), len(PRIORITY_FEATURES)))
+    for index, (passengerCount, manhattanDistance) in enumerate(rows):
+        features[index, FEATURE_INDEX["passengerCount"]] = passengerCount
+        features[index, FEATURE_INDEX["manhattanDistance"]] = manhattanDistance
+    return features
+
+@pytest.fixture
+def fleet() -> tuple[RoadGraph, list[Vehicle]]:
+    random.seed(61)
+    landscape = generateLandscape(15)
+    return getRoadGraph(landscape), spawnRandomVehicles(landscape, 80, useAutoFlow=True)
+
+
+def test_hand_built_trees(tmp_path):
+    features = featureMatrix([(1, 500), (3, 50), (3, 100), (4, 101)])
+    model = PriorityModel(MODEL["features"], MODEL["trees"], MODEL["baseScore"], MODEL["learningRate"])
+    assert model.depth == 2
+    assert model.predict(features).tolist() == [1.75, 3.75, 3.75, 6.25]
+
+    path = tmp_path / "model.json"
+    path.write_text(json.dumps(MODEL))
+    assert PriorityModel.load(str(path)).predict(features).tolist() == [1.75, 3.75, 3.75, 6.25]
+
+def test_features_match_vehicles(fleet):
+    graph, vehicles = fleet
+    features = buildPriorityFeatures(vehicles, graph)
+    for vehicle, row in zip(vehicles, features):
+        start = getRealPositionOnRoad(vehicle.road, vehicle.position)
+        destination = getRealPositionOnRoad(vehicle.destinationRoad, vehicle.destinationPosition)
+        assert row[:4].tolist() == pytest.approx([*start, *destination])
+        assert row[FEATURE_INDEX["manhattanDistance"]] == pytest.approx(manhattanDistance(start, destination))
+        assert row[FEATURE_INDEX["passengerCount"]] == vehicle.passengerCount
+
+@pytest.mark.parametrize("useModel", [False, True])
+def test_priority_order(fleet, useModel):
+    graph, vehicles = fleet
+    model = PriorityModel(MODEL["features"], MODEL["trees"], MODEL["baseScore"], MODEL["learningRate"]) if useModel else None
+    features = buildPriorityFeatures(vehicles, graph)
+    if useModel:
+        scores = model.predict(features).tolist()
+    else:
+        scores = [vehicle.passengerCount * row[FEATURE_INDEX["manhattanDistance"]] for vehicle, row in zip(vehicles, features)]
+
+    # Highest score first, ties broken by the higher emission rate, then by the original order
+    expected = sorted(range(len(vehicles)), key=lambda index: (-scores[index], -vehicles[index].emissionRate))
+    assert priorityOrder(vehicles, graph, model).tolist() == expected
+    assert [vehicle.id for vehicle in sortVehicles(vehicles, graph, model)] == [vehicles[index].id for index in expected]